@@ -0,0 +1,114 @@
+"""Admission control for ingest jobs and chat requests.
+
+Each limiter caps the requests it has admitted, both in total and per
+client. A request over either cap is rejected straight away with a
+``Retry-After`` hint, so it never queues behind work it cannot overtake.
+Ingest and chat have separate limiters, so a bulk upload cannot use up the
+slots that interactive chat needs. ``INGEST_MAX_RUNNING`` additionally
+bounds how many admitted ingest jobs run at the same time; the rest wait as
+``queued`` in the ingest pool's queue, without holding a server thread, and
+cancelling one drops it before it reaches a worker.
+
+Clients are told apart by remote address only; a header the client sets
+itself could not be trusted to stop it from claiming fresh budgets.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from .jobs import CancelToken
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Slot:
+    def __init__(self, limiter: "ClientLimiter", client_id: str) -> None:
+        self._limiter = limiter
+        self._client_id = client_id
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._limiter._release(self._client_id)
+
+    def __enter__(self) -> "Slot":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class ClientLimiter:
+    def __init__(self, name: str, max_total: int, max_per_client: int, retry_after: int) -> None:
+        self.name = name
+        self.max_total = max(1, max_total)
+        self.max_per_client = max(1, min(max_per_client, self.max_total))
+        self.retry_after = retry_after
+        self._per_client: dict[str, int] = {}
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._total
+
+    def acquire(self, client_id: str) -> Slot:
+        with self._lock:
+            held = self._per_client.get(client_id, 0)
+            if held >= self.max_per_client:
+                raise AdmissionRejected(
+                    f"Too many {self.name} requests from this client ({held} in progress); retry later.",
+                    self.retry_after,
+                )
+            if self._total >= self.max_total:
+                raise AdmissionRejected(f"Server is busy with {self.name} requests; retry later.", self.retry_after)
+            self._per_client[client_id] = held + 1
+            self._total += 1
+        return Slot(self, client_id)
+
+    def _release(self, client_id: str) -> None:
+        with self._lock:
+            self._total -= 1
+            remaining = self._per_client.get(client_id, 1) - 1
+            if remaining > 0:
+                self._per_client[client_id] = remaining
+            else:
+                self._per_client.pop(client_id, None)
+
+
+INGEST_MAX_PENDING = int(os.getenv("INGEST_MAX_PENDING", "16"))
+INGEST_MAX_PER_CLIENT = int(os.getenv("INGEST_MAX_PER_CLIENT", "8"))
+INGEST_MAX_RUNNING = int(os.getenv("INGEST_MAX_RUNNING", "2"))
+INGEST_RETRY_AFTER_SECONDS = int(os.getenv("INGEST_RETRY_AFTER_SECONDS", "30"))
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "8"))
+CHAT_MAX_PER_CLIENT = int(os.getenv("CHAT_MAX_PER_CLIENT", "2"))
+CHAT_RETRY_AFTER_SECONDS = int(os.getenv("CHAT_RETRY_AFTER_SECONDS", "5"))
+
+ingest_limiter = ClientLimiter("ingest", INGEST_MAX_PENDING, INGEST_MAX_PER_CLIENT, INGEST_RETRY_AFTER_SECONDS)
+chat_limiter = ClientLimiter("chat", CHAT_MAX_CONCURRENT, CHAT_MAX_PER_CLIENT, CHAT_RETRY_AFTER_SECONDS)
+ingest_pool = ThreadPoolExecutor(max_workers=max(1, INGEST_MAX_RUNNING), thread_name_prefix="paperreader-ingest")
+
+
+async def run_ingest_job(token: CancelToken, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Run ``fn`` on an ingest worker; cancelling ``token`` while it is still queued drops it."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    future = ingest_pool.submit(call)
+    unregister = token.on_cancel(future.cancel)
+    try:
+        await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        if not future.cancelled():
+            raise
+    finally:
+        unregister()
@@ -0,0 +1,164 @@
+"""Content-addressed PDF storage.
+
+Uploads are stored once per distinct content at
+``data/blobs/<sha[:2]>/<sha[2:4]>/<sha>.pdf``. The ``blobs`` table counts the
+papers referencing each file, so deleting a paper only removes the file when
+it was the last reference.
+
+Writers call ``add_ref`` before writing the file, in one transaction, and
+``release_blob`` unlinks inside the write transaction that drops the last
+reference. SQLite serializes write transactions, so an upload of
+the same bytes cannot slip between a delete's refcount check and its unlink.
+
+Run ``python -m backend.app.blob_store --migrate`` once to move files from
+the old flat ``data/uploads`` directory into the store.
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from .db import DATA_DIR, get_conn, init_db
+
+BLOB_DIR = DATA_DIR / "blobs"
+
+
+def blob_path(file_sha256: str) -> Path:
+    return BLOB_DIR / file_sha256[:2] / file_sha256[2:4] / f"{file_sha256}.pdf"
+
+
+def is_blob_path(path: Path) -> bool:
+    return path.resolve().is_relative_to(BLOB_DIR.resolve())
+
+
+def _atomic_write(dest: Path, write) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            write(tmp)
+        os.replace(tmp_name, dest)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def store_bytes(file_sha256: str, content: bytes) -> tuple[Path, bool]:
+    """Write ``content`` unless the blob already exists; returns ``(path, created)``."""
+    dest = blob_path(file_sha256)
+    if dest.exists():
+        return dest, False
+    _atomic_write(dest, lambda f: f.write(content))
+    return dest, True
+
+
+def store_file(src: Path, file_sha256: str) -> tuple[Path, bool]:
+    dest = blob_path(file_sha256)
+    if dest.exists():
+        return dest, False
+
+    def _copy(f) -> None:
+        with src.open("rb") as source:
+            shutil.copyfileobj(source, f, 1024 * 1024)
+
+    _atomic_write(dest, _copy)
+    return dest, True
+
+
+def add_ref(conn: sqlite3.Connection, file_sha256: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO blobs (sha256, refcount) VALUES (?, 1)
+        ON CONFLICT(sha256) DO UPDATE SET refcount = refcount + 1
+        """,
+        (file_sha256,),
+    )
+
+
+def release_ref(conn: sqlite3.Connection, file_sha256: str) -> bool:
+    """Drop one reference; ``True`` when none is left and the file can go.
+
+    A missing ``blobs`` row counts as zero references, so the file is not leaked.
+    """
+    conn.execute("UPDATE blobs SET refcount = refcount - 1 WHERE sha256 = ?", (file_sha256,))
+    row = conn.execute("SELECT refcount FROM blobs WHERE sha256 = ?", (file_sha256,)).fetchone()
+    if row is not None and row[0] > 0:
+        return False
+    conn.execute("DELETE FROM blobs WHERE sha256 = ?", (file_sha256,))
+    return True
+
+
+def has_refs(conn: sqlite3.Connection, file_sha256: str) -> bool:
+    return conn.execute("SELECT 1 FROM blobs WHERE sha256 = ?", (file_sha256,)).fetchone() is not None
+
+
+def release_blob(conn: sqlite3.Connection, file_sha256: str) -> bool:
+    """Drop one reference and unlink the file when it was the last; ``True`` when the file was removed."""
+    if not release_ref(conn, file_sha256) or has_refs(conn, file_sha256):
+        return False
+    unlink_blob(file_sha256)
+    return True
+
+
+def unlink_blob(file_sha256: str) -> None:
+    blob_path(file_sha256).unlink(missing_ok=True)
+
+
+def rebuild_refcounts(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM blobs")
+    conn.execute(
+        """
+        INSERT INTO blobs (sha256, refcount)
+        SELECT file_sha256, COUNT(*) FROM papers
+        WHERE file_sha256 IS NOT NULL AND substr(filepath, 1, length(?)) = ?
+        GROUP BY file_sha256
+        """,
+        (str(BLOB_DIR), str(BLOB_DIR)),
+    )
+
+
+def migrate_uploads() -> int:
+    """Move papers still pointing at flat upload files into the blob store."""
+    from .services import compute_file_sha256
+
+    with get_conn() as conn:
+        rows = conn.execute("SELECT id, filepath FROM papers WHERE filepath IS NOT NULL").fetchall()
+    moved = 0
+    for row in rows:
+        src = Path(row["filepath"])
+        if is_blob_path(src) or not src.exists():
+            continue
+        file_sha256 = compute_file_sha256(src)
+        dest, _ = store_file(src, file_sha256)
+        with get_conn() as conn:
+            conn.execute(
+                "UPDATE papers SET filepath = ?, file_sha256 = ? WHERE id = ?",
+                (str(dest), file_sha256, row["id"]),
+            )
+        # Several rows may share one flat file; keep it until none point at it.
+        with get_conn() as conn:
+            still_used = conn.execute("SELECT 1 FROM papers WHERE filepath = ?", (str(src),)).fetchone()
+        if not still_used:
+            src.unlink(missing_ok=True)
+        moved += 1
+    with get_conn() as conn:
+        rebuild_refcounts(conn)
+    return moved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Content-addressed upload storage maintenance.")
+    parser.add_argument("--migrate", action="store_true", help="move flat uploads into the blob store")
+    args = parser.parse_args()
+    if not args.migrate:
+        parser.print_help()
+        return
+    init_db()
+    print(f"migrated {migrate_uploads()} papers into {BLOB_DIR}")
+
+
+if __name__ == "__main__":
+    main()
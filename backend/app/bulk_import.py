@@ -0,0 +1,309 @@
+"""Bulk-import a directory of PDFs into the library.
+
+    python -m backend.app.bulk_import /path/to/reading-list --workers 4 --llm-concurrency 4 --rpm 30
+
+Files are hashed and deduplicated against the ``papers`` table, text is
+extracted in a process pool, and summaries are generated by a bounded thread
+pool behind a requests-per-minute limiter. Every state change is appended to
+a JSONL journal, so re-running the same command after an interruption skips
+finished files and only redoes what is missing.
+"""
+
+import argparse
+import json
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+from .blob_store import add_ref, store_file
+from .db import DATA_DIR, get_conn, init_db
+from .near_dup import find_near_duplicates_of, store_signature
+from .ratelimit import RateLimiter
+from .services import (
+    EXTRACTOR_VERSION,
+    _replace_chunks,
+    compute_file_sha256,
+    extract_paper_text,
+    is_placeholder_summary,
+    now_iso,
+    process_paper,
+)
+
+JOURNAL_DIR = DATA_DIR / "import_journals"
+FINAL_STATES = {"duplicate", "near_duplicate", "summarized"}
+
+
+class ImportJournal:
+    """Append-only JSONL log keyed by file hash; the last entry per hash wins."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                self.entries[entry["sha256"]] = entry
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def get(self, file_sha256: str) -> dict[str, Any] | None:
+        return self.entries.get(file_sha256)
+
+    def record(self, file_sha256: str, path: Path, state: str, **extra: Any) -> None:
+        entry = {"sha256": file_sha256, "path": str(path), "state": state, "at": now_iso(), **extra}
+        with self._lock:
+            self.entries[file_sha256] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+
+
+def default_journal_path(root: Path) -> Path:
+    key = sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return JOURNAL_DIR / f"{key}.jsonl"
+
+
+def find_pdfs(root: Path) -> list[Path]:
+    return sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+
+
+def backfill_file_hashes() -> int:
+    """Fill ``file_sha256`` for rows created before the column existed."""
+    with get_conn() as conn:
+        # Papers imported from a snapshot without their PDF have no file to hash.
+        rows = conn.execute(
+            "SELECT id, filepath FROM papers WHERE file_sha256 IS NULL AND filepath IS NOT NULL"
+        ).fetchall()
+    updated = 0
+    for row in rows:
+        path = Path(row["filepath"])
+        if not path.exists():
+            continue
+        digest = compute_file_sha256(path)
+        with get_conn() as conn:
+            conn.execute("UPDATE papers SET file_sha256 = ? WHERE id = ?", (digest, row["id"]))
+        updated += 1
+    return updated
+
+
+def _find_existing(column: str, value: str) -> Any:
+    with get_conn() as conn:
+        return conn.execute(
+            f"""
+            SELECT id, status, summary_json, COALESCE(full_text, '') != '' AS has_text
+            FROM papers WHERE {column} = ? ORDER BY id DESC LIMIT 1
+            """,
+            (value,),
+        ).fetchone()
+
+
+def _needs_summary(existing: Any) -> bool:
+    """Whether a matching row never got a usable summary and should be finished rather than counted as a duplicate.
+
+    Rows still ``queued`` without text or ``processing`` belong to an in-flight upload, and
+    ``pending_summary`` rows wait for the user's near-duplicate decision; those stay duplicates.
+    """
+    if existing["status"] in ("failed", "cancelled"):
+        return True
+    if existing["status"] == "queued":
+        return bool(existing["has_text"])  # inserted by an interrupted run before its journal line was written
+    return existing["status"] == "completed" and is_placeholder_summary(existing["summary_json"])
+
+
+def _insert_paper(src: Path, file_sha256: str, extracted: dict[str, Any]) -> int:
+    with get_conn() as conn:
+        add_ref(conn, file_sha256)  # before the copy, so a concurrent delete cannot unlink it
+        dest, _ = store_file(src, file_sha256)
+        cursor = conn.execute(
+            """
+            INSERT INTO papers (
+                title, canonical_title, content_fingerprint, file_sha256, extractor_version, filename,
+                filepath, status, full_text, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                extracted["title"],
+                extracted["canonical_title"],
+                extracted["content_fingerprint"],
+                file_sha256,
+                EXTRACTOR_VERSION,
+                src.name,
+                str(dest),
+                "queued",
+                extracted["full_text"],
+                now_iso(),
+                now_iso(),
+            ),
+        )
+        paper_id = cursor.lastrowid
+        _replace_chunks(conn, paper_id, extracted["chunks"])
+        store_signature(conn, paper_id, extracted["minhash"])
+    return paper_id
+
+
+def _hold_if_near_duplicate(paper_id: int) -> list[dict[str, Any]]:
+    """Park a new paper as ``pending_summary`` when the library already has a near-duplicate."""
+    with get_conn() as conn:
+        matches = find_near_duplicates_of(conn, paper_id)
+        if matches:
+            conn.execute(
+                "UPDATE papers SET status = ?, updated_at = ? WHERE id = ?",
+                ("pending_summary", now_iso(), paper_id),
+            )
+    return matches
+
+
+class BulkImporter:
+    def __init__(
+        self,
+        journal: ImportJournal,
+        workers: int = 2,
+        llm_concurrency: int = 2,
+        requests_per_minute: float | None = None,
+        summarize: bool = True,
+    ) -> None:
+        self.journal = journal
+        self.workers = max(1, workers)
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.summarize = summarize
+        self.counts: dict[str, int] = {}
+        self._counts_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._counts_lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _summarize(self, file_sha256: str, path: Path, paper_id: int) -> None:
+        if self.limiter:
+            self.limiter.acquire()
+        process_paper(paper_id, stages=("summarize",))
+        with get_conn() as conn:
+            row = conn.execute("SELECT status, summary_json FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        if row and row["status"] == "completed":
+            self.journal.record(file_sha256, path, "summarized", paper_id=paper_id)
+            self._count("summarized")
+            print(f"summarized #{paper_id} {path.name}")
+        else:
+            error = row["summary_json"] if row else "paper row disappeared"
+            self.journal.record(file_sha256, path, "summary_failed", paper_id=paper_id, error=error)
+            self._count("summary_failed")
+            print(f"summary failed #{paper_id} {path.name}: {error}")
+
+    def run(self, root: Path) -> dict[str, int]:
+        init_db()
+        backfill_file_hashes()
+
+        files = find_pdfs(root)
+        print(f"found {len(files)} PDFs under {root}")
+        seen: set[str] = set()
+        to_extract: list[tuple[Path, str]] = []
+        to_summarize: list[tuple[str, Path, int]] = []
+
+        for path in files:
+            file_sha256 = compute_file_sha256(path)
+            entry = self.journal.get(file_sha256)
+            if file_sha256 in seen or (entry and entry["state"] in FINAL_STATES):
+                self._count("skipped")
+                continue
+            seen.add(file_sha256)
+            if entry and entry["state"] in ("imported", "summary_failed") and _find_existing("id", entry["paper_id"]):
+                to_summarize.append((file_sha256, path, entry["paper_id"]))
+                continue
+            existing = _find_existing("file_sha256", file_sha256)
+            if existing and _needs_summary(existing):
+                self.journal.record(file_sha256, path, "imported", paper_id=existing["id"])
+                to_summarize.append((file_sha256, path, existing["id"]))
+            elif existing:
+                self.journal.record(file_sha256, path, "duplicate", paper_id=existing["id"])
+                self._count("duplicate")
+            else:
+                to_extract.append((path, file_sha256))
+
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency) as llm_pool:
+            summary_jobs: list[Future[None]] = []
+
+            def _enqueue(file_sha256: str, path: Path, paper_id: int) -> None:
+                if self.summarize:
+                    summary_jobs.append(llm_pool.submit(self._summarize, file_sha256, path, paper_id))
+
+            for item in to_summarize:
+                _enqueue(*item)
+
+            with ProcessPoolExecutor(max_workers=self.workers) as cpu_pool:
+                futures = {
+                    cpu_pool.submit(extract_paper_text, path, path.stem): (path, file_sha256)
+                    for path, file_sha256 in to_extract
+                }
+                for future in as_completed(futures):
+                    path, file_sha256 = futures[future]
+                    try:
+                        extracted = future.result()
+                    except Exception as exc:
+                        self.journal.record(file_sha256, path, "failed", error=str(exc))
+                        self._count("failed")
+                        print(f"extraction failed {path}: {exc}")
+                        continue
+                    existing = _find_existing("content_fingerprint", extracted["content_fingerprint"])
+                    if existing and _needs_summary(existing):
+                        self.journal.record(file_sha256, path, "imported", paper_id=existing["id"])
+                        self._count("imported")
+                        _enqueue(file_sha256, path, existing["id"])
+                        continue
+                    if existing:
+                        self.journal.record(file_sha256, path, "duplicate", paper_id=existing["id"])
+                        self._count("duplicate")
+                        continue
+                    paper_id = _insert_paper(path, file_sha256, extracted)
+                    matches = _hold_if_near_duplicate(paper_id)
+                    if matches:
+                        self.journal.record(file_sha256, path, "near_duplicate", paper_id=paper_id, matches=matches)
+                        self._count("near_duplicate")
+                        print(f"near-duplicate #{paper_id} {path.name} ~ #{matches[0]['paper_id']} ({matches[0]['similarity']})")
+                        continue
+                    self.journal.record(file_sha256, path, "imported", paper_id=paper_id)
+                    self._count("imported")
+                    print(f"imported #{paper_id} {path.name}")
+                    _enqueue(file_sha256, path, paper_id)
+
+            for job in summary_jobs:
+                job.result()
+
+        return self.counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import a directory of PDFs.")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int, default=2, help="text extraction processes")
+    parser.add_argument("--llm-concurrency", type=int, default=2, help="parallel summary calls")
+    parser.add_argument("--rpm", type=float, default=None, help="max summary requests per minute")
+    parser.add_argument("--journal", type=Path, default=None, help="progress journal (JSONL)")
+    parser.add_argument("--no-summarize", action="store_true", help="only extract and store text")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"not a directory: {args.directory}")
+    journal = ImportJournal(args.journal or default_journal_path(args.directory))
+    importer = BulkImporter(
+        journal,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        requests_per_minute=args.rpm,
+        summarize=not args.no_summarize,
+    )
+    counts = importer.run(args.directory)
+    print("done: " + ", ".join(f"{key}={value}" for key, value in sorted(counts.items())))
+    print(f"journal: {journal.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,22 @@
 import json
+import os
 import sqlite3
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
-DB_PATH = Path(__file__).resolve().parents[2] / "data" / "paper_reader.db"
+DATA_DIR = Path(os.getenv("PAPERREADER_DATA_DIR", Path(__file__).resolve().parents[2] / "data"))
+DB_PATH = DATA_DIR / "paper_reader.db"
 
 
-def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> None:
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> bool:
+    """Add ``column`` when missing; returns whether it was just added."""
     cols = conn.execute(f"PRAGMA table_info({table})").fetchall()
     col_names = {c[1] for c in cols}
-    if column not in col_names:
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+    if column in col_names:
+        return False
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+    return True
 
 
 def init_db() -> None:
@@ -24,13 +29,17 @@ def init_db() -> None:
                 title TEXT NOT NULL,
                 canonical_title TEXT,
                 content_fingerprint TEXT,
+                file_sha256 TEXT,
+                extractor_version INTEGER,
                 filename TEXT NOT NULL,
-                filepath TEXT NOT NULL,
+                filepath TEXT,
                 status TEXT NOT NULL,
                 summary_json TEXT,
                 full_text TEXT,
                 summary_version INTEGER NOT NULL DEFAULT 0,
                 summary_updated_at TEXT,
+                summary_model TEXT,
+                summary_prompt_version INTEGER,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
             )
@@ -44,17 +53,39 @@ def init_db() -> None:
                 role TEXT NOT NULL,
                 content TEXT NOT NULL,
                 source_hint TEXT,
+                reply_to_id INTEGER,
                 created_at TEXT NOT NULL,
                 FOREIGN KEY (paper_id) REFERENCES papers (id)
             )
             """
         )
+        added_reply_to = _ensure_column(conn, "messages", "reply_to_id", "reply_to_id INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_paper_id ON messages(paper_id, id)")
+        if added_reply_to:
+            # One-time migration: link legacy assistant rows to the user message they answered.
+            conn.execute(
+                """
+                UPDATE messages
+                SET reply_to_id = (
+                    SELECT MAX(u.id) FROM messages u
+                    WHERE u.paper_id = messages.paper_id AND u.role = 'user' AND u.id < messages.id
+                )
+                WHERE role = 'assistant' AND reply_to_id IS NULL
+                """
+            )
         _ensure_column(conn, "papers", "summary_version", "summary_version INTEGER NOT NULL DEFAULT 0")
         _ensure_column(conn, "papers", "summary_updated_at", "summary_updated_at TEXT")
         _ensure_column(conn, "papers", "canonical_title", "canonical_title TEXT")
         _ensure_column(conn, "papers", "content_fingerprint", "content_fingerprint TEXT")
+        _ensure_column(conn, "papers", "file_sha256", "file_sha256 TEXT")
+        _ensure_column(conn, "papers", "extractor_version", "extractor_version INTEGER")
+        _ensure_column(conn, "papers", "summary_model", "summary_model TEXT")
+        _ensure_column(conn, "papers", "summary_prompt_version", "summary_prompt_version INTEGER")
+        _allow_null_filepath(conn)
         conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_fingerprint ON papers(content_fingerprint)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_file_sha256 ON papers(file_sha256)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_canonical_title ON papers(canonical_title)")
+        _ensure_library_version(conn)
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS chunks (
@@ -68,9 +99,170 @@ def init_db() -> None:
             )
             """
         )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_paper_id ON chunks(paper_id)")
+        # Extraction output is staged here and swapped into papers/chunks in one transaction at the end,
+        # so a failed or cancelled run leaves the previous text and chunks intact.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS staged_text (
+                paper_id INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                part TEXT NOT NULL,
+                PRIMARY KEY (paper_id, seq)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS staged_chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                paper_id INTEGER NOT NULL,
+                page_start INTEGER NOT NULL,
+                page_end INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_staged_chunks_paper_id ON staged_chunks(paper_id)")
+        _ensure_chunks_fts(conn)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS minhash_signatures (
+                paper_id INTEGER PRIMARY KEY,
+                signature BLOB NOT NULL,
+                FOREIGN KEY (paper_id) REFERENCES papers (id)
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                paper_id INTEGER NOT NULL,
+                FOREIGN KEY (paper_id) REFERENCES papers (id)
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_band_bucket ON lsh_buckets(band, bucket)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets_paper ON lsh_buckets(paper_id)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                refcount INTEGER NOT NULL
+            )
+            """
+        )
         conn.commit()
 
 
+def _allow_null_filepath(conn: sqlite3.Connection) -> None:
+    """Drop ``NOT NULL`` from ``papers.filepath`` (papers imported without their PDF have none).
+
+    SQLite cannot alter a column constraint, so older databases get the table rebuilt once.
+    """
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'papers'").fetchone()[0]
+    if "filepath TEXT NOT NULL" not in sql:
+        return
+    create = sql.replace("filepath TEXT NOT NULL", "filepath TEXT", 1)
+    create = create.replace("papers", "papers_rebuild", 1)
+    conn.execute("SAVEPOINT allow_null_filepath")
+    conn.execute(create)
+    conn.execute("INSERT INTO papers_rebuild SELECT * FROM papers")
+    # Keep the AUTOINCREMENT high-water mark so ids of deleted papers are not reused.
+    conn.execute(
+        """
+        UPDATE sqlite_sequence SET seq = (SELECT seq FROM sqlite_sequence WHERE name = 'papers')
+        WHERE name = 'papers_rebuild'
+        """
+    )
+    conn.execute("DROP TABLE papers")
+    conn.execute("ALTER TABLE papers_rebuild RENAME TO papers")
+    conn.execute("UPDATE papers SET filepath = NULL WHERE filepath = ''")
+    conn.execute("RELEASE allow_null_filepath")
+
+
+def _ensure_library_version(conn: sqlite3.Connection) -> None:
+    """Counter bumped by triggers on every write to ``papers``; the paper list's ETag is derived from it.
+
+    ``updated_at`` comes from the writer's clock and can repeat or go backwards, so it cannot tell
+    two versions of the list apart reliably.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS library_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO library_version (id, version) VALUES (1, 0)")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS papers_version_{event.lower()} AFTER {event} ON papers BEGIN
+                UPDATE library_version SET version = version + 1 WHERE id = 1;
+            END
+            """
+        )
+
+
+def has_chunks_fts(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'").fetchone() is not None
+
+
+def _ensure_chunks_fts(conn: sqlite3.Connection) -> None:
+    """Library-wide full-text index over ``chunks``, kept in sync by triggers on every chunk write.
+
+    The trigram tokenizer indexes every three-character window, so Chinese and Japanese text, which
+    has no spaces between words, is searchable by substring. SQLite builds without FTS5 or the
+    trigram tokenizer get no index; library chat then falls back to per-paper retrieval.
+    """
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'").fetchone()
+    if row is not None and "trigram" not in row[0]:
+        # Built with the word tokenizer, which kept each CJK run as a single token.
+        conn.execute("DROP TABLE chunks_fts")
+        row = None
+    try:
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts
+            USING fts5(content, content='chunks', content_rowid='id', tokenize='trigram')
+            """
+        )
+    except sqlite3.OperationalError:  # no such module: fts5, or no trigram tokenizer (SQLite < 3.34)
+        for trigger in ("chunks_fts_insert", "chunks_fts_delete", "chunks_fts_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        return
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+            INSERT INTO chunks_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+            INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS chunks_fts_update AFTER UPDATE OF content ON chunks BEGIN
+            INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO chunks_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """
+    )
+    if row is None:
+        # Index chunks written before the index existed or under the old tokenizer.
+        conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+
+
 @contextmanager
 def get_conn() -> Any:
     conn = sqlite3.connect(DB_PATH)
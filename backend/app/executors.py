@@ -0,0 +1,67 @@
+"""Executors that keep blocking work off the event loop.
+
+Async endpoints hand PDF parsing to ``run_parse``, which uses a process pool:
+pypdf and title inference are pure Python and would hold the GIL in a
+thread. SQLite queries and file I/O go to ``run_blocking``, a thread pool;
+sqlite3 and hashlib release the GIL while they wait. The process pool is
+created on first use with the ``spawn`` start method, because forking a
+server that already runs threads is unsafe. It also stays out of the
+startup path (see ``benchmarks/startup.py``).
+
+``PARSE_WORKERS=0`` runs parsing in the thread pool instead, for
+single-core hosts and for tests that patch the parser.
+"""
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(min(2, os.cpu_count() or 1))))
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "8"))
+
+_blocking_pool = ThreadPoolExecutor(max_workers=max(1, BLOCKING_WORKERS), thread_name_prefix="paperreader-io")
+_parse_pool: ProcessPoolExecutor | None = None
+_parse_lock = threading.Lock()
+
+
+def _get_parse_pool() -> Executor:
+    global _parse_pool
+    if PARSE_WORKERS <= 0:
+        return _blocking_pool
+    with _parse_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking I/O (SQLite, file writes, hashing) in the thread pool, keeping context variables."""
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_blocking_pool, call)
+
+
+def map_blocking(fn: Callable[..., T], items: Iterable[Any]) -> list[T]:
+    """Apply ``fn`` to ``items`` concurrently in the thread pool, from synchronous code; results keep input order."""
+    return list(_blocking_pool.map(fn, items))
+
+
+async def run_parse(fn: Callable[..., T], *args: Any) -> T:
+    """Run CPU-bound parsing in the process pool; ``fn`` and its arguments must be picklable."""
+    return await asyncio.get_running_loop().run_in_executor(_get_parse_pool(), fn, *args)
+
+
+def shutdown() -> None:
+    global _parse_pool
+    with _parse_lock:
+        pool, _parse_pool = _parse_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,146 @@
+"""Conditional GET and response compression for the JSON API.
+
+Read endpoints compute an ETag from a cheap metadata query (library version
+counter, ``updated_at`` and ``summary_version``, last message id) before
+loading or serializing anything. A request whose ``If-None-Match`` matches is
+answered with an empty ``304``. Responses carry ``Cache-Control: no-cache``, so browsers
+revalidate every ``fetch`` on their own.
+
+``CompressionMiddleware`` compresses JSON and text bodies larger than
+``COMPRESS_MIN_BYTES`` in the thread pool. It uses brotli when the optional
+``brotli`` package is installed and the client accepts ``br``, and gzip
+otherwise. PDFs are already compressed and are passed through unchanged.
+
+The paper list's ETag comes from ``library_version``, a counter that
+triggers bump on every write to ``papers`` (see ``db._ensure_library_version``).
+"""
+
+import gzip
+import hashlib
+import os
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import Request, Response
+
+from .executors import run_blocking
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+
+def make_etag(*parts: Any) -> str:
+    # Weak: the same representation may be sent gzip-, brotli- or un-encoded.
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """Tag ``response``; return a ``304`` to send instead when the client already has this version."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    header = request.headers.get("if-none-match")
+    if header and _matches(header, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def _accepted_encodings(headers: list[tuple[bytes, bytes]]) -> set[str]:
+    accepted: set[str] = set()
+    for name, value in headers:
+        if name.lower() != b"accept-encoding":
+            continue
+        for item in value.decode("latin-1").split(","):
+            coding, _, params = item.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _with_vary(headers: list[tuple[bytes, bytes]]) -> list[tuple[bytes, bytes]]:
+    vary = b", ".join(v for k, v in headers if k.lower() == b"vary")
+    if b"accept-encoding" in vary.lower():
+        return headers
+    out = [(k, v) for k, v in headers if k.lower() != b"vary"]
+    out.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    return out
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing single-message JSON/text responses.
+
+    Every compressible response (and every ``304``) carries ``Vary: Accept-Encoding``,
+    compressed or not, so a shared cache never hands one client's encoding to another.
+    Compression runs in the thread pool, off the event loop.
+    """
+
+    def __init__(self, app: Any, minimum_size: int = COMPRESS_MIN_BYTES) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = _accepted_encodings(scope.get("headers", []))
+        encoding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+        start: dict[str, Any] | None = None
+
+        async def _send(message: dict[str, Any]) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until we know whether the body is worth compressing
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            held, start = start, None
+            body = message.get("body", b"")
+            raw_headers = list(held.get("headers", []))
+            headers = dict((k.lower(), v) for k, v in raw_headers)
+            content_type = headers.get(b"content-type", b"").decode("latin-1")
+            if not content_type.startswith(COMPRESSIBLE_TYPES) and held["status"] != 304:
+                await send(held)
+                await send(message)
+                return
+            out = _with_vary(raw_headers)
+            if (
+                encoding is None
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or b"content-encoding" in headers
+            ):
+                await send({**held, "headers": out})
+                await send(message)
+                return
+            body = await run_blocking(_compress, encoding, body)
+            out = [(k, v) for k, v in out if k.lower() != b"content-length"]
+            out += [
+                (b"content-encoding", encoding.encode("ascii")),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ]
+            await send({**held, "headers": out})
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,145 @@
+"""Cancellation tokens for background paper processing.
+
+``process_paper`` registers a token per paper and checks it between pipeline
+stages and between extracted pages. Outstanding LLM calls register a closer
+on the token of the job they run in (see ``current_token``), so cancelling
+drops the HTTP connection instead of waiting minutes for a reply that
+nobody will read.
+"""
+
+import threading
+from collections.abc import Callable
+from contextvars import ContextVar
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self) -> None:
+        # The job this one superseded; it must wind down before this one touches the paper's rows.
+        self.previous: CancelToken | None = None
+        self._cancelled = threading.Event()
+        self._started = threading.Event()
+        self._finished = threading.Event()
+        self._callbacks: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise JobCancelled("Processing was cancelled.")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run ``callback`` on cancellation (immediately if already cancelled); returns an unregister function."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def mark_started(self) -> None:
+        self._started.set()
+
+    def mark_finished(self) -> None:
+        self._finished.set()
+
+    def wait_finished(self, timeout: float) -> bool:
+        """Wait for a started job to wind down; a job that never started has nothing to wait for."""
+        if not self._started.is_set():
+            return True
+        return self._finished.wait(timeout)
+
+
+_current: ContextVar[CancelToken | None] = ContextVar("paper_job_token", default=None)
+_active: dict[int, CancelToken] = {}
+# The newest job per paper that has not finished yet, cancelled or not; a new job chains onto it.
+_unfinished: dict[int, CancelToken] = {}
+_lock = threading.Lock()
+
+
+def current_token() -> CancelToken | None:
+    return _current.get()
+
+
+def start(paper_id: int) -> CancelToken:
+    """Register a new job for ``paper_id``, superseding (cancelling) any unfinished one."""
+    token = CancelToken()
+    with _lock:
+        previous = _unfinished.get(paper_id)
+        _active[paper_id] = token
+        _unfinished[paper_id] = token
+    if previous is not None:
+        token.previous = previous
+        previous.cancel()
+    return token
+
+
+def wait_for_previous(token: CancelToken, timeout: float) -> None:
+    """Block until the jobs ``token`` superseded have finished writing, then forget them."""
+    previous, token.previous = token.previous, None
+    while previous is not None:
+        previous.wait_finished(timeout)
+        # A job that never started (dropped from the queue) still has its own predecessor to wait for.
+        previous = previous.previous
+
+
+def finish(paper_id: int, token: CancelToken) -> None:
+    with _lock:
+        if _active.get(paper_id) is token:
+            del _active[paper_id]
+        if _unfinished.get(paper_id) is token:
+            del _unfinished[paper_id]
+    token.mark_finished()
+
+
+def cancel(paper_id: int) -> CancelToken | None:
+    """Cancel the job for ``paper_id``; returns its token, or ``None`` if nothing was running."""
+    with _lock:
+        token = _active.pop(paper_id, None)
+    if token is not None:
+        token.cancel()
+    return token
+
+
+def is_superseded(paper_id: int, token: CancelToken) -> bool:
+    """Whether a newer job now owns ``paper_id``; a superseded job must not write its status."""
+    with _lock:
+        current = _active.get(paper_id)
+    return current is not None and current is not token
+
+
+def is_active(paper_id: int) -> bool:
+    with _lock:
+        return paper_id in _active
+
+
+def bind(token: CancelToken):
+    """Make ``token`` the current job token for this context; returns a reset handle."""
+    return _current.set(token)
+
+
+def unbind(handle) -> None:
+    _current.reset(handle)
@@ -0,0 +1,203 @@
+"""Question answering across the whole library.
+
+One FTS5 query over ``chunks_fts`` (see ``db._ensure_chunks_fts``) ranks
+chunks from every completed paper by bm25, picks the best candidate papers,
+and selects each one's best chunks with a window function, so no chunk is
+re-scored in Python. The selected chunks are interleaved paper by paper into
+a single prompt of at most ``LIBRARY_PROMPT_CHARS``. The model is asked to
+cite ``[Paper N, Page X]``, and the reply lists exactly the papers and pages
+that were in the prompt.
+
+On SQLite builds without FTS5 there is no index, and questions with no term
+of three or more characters cannot use it; papers are then ranked by
+token matches and each one's chunks come from the per-paper retriever
+(``retrieve_relevant_chunks``), run in parallel in the shared thread pool.
+"""
+
+import os
+import re
+import sqlite3
+from typing import Any
+
+from . import executors
+from .db import get_conn, has_chunks_fts
+from .services import MODEL_CHAT, ServiceError, _complete, _tokenize, retrieve_relevant_chunks
+
+LIBRARY_CANDIDATE_CHUNKS = int(os.getenv("LIBRARY_CANDIDATE_CHUNKS", "200"))
+LIBRARY_PROMPT_CHARS = int(os.getenv("LIBRARY_PROMPT_CHARS", "24000"))
+LIBRARY_CHUNKS_PER_PAPER = 4
+
+
+class NoMatchingPapers(ServiceError):
+    pass
+
+
+def _query_tokens(query: str) -> list[str]:
+    # Quotes are dropped so every token can be quoted as an FTS5 string below.
+    return [token for token in dict.fromkeys(token.replace('"', "") for token in _tokenize(query)) if token]
+
+
+def _index_terms(query: str) -> list[str]:
+    """Query terms the trigram index can match: words of three or more characters, and each
+    three-character window of a CJK run, since those runs have no word breaks to split on."""
+    terms: list[str] = []
+    for run in re.findall(r"[a-z0-9_]+|[\u3040-\u30ff\u4e00-\u9fff]+", query.lower()):
+        if run[0] < "\u3040":
+            if len(run) >= 3:
+                terms.append(run)
+        else:
+            terms.extend(run[i : i + 3] for i in range(len(run) - 2))
+    return list(dict.fromkeys(terms))
+
+
+def _match_expression(tokens: list[str]) -> str:
+    # Quote every token so FTS5 syntax in user text (AND, NEAR, "-", ":") is matched literally.
+    return " OR ".join(f'"{token}"' for token in tokens)
+
+
+def rank_papers(
+    query: str, max_papers: int, paper_ids: list[int] | None = None
+) -> tuple[list[sqlite3.Row], list[list[sqlite3.Row]]]:
+    """Completed papers that best match ``query``, best first, and each paper's best chunks."""
+    tokens = _query_tokens(query)
+    if not tokens:
+        return [], []
+    terms = _index_terms(query)
+    scope = ""
+    scope_params: list[Any] = []
+    if paper_ids:
+        scope = f"AND p.id IN ({', '.join('?' for _ in paper_ids)})"
+        scope_params = list(paper_ids)
+    with get_conn() as conn:
+        # Terms shorter than a trigram (e.g. a two-character Chinese word) cannot use the index.
+        if terms and has_chunks_fts(conn):
+            rows = conn.execute(
+                f"""
+                WITH matches AS (
+                    SELECT c.id, c.paper_id, c.page_start, c.page_end, c.content, bm25(chunks_fts) AS rank
+                    FROM chunks_fts
+                    JOIN chunks AS c ON c.id = chunks_fts.rowid
+                    JOIN papers AS p ON p.id = c.paper_id
+                    WHERE chunks_fts MATCH ? AND p.status = 'completed' {scope}
+                ),
+                top_papers AS (
+                    SELECT paper_id, SUM(-rank) AS score
+                    FROM (SELECT paper_id, rank FROM matches ORDER BY rank LIMIT ?)
+                    GROUP BY paper_id
+                    ORDER BY score DESC, paper_id
+                    LIMIT ?
+                ),
+                best_chunks AS (
+                    SELECT m.*, ROW_NUMBER() OVER (PARTITION BY m.paper_id ORDER BY m.rank, m.id) AS n
+                    FROM matches AS m
+                    WHERE m.paper_id IN (SELECT paper_id FROM top_papers)
+                )
+                SELECT p.id, p.title, t.score, b.page_start, b.page_end, b.content
+                FROM best_chunks AS b
+                JOIN top_papers AS t ON t.paper_id = b.paper_id
+                JOIN papers AS p ON p.id = b.paper_id
+                WHERE b.n <= ?
+                ORDER BY t.score DESC, p.id, b.n
+                """,
+                [_match_expression(terms), *scope_params, LIBRARY_CANDIDATE_CHUNKS, max_papers, LIBRARY_CHUNKS_PER_PAPER],
+            ).fetchall()
+            return _group_by_paper(rows)
+        papers = _rank_papers_by_tokens(conn, tokens, max_papers, scope, scope_params)
+    chunks_by_paper = executors.map_blocking(
+        lambda paper: retrieve_relevant_chunks(paper["id"], query, limit=LIBRARY_CHUNKS_PER_PAPER), papers
+    )
+    return papers, chunks_by_paper
+
+
+def _group_by_paper(rows: list[sqlite3.Row]) -> tuple[list[sqlite3.Row], list[list[sqlite3.Row]]]:
+    # Rows arrive ordered by paper rank, then chunk rank; each paper's first row doubles as its header.
+    papers: list[sqlite3.Row] = []
+    chunks_by_paper: list[list[sqlite3.Row]] = []
+    for row in rows:
+        if not papers or papers[-1]["id"] != row["id"]:
+            papers.append(row)
+            chunks_by_paper.append([])
+        chunks_by_paper[-1].append(row)
+    return papers, chunks_by_paper
+
+
+def _rank_papers_by_tokens(
+    conn: sqlite3.Connection, tokens: list[str], max_papers: int, scope: str, scope_params: list[Any]
+) -> list[sqlite3.Row]:
+    """Fallback ranking without FTS5: papers by the number of chunks containing any query token."""
+    any_token = " OR ".join("instr(lower(c.content), ?) > 0" for _ in tokens)
+    return conn.execute(
+        f"""
+        SELECT p.id, p.title, COUNT(*) AS score
+        FROM chunks AS c JOIN papers AS p ON p.id = c.paper_id
+        WHERE p.status = 'completed' {scope} AND ({any_token})
+        GROUP BY p.id
+        ORDER BY score DESC, p.id
+        LIMIT ?
+        """,
+        [*scope_params, *tokens, max_papers],
+    ).fetchall()
+
+
+def _page_ref(chunk: sqlite3.Row) -> str:
+    if chunk["page_start"] == chunk["page_end"]:
+        return str(chunk["page_start"])
+    return f"{chunk['page_start']}-{chunk['page_end']}"
+
+
+def build_library_context(
+    papers: list[sqlite3.Row], chunks_by_paper: list[list[sqlite3.Row]], budget: int
+) -> tuple[str, list[dict[str, Any]]]:
+    """Interleave chunks round-robin by paper until ``budget`` characters; returns the context and citations."""
+    parts: list[str] = []
+    pages: dict[int, list[str]] = {}
+    used = 0
+    for rank in range(max((len(chunks) for chunks in chunks_by_paper), default=0)):
+        for number, (paper, chunks) in enumerate(zip(papers, chunks_by_paper), start=1):
+            if rank >= len(chunks):
+                continue
+            chunk = chunks[rank]
+            block = f"[Paper {number}, Page {_page_ref(chunk)}]\n{chunk['content']}"
+            if used + len(block) > budget:
+                continue
+            parts.append(block)
+            used += len(block) + 2
+            pages.setdefault(number, []).append(_page_ref(chunk))
+    citations = [
+        {"number": number, "paper_id": paper["id"], "title": paper["title"], "pages": list(dict.fromkeys(pages[number]))}
+        for number, paper in enumerate(papers, start=1)
+        if number in pages
+    ]
+    return "\n\n".join(parts), citations
+
+
+def answer_library_question(
+    message: str, max_papers: int = 5, paper_ids: list[int] | None = None
+) -> tuple[str, list[dict[str, Any]]]:
+    papers, chunks_by_paper = rank_papers(message, max_papers, paper_ids)
+    if not papers:
+        raise NoMatchingPapers("No completed paper in the library matches this question.")
+    context, citations = build_library_context(papers, chunks_by_paper, LIBRARY_PROMPT_CHARS)
+    catalogue = "\n".join(f"Paper {c['number']}: {c['title']}" for c in citations)
+    prompt = (
+        "You are a research assistant comparing several scientific papers. "
+        "Use English source content as the primary basis for understanding and reasoning first. "
+        "Answer in Chinese by default unless user asks other language. "
+        "Use only the retrieved chunks as evidence. "
+        "Cite every claim with [Paper N, Page X] using the labels below, and name which paper says what. "
+        "If the papers disagree or evidence is missing, say so explicitly.\n\n"
+        "Output format rules:\n"
+        "1) Return plain text only (no markdown symbols like ##, **, or tables).\n"
+        "2) Use this section structure exactly:\n"
+        "Conclusion: ...\n"
+        "Comparison: - ...\n"
+        "Uncertainty: ...\n\n"
+        f"Papers:\n{catalogue}\n\n"
+        f"Retrieved evidence chunks:\n{context}\n\n"
+        f"User question: {message}"
+    )
+    answer = _complete(MODEL_CHAT, prompt).strip()
+    cited = {int(n) for n in re.findall(r"\[Paper (\d+)", answer)}
+    for citation in citations:
+        citation["cited"] = citation["number"] in cited
+    return answer, citations
@@ -1,35 +1,60 @@
 import io
-import json
 from datetime import datetime
+from hashlib import sha256
 from pathlib import Path
 
-from fastapi import BackgroundTasks, FastAPI, File, HTTPException, UploadFile
+from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from . import executors, jobs, profiling
+from .admission import AdmissionRejected, ClientLimiter, Slot, chat_limiter, ingest_limiter, run_ingest_job
+from .blob_store import add_ref, is_blob_path, release_blob, store_bytes
 from .db import from_json, get_conn, init_db
-from .schemas import ChatMessageIn, ChatMessageOut, ChatReply, PaperDetail, PaperListItem, UploadPaperResponse
+from .http_cache import CompressionMiddleware, check_etag, make_etag
+from .library_chat import NoMatchingPapers, answer_library_question
+from .near_dup import delete_signature, find_near_duplicates_of
+from .page_cache import page_cache
+from .profiling import ProfiledRoute, ProfilingMiddleware, capture_path, list_captures, profile_background
+from .schemas import (
+    ChatHistoryPage,
+    ChatMessageIn,
+    ChatMessageOut,
+    ChatReply,
+    LibraryChatIn,
+    LibraryChatReply,
+    NearDuplicate,
+    PaperDetail,
+    PaperListItem,
+    ProfileCapture,
+    ReuseSummaryIn,
+    UploadPaperResponse,
+)
 from .services import (
     ServiceError,
-    build_full_text,
-    compute_content_fingerprint,
-    extract_pages_from_pdf,
     get_pdf_page_count,
     generate_chat_reply,
-    infer_paper_title,
+    is_placeholder_summary,
+    normalize_stages,
     normalize_title,
     now_iso,
     process_paper,
+    read_quick_metadata,
+    reuse_summary,
     update_summary_from_discussion,
-    render_single_page_pdf,
 )
 
 ROOT = Path(__file__).resolve().parents[2]
-UPLOAD_DIR = ROOT / "data" / "uploads"
 FRONTEND_DIR = ROOT / "frontend"
+CHAT_PAGE_DEFAULT = 50
+CHAT_PAGE_MAX = 200
+CANCEL_WAIT_SECONDS = 10.0
 
 app = FastAPI(title="paperReader API", version="0.1.0")
+app.router.route_class = ProfiledRoute
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -39,66 +64,118 @@ app.add_middleware(
 )
 
 
-def _is_placeholder_summary(summary_json: str | None) -> bool:
-    if not summary_json:
-        return True
+def _client_id(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def _admit(limiter: ClientLimiter, request: Request) -> Slot:
     try:
-        payload = json.loads(summary_json)
-        text = json.dumps(payload, ensure_ascii=False).lower()
-    except Exception:
-        text = str(summary_json).lower()
+        return limiter.acquire(_client_id(request))
+    except AdmissionRejected as exc:
+        raise HTTPException(
+            status_code=429, detail=str(exc), headers={"Retry-After": str(exc.retry_after)}
+        ) from exc
 
-    markers = [
-        "no model is configured",
-        "openai_api_key",
-    ]
-    return any(marker in text for marker in markers)
+
+def _process_profiled(paper_id: int, stages: list[str] | None, token: jobs.CancelToken, **kwargs) -> None:
+    with profile_background(f"process_paper #{paper_id}"):
+        process_paper(paper_id, stages, token=token, **kwargs)
+
+
+async def _run_ingest(slot: Slot, paper_id: int, stages: list[str] | None, token: jobs.CancelToken, **kwargs) -> None:
+    """Background task: queue the pipeline on an ingest worker, then free the admission slot."""
+    try:
+        await run_ingest_job(token, _process_profiled, paper_id, stages, token, **kwargs)
+    finally:
+        slot.release()
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     init_db()
 
 
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    executors.shutdown()
+
+
 @app.post("/api/papers/upload", response_model=UploadPaperResponse)
-async def upload_paper(background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> UploadPaperResponse:
+async def upload_paper(
+    request: Request, background_tasks: BackgroundTasks, file: UploadFile = File(...)
+) -> UploadPaperResponse:
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF file is allowed.")
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    safe_name = f"{timestamp}_{file.filename}"
-    save_path = UPLOAD_DIR / safe_name
-    content = await file.read()
-    save_path.write_bytes(content)
-
-    fallback_title = Path(file.filename).stem
+    # The slot is held until the background job finishes; every earlier exit gives it back.
+    # Hashing, parsing and SQLite all run in executors so this handler never blocks the event loop.
+    slot = _admit(ingest_limiter, request)
+    file_sha256 = response = None
     try:
-        pages = extract_pages_from_pdf(save_path)
-        full_text = build_full_text(pages)
-        title = infer_paper_title(fallback_title, pages)
-        canonical_title = normalize_title(title)
-        content_fingerprint = compute_content_fingerprint(full_text)
-    except Exception:
-        title = fallback_title
-        canonical_title = normalize_title(title)
-        content_fingerprint = ""
+        content = await file.read()
+        file_sha256, save_path = await executors.run_blocking(_store_upload, content)
+        fallback_title = Path(file.filename).stem
+        try:
+            metadata = await executors.run_parse(read_quick_metadata, save_path, fallback_title)
+            title = metadata["title"]
+            canonical_title = metadata["canonical_title"]
+        except Exception:
+            title = fallback_title
+            canonical_title = normalize_title(title)
+        response = await executors.run_blocking(
+            _register_upload, slot, file.filename, file_sha256, save_path, title, canonical_title
+        )
+    except BaseException:
+        if file_sha256 is not None and response is None:
+            _release_upload(file_sha256)  # rare error path; a short transaction is fine on the loop
+        slot.release()
+        raise
+    if not response.duplicate:
+        background_tasks.add_task(
+            _run_ingest, slot, response.id, None, jobs.start(response.id), check_near_duplicates=True
+        )
+    return response
 
+
+def _store_upload(content: bytes) -> tuple[str, Path]:
+    # The reference is taken before the file is written, so a concurrent delete of
+    # another paper with the same bytes cannot unlink it; _register_upload keeps it
+    # for the new row or releases it for a duplicate.
+    file_sha256 = sha256(content).hexdigest()
     with get_conn() as conn:
-        existing = None
-        if content_fingerprint:
-            existing = conn.execute(
-                """
-                SELECT id, title, status, summary_json FROM papers
-                WHERE content_fingerprint = ?
-                  AND status = 'completed'
-                ORDER BY id DESC
-                LIMIT 1
-                """,
-                (content_fingerprint,),
-            ).fetchone()
-            if existing and _is_placeholder_summary(existing["summary_json"]):
-                existing = None
+        add_ref(conn, file_sha256)
+        save_path, _ = store_bytes(file_sha256, content)
+    return file_sha256, save_path
+
+
+def _release_upload(file_sha256: str) -> None:
+    with get_conn() as conn:
+        release_blob(conn, file_sha256)
+
+
+def _register_upload(
+    slot: Slot,
+    filename: str,
+    file_sha256: str,
+    save_path: Path,
+    title: str,
+    canonical_title: str,
+) -> UploadPaperResponse:
+    # Only the first pages are read at upload; same-text duplicates with different
+    # bytes are caught by the pipeline once the content fingerprint exists.
+    with get_conn() as conn:
+        existing = conn.execute(
+            """
+            SELECT id, title, status, summary_json FROM papers
+            WHERE file_sha256 = ?
+              AND status = 'completed'
+            ORDER BY id DESC
+            LIMIT 1
+            """,
+            (file_sha256,),
+        ).fetchone()
+        if existing and is_placeholder_summary(existing["summary_json"]):
+            existing = None
         if not existing and canonical_title:
             existing = conn.execute(
                 """
@@ -110,12 +187,12 @@ async def upload_paper(background_tasks: BackgroundTasks, file: UploadFile = Fil
                 """,
                 (canonical_title,),
             ).fetchone()
-            if existing and _is_placeholder_summary(existing["summary_json"]):
+            if existing and is_placeholder_summary(existing["summary_json"]):
                 existing = None
 
         if existing:
-            if save_path.exists():
-                save_path.unlink(missing_ok=True)
+            release_blob(conn, file_sha256)
+            slot.release()
             return UploadPaperResponse(
                 id=existing["id"],
                 title=existing["title"],
@@ -127,14 +204,16 @@ async def upload_paper(background_tasks: BackgroundTasks, file: UploadFile = Fil
 
         cursor = conn.execute(
             """
-            INSERT INTO papers (title, canonical_title, content_fingerprint, filename, filepath, status, created_at, updated_at)
+            INSERT INTO papers (
+                title, canonical_title, file_sha256, filename, filepath, status, created_at, updated_at
+            )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 title,
                 canonical_title,
-                content_fingerprint if content_fingerprint else None,
-                file.filename,
+                file_sha256,
+                filename,
                 str(save_path),
                 "queued",
                 now_iso(),
@@ -143,7 +222,6 @@ async def upload_paper(background_tasks: BackgroundTasks, file: UploadFile = Fil
         )
         paper_id = cursor.lastrowid
 
-    background_tasks.add_task(process_paper, paper_id)
     return UploadPaperResponse(
         id=paper_id,
         title=title,
@@ -154,9 +232,16 @@ async def upload_paper(background_tasks: BackgroundTasks, file: UploadFile = Fil
     )
 
 
+def _library_version(conn) -> tuple:
+    return tuple(conn.execute("SELECT version FROM library_version WHERE id = 1").fetchone())
+
+
 @app.get("/api/papers", response_model=list[PaperListItem])
-def list_papers() -> list[PaperListItem]:
+def list_papers(request: Request, response: Response) -> list[PaperListItem]:
     with get_conn() as conn:
+        not_modified = check_etag(request, response, make_etag("papers", *_library_version(conn)))
+        if not_modified:
+            return not_modified
         rows = conn.execute(
             "SELECT id, title, filename, status, created_at FROM papers ORDER BY id DESC"
         ).fetchall()
@@ -173,9 +258,24 @@ def list_papers() -> list[PaperListItem]:
 
 
 @app.get("/api/papers/{paper_id}", response_model=PaperDetail)
+def get_paper_cached(paper_id: int, request: Request, response: Response) -> PaperDetail:
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT updated_at, summary_version, status, filepath FROM papers WHERE id = ?", (paper_id,)
+        ).fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Paper not found")
+        parts = tuple(row)
+        if row["status"] == "pending_summary":
+            parts += _library_version(conn)  # near-duplicate candidates live in other rows
+    not_modified = check_etag(request, response, make_etag("paper", paper_id, *parts))
+    return not_modified or get_paper(paper_id)
+
+
 def get_paper(paper_id: int) -> PaperDetail:
     with get_conn() as conn:
         row = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        near_duplicates = find_near_duplicates_of(conn, paper_id) if row and row["status"] == "pending_summary" else []
     if not row:
         raise HTTPException(status_code=404, detail="Paper not found")
     page_count = None
@@ -192,6 +292,7 @@ def get_paper(paper_id: int) -> PaperDetail:
         summary_version=row["summary_version"] or 0,
         summary_updated_at=datetime.fromisoformat(row["summary_updated_at"]) if row["summary_updated_at"] else None,
         page_count=page_count,
+        near_duplicates=[NearDuplicate(**item) for item in near_duplicates],
         created_at=datetime.fromisoformat(row["created_at"]),
         updated_at=datetime.fromisoformat(row["updated_at"]),
     )
@@ -203,6 +304,8 @@ def get_paper_pdf(paper_id: int) -> FileResponse:
         row = conn.execute("SELECT filepath, filename FROM papers WHERE id = ?", (paper_id,)).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Paper not found")
+    if not row["filepath"] or not Path(row["filepath"]).is_file():
+        raise HTTPException(status_code=404, detail="PDF file not available")
     safe_filename = row["filename"].replace('"', "")
     return FileResponse(
         path=row["filepath"],
@@ -214,14 +317,21 @@ def get_paper_pdf(paper_id: int) -> FileResponse:
 @app.get("/api/papers/{paper_id}/pdf/page/{page_no}")
 def get_paper_pdf_page(paper_id: int, page_no: int) -> StreamingResponse:
     with get_conn() as conn:
-        row = conn.execute("SELECT filepath, filename FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        row = conn.execute(
+            "SELECT filepath, filename, file_sha256 FROM papers WHERE id = ?", (paper_id,)
+        ).fetchone()
     if not row:
         raise HTTPException(status_code=404, detail="Paper not found")
+    if not row["filepath"] or not Path(row["filepath"]).is_file():
+        raise HTTPException(status_code=404, detail="PDF file not available")
     safe_filename = row["filename"].replace('"', "")
+    pdf_path = Path(row["filepath"])
+    file_key = row["file_sha256"] or row["filepath"]
     try:
-        content = render_single_page_pdf(Path(row["filepath"]), page_no)
+        content = page_cache.get(file_key, pdf_path, page_no)
     except ValueError:
         raise HTTPException(status_code=404, detail="Page not found")
+    page_cache.prefetch(file_key, pdf_path, page_no)
     return StreamingResponse(
         io.BytesIO(content),
         media_type="application/pdf",
@@ -229,36 +339,85 @@ def get_paper_pdf_page(paper_id: int, page_no: int) -> StreamingResponse:
     )
 
 
-@app.get("/api/papers/{paper_id}/chat", response_model=list[ChatMessageOut])
-def get_chat_messages(paper_id: int) -> list[ChatMessageOut]:
+def _message_out(row) -> ChatMessageOut:
+    return ChatMessageOut(
+        id=row["id"],
+        role=row["role"],
+        content=row["content"],
+        source_hint=row["source_hint"],
+        reply_to_id=row["reply_to_id"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+    )
+
+
+@app.get("/api/papers/{paper_id}/chat", response_model=ChatHistoryPage)
+def get_chat_messages(
+    paper_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=CHAT_PAGE_DEFAULT, ge=1, le=CHAT_PAGE_MAX),
+    before: int | None = Query(default=None, ge=1),
+) -> ChatHistoryPage:
+    cursor_clause = "AND id < ?" if before is not None else ""
+    params = (paper_id, before, limit + 1) if before is not None else (paper_id, limit + 1)
     with get_conn() as conn:
+        if not conn.execute("SELECT 1 FROM papers WHERE id = ?", (paper_id,)).fetchone():
+            raise HTTPException(status_code=404, detail="Paper not found")
+        # Messages are append-only, so the newest id identifies the history.
+        last_id = conn.execute("SELECT MAX(id) FROM messages WHERE paper_id = ?", (paper_id,)).fetchone()[0]
+        not_modified = check_etag(request, response, make_etag("chat", paper_id, limit, before, last_id))
+        if not_modified:
+            return not_modified
         rows = conn.execute(
-            "SELECT id, role, content, source_hint, created_at FROM messages WHERE paper_id = ? ORDER BY id ASC",
-            (paper_id,),
+            f"""
+            SELECT id, role, content, source_hint, reply_to_id, created_at
+            FROM messages
+            WHERE paper_id = ? {cursor_clause}
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            params,
         ).fetchall()
-    return [
-        ChatMessageOut(
-            id=row["id"],
-            role=row["role"],
-            content=row["content"],
-            source_hint=row["source_hint"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-        )
-        for row in rows
-    ]
+    has_more = len(rows) > limit
+    page = list(reversed(rows[:limit]))
+    return ChatHistoryPage(
+        messages=[_message_out(row) for row in page],
+        next_before=page[0]["id"] if has_more else None,
+    )
 
 
 @app.post("/api/papers/{paper_id}/chat", response_model=ChatReply)
-def chat_with_paper(paper_id: int, req: ChatMessageIn) -> ChatReply:
+def chat_with_paper(paper_id: int, req: ChatMessageIn, request: Request) -> ChatReply:
     with get_conn() as conn:
         paper = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
-        if not paper:
-            raise HTTPException(status_code=404, detail="Paper not found")
+    if not paper:
+        raise HTTPException(status_code=404, detail="Paper not found")
 
-        conn.execute(
+    with _admit(chat_limiter, request):
+        return _answer_chat(paper, req)
+
+
+@app.post("/api/chat", response_model=LibraryChatReply)
+def chat_with_library(req: LibraryChatIn, request: Request) -> LibraryChatReply:
+    if not req.message.strip():
+        raise HTTPException(status_code=400, detail="Message is empty.")
+    with _admit(chat_limiter, request):
+        try:
+            answer, citations = answer_library_question(req.message, req.max_papers, req.paper_ids)
+        except NoMatchingPapers as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        except ServiceError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+    return LibraryChatReply(answer=answer, citations=citations)
+
+
+def _answer_chat(paper, req: ChatMessageIn) -> ChatReply:
+    paper_id = paper["id"]
+    with get_conn() as conn:
+        user_msg_id = conn.execute(
             "INSERT INTO messages (paper_id, role, content, source_hint, created_at) VALUES (?, ?, ?, ?, ?)",
             (paper_id, "user", req.message, None, now_iso()),
-        )
+        ).lastrowid
 
     try:
         answer, hint = generate_chat_reply(paper, req.message)
@@ -277,22 +436,19 @@ def chat_with_paper(paper_id: int, req: ChatMessageIn) -> ChatReply:
         summary_updated_at = paper["summary_updated_at"]
     with get_conn() as conn:
         cursor = conn.execute(
-            "INSERT INTO messages (paper_id, role, content, source_hint, created_at) VALUES (?, ?, ?, ?, ?)",
-            (paper_id, "assistant", answer, hint, now_iso()),
+            """
+            INSERT INTO messages (paper_id, role, content, source_hint, reply_to_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (paper_id, "assistant", answer, hint, user_msg_id, now_iso()),
         )
         msg_id = cursor.lastrowid
         row = conn.execute(
-            "SELECT id, role, content, source_hint, created_at FROM messages WHERE id = ?", (msg_id,)
+            "SELECT id, role, content, source_hint, reply_to_id, created_at FROM messages WHERE id = ?", (msg_id,)
         ).fetchone()
 
     return ChatReply(
-        answer=ChatMessageOut(
-            id=row["id"],
-            role=row["role"],
-            content=row["content"],
-            source_hint=row["source_hint"],
-            created_at=datetime.fromisoformat(row["created_at"]),
-        ),
+        answer=_message_out(row),
         summary=merged_summary,
         summary_version=summary_version,
         summary_updated_at=datetime.fromisoformat(summary_updated_at) if summary_updated_at else None,
@@ -300,14 +456,57 @@ def chat_with_paper(paper_id: int, req: ChatMessageIn) -> ChatReply:
 
 
 @app.post("/api/papers/{paper_id}/refresh-summary", response_model=PaperDetail)
-def refresh_summary(paper_id: int, background_tasks: BackgroundTasks) -> PaperDetail:
+def refresh_summary(
+    paper_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    stages: list[str] | None = Query(default=None),
+) -> PaperDetail:
+    if stages is not None:
+        try:
+            stages = list(normalize_stages(part.strip() for raw in stages for part in raw.split(",") if part.strip()))
+        except ServiceError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
     with get_conn() as conn:
         row = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Paper not found")
+    if not row:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    slot = _admit(ingest_limiter, request)
+    with get_conn() as conn:
         conn.execute("UPDATE papers SET status = ?, updated_at = ? WHERE id = ?", ("queued", now_iso(), paper_id))
 
-    background_tasks.add_task(process_paper, paper_id)
+    background_tasks.add_task(_run_ingest, slot, paper_id, stages, jobs.start(paper_id))
+    return get_paper(paper_id)
+
+
+@app.post("/api/papers/{paper_id}/cancel", response_model=PaperDetail)
+def cancel_processing(paper_id: int) -> PaperDetail:
+    with get_conn() as conn:
+        row = conn.execute("SELECT id FROM papers WHERE id = ?", (paper_id,)).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    if not jobs.cancel(paper_id):
+        raise HTTPException(status_code=409, detail="No processing job is running for this paper.")
+    with get_conn() as conn:
+        conn.execute(
+            "UPDATE papers SET status = ?, updated_at = ? WHERE id = ? AND status IN ('queued', 'processing')",
+            ("cancelled", now_iso(), paper_id),
+        )
+    return get_paper(paper_id)
+
+
+@app.post("/api/papers/{paper_id}/reuse-summary", response_model=PaperDetail)
+def reuse_summary_from_paper(paper_id: int, req: ReuseSummaryIn) -> PaperDetail:
+    with get_conn() as conn:
+        row = conn.execute("SELECT id FROM papers WHERE id = ?", (paper_id,)).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    if req.source_id == paper_id:
+        raise HTTPException(status_code=400, detail="A paper cannot reuse its own summary.")
+    try:
+        reuse_summary(paper_id, req.source_id)
+    except ServiceError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     return get_paper(paper_id)
 
 
@@ -318,38 +517,23 @@ def update_summary_from_latest_discussion(paper_id: int) -> PaperDetail:
         if not paper:
             raise HTTPException(status_code=404, detail="Paper not found")
 
-        rows = conn.execute(
+        pair = conn.execute(
             """
-            SELECT id, role, content, source_hint
-            FROM messages
-            WHERE paper_id = ?
-            ORDER BY id DESC
-            LIMIT 50
+            SELECT a.content AS answer, a.source_hint, u.content AS question
+            FROM messages a
+            JOIN messages u ON u.id = a.reply_to_id
+            WHERE a.paper_id = ? AND a.role = 'assistant'
+            ORDER BY a.id DESC
+            LIMIT 1
             """,
             (paper_id,),
-        ).fetchall()
+        ).fetchone()
 
-    latest_assistant = None
-    latest_user = None
-    for row in rows:
-        if row["role"] == "assistant" and latest_assistant is None:
-            latest_assistant = row
-            continue
-        if row["role"] == "user":
-            if latest_assistant is None or row["id"] < latest_assistant["id"]:
-                latest_user = row
-                break
-
-    if not latest_user or not latest_assistant:
+    if not pair:
         raise HTTPException(status_code=400, detail="No complete discussion pair found for summary update.")
 
     try:
-        update_summary_from_discussion(
-            paper,
-            latest_user["content"],
-            latest_assistant["content"],
-            latest_assistant["source_hint"],
-        )
+        update_summary_from_discussion(paper, pair["question"], pair["answer"], pair["source_hint"])
     except ServiceError as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     return get_paper(paper_id)
@@ -358,19 +542,46 @@ def update_summary_from_latest_discussion(paper_id: int) -> PaperDetail:
 @app.delete("/api/papers/{paper_id}")
 def delete_paper(paper_id: int) -> dict[str, int | str]:
     with get_conn() as conn:
-        row = conn.execute("SELECT filepath FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        row = conn.execute("SELECT filepath, file_sha256 FROM papers WHERE id = ?", (paper_id,)).fetchone()
         if not row:
             raise HTTPException(status_code=404, detail="Paper not found")
 
+    # Stop any in-flight processing first so it cannot write rows for a deleted paper.
+    token = jobs.cancel(paper_id)
+    if token is not None:
+        token.wait_finished(CANCEL_WAIT_SECONDS)
+
+    with get_conn() as conn:
         conn.execute("DELETE FROM messages WHERE paper_id = ?", (paper_id,))
         conn.execute("DELETE FROM chunks WHERE paper_id = ?", (paper_id,))
+        delete_signature(conn, paper_id)
         conn.execute("DELETE FROM papers WHERE id = ?", (paper_id,))
-
-    file_path = Path(row["filepath"])
-    if file_path.exists():
-        file_path.unlink(missing_ok=True)
+        if not row["filepath"]:
+            pass  # imported from a snapshot without its PDF
+        elif is_blob_path(Path(row["filepath"])):
+            # Unlinks inside this transaction, so an upload of the same bytes waits for it.
+            release_blob(conn, row["file_sha256"])
+        else:
+            Path(row["filepath"]).unlink(missing_ok=True)  # flat upload from before the blob store migration
 
     return {"deleted_id": paper_id, "message": "Paper deleted"}
 
 
+def get_profiles(limit: int = Query(default=50, ge=1, le=500)) -> list[ProfileCapture]:
+    return [ProfileCapture(**capture) for capture in list_captures(limit)]
+
+
+def get_profile_data(capture_id: str) -> FileResponse:
+    path = capture_path(capture_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path=path, media_type="application/octet-stream", filename=path.name)
+
+
+# Captures expose code paths and timings, so the endpoints exist only on servers started with PROFILING=1.
+if profiling.PROFILING_ENABLED:
+    app.add_api_route("/api/profiles", get_profiles, methods=["GET"], response_model=list[ProfileCapture])
+    app.add_api_route("/api/profiles/{capture_id}", get_profile_data, methods=["GET"])
+
+
 app.mount("/", StaticFiles(directory=FRONTEND_DIR, html=True), name="frontend")
@@ -0,0 +1,196 @@
+"""Near-duplicate detection with MinHash signatures and an LSH banding index.
+
+Signatures are computed over word shingles while the text streams through
+the ingest pipeline. Each signature is split into bands; every band is
+hashed into ``lsh_buckets``, so candidate lookup is a handful of indexed
+queries instead of a scan over the library. Candidates are then ranked by
+the estimated Jaccard similarity of their full signatures.
+
+Run ``python -m backend.app.near_dup --backfill`` once to index papers that
+were ingested before signatures existed.
+"""
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+from array import array
+from collections import deque
+from hashlib import blake2b
+from typing import Any
+
+from .db import get_conn, init_db
+
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 61) - 2
+_rng = random.Random(20260211)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_TOKEN_RE = re.compile(r"[a-z0-9_]+|[\u4e00-\u9fff]{1,2}|[\u3040-\u30ff]{1,2}")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class MinHasher:
+    """Incremental MinHash over ``SHINGLE_SIZE``-token shingles.
+
+    The last tokens of each ``update`` are carried over, so feeding a
+    document page by page produces the same signature as feeding it whole.
+    """
+
+    def __init__(self) -> None:
+        self.signature = [_MAX_HASH] * NUM_PERM
+        self._window: deque[str] = deque(maxlen=SHINGLE_SIZE)
+        self._empty = True
+
+    def update(self, text: str) -> None:
+        hashes: set[int] = set()
+        for token in _TOKEN_RE.findall(text.lower()):
+            self._window.append(token)
+            if len(self._window) == SHINGLE_SIZE:
+                hashes.add(_hash64(" ".join(self._window)))
+        if not hashes:
+            return
+        self._empty = False
+        self.signature = [
+            min(current, min((a * h + b) % _PRIME for h in hashes))
+            for current, (a, b) in zip(self.signature, _PERMUTATIONS)
+        ]
+
+    def digest(self) -> list[int] | None:
+        """Signature, or ``None`` when the text was too short to shingle."""
+        return None if self._empty else list(self.signature)
+
+
+def estimate_similarity(left: list[int], right: list[int]) -> float:
+    return sum(1 for a, b in zip(left, right) if a == b) / NUM_PERM
+
+
+def _band_keys(signature: list[int]) -> list[tuple[int, int]]:
+    keys: list[tuple[int, int]] = []
+    for band in range(BANDS):
+        rows = array("Q", signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]).tobytes()
+        keys.append((band, int.from_bytes(blake2b(rows, digest_size=8).digest(), "big", signed=True)))
+    return keys
+
+
+def _pack(signature: list[int]) -> bytes:
+    return array("Q", signature).tobytes()
+
+
+def _unpack(blob: bytes) -> list[int]:
+    return array("Q", blob).tolist()
+
+
+def delete_signature(conn: sqlite3.Connection, paper_id: int) -> None:
+    conn.execute("DELETE FROM lsh_buckets WHERE paper_id = ?", (paper_id,))
+    conn.execute("DELETE FROM minhash_signatures WHERE paper_id = ?", (paper_id,))
+
+
+def store_signature(conn: sqlite3.Connection, paper_id: int, signature: list[int] | None) -> None:
+    delete_signature(conn, paper_id)
+    if signature is None:
+        return
+    conn.execute(
+        "INSERT INTO minhash_signatures (paper_id, signature) VALUES (?, ?)",
+        (paper_id, _pack(signature)),
+    )
+    conn.executemany(
+        "INSERT INTO lsh_buckets (band, bucket, paper_id) VALUES (?, ?, ?)",
+        [(band, bucket, paper_id) for band, bucket in _band_keys(signature)],
+    )
+
+
+def find_near_duplicates(
+    conn: sqlite3.Connection,
+    signature: list[int] | None,
+    exclude_id: int | None = None,
+    threshold: float = NEAR_DUPLICATE_THRESHOLD,
+    limit: int = 5,
+) -> list[dict[str, Any]]:
+    """Completed papers with a usable summary whose estimated similarity is at least ``threshold``."""
+    if signature is None:
+        return []
+    keys = _band_keys(signature)
+    placeholders = ", ".join("(?, ?)" for _ in keys)
+    candidates = conn.execute(
+        f"""
+        WITH keys(band, bucket) AS (VALUES {placeholders}),
+        hits AS (
+            SELECT DISTINCT l.paper_id
+            FROM keys k
+            JOIN lsh_buckets l ON l.band = k.band AND l.bucket = k.bucket
+        )
+        SELECT s.paper_id, s.signature, p.title
+        FROM hits h
+        JOIN minhash_signatures s ON s.paper_id = h.paper_id
+        JOIN papers p ON p.id = h.paper_id
+        WHERE h.paper_id != ?
+          AND p.status = 'completed'
+          AND COALESCE(p.summary_version, 0) > 0
+        """,
+        [value for key in keys for value in key] + [exclude_id if exclude_id is not None else -1],
+    ).fetchall()
+
+    matches: list[dict[str, Any]] = []
+    for row in candidates:
+        similarity = estimate_similarity(signature, _unpack(row["signature"]))
+        if similarity >= threshold:
+            matches.append({"paper_id": row["paper_id"], "title": row["title"], "similarity": round(similarity, 3)})
+    matches.sort(key=lambda item: (-item["similarity"], -item["paper_id"]))
+    return matches[:limit]
+
+
+def find_near_duplicates_of(conn: sqlite3.Connection, paper_id: int, **kwargs: Any) -> list[dict[str, Any]]:
+    row = conn.execute("SELECT signature FROM minhash_signatures WHERE paper_id = ?", (paper_id,)).fetchone()
+    if not row:
+        return []
+    return find_near_duplicates(conn, _unpack(row["signature"]), exclude_id=paper_id, **kwargs)
+
+
+def backfill_signatures() -> int:
+    """Index papers that have stored text but no signature yet."""
+    from .services import parse_pages_from_full_text
+
+    with get_conn() as conn:
+        ids = [
+            row["id"]
+            for row in conn.execute(
+                """
+                SELECT id FROM papers
+                WHERE COALESCE(full_text, '') != ''
+                  AND id NOT IN (SELECT paper_id FROM minhash_signatures)
+                """
+            )
+        ]
+    for paper_id in ids:
+        with get_conn() as conn:
+            row = conn.execute("SELECT full_text FROM papers WHERE id = ?", (paper_id,)).fetchone()
+            hasher = MinHasher()
+            for _, text in parse_pages_from_full_text(row["full_text"]):
+                hasher.update(text)
+            store_signature(conn, paper_id, hasher.digest())
+    return len(ids)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Near-duplicate index maintenance.")
+    parser.add_argument("--backfill", action="store_true", help="compute signatures for papers missing one")
+    args = parser.parse_args()
+    if not args.backfill:
+        parser.print_help()
+        return
+    init_db()
+    print(f"indexed {backfill_signatures()} papers")
+
+
+if __name__ == "__main__":
+    main()
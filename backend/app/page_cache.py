@@ -0,0 +1,134 @@
+"""Bounded cache of single-page PDF renders with read-ahead.
+
+Readers page through a paper sequentially, so after serving page ``n`` the
+next ``PAGE_PREFETCH_COUNT`` pages are rendered by a background thread while
+the client is still looking at the current one. Entries are keyed by file
+hash and page number and evicted least-recently-used once the cached bytes
+exceed ``PAGE_CACHE_MAX_MB``.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from .services import open_pdf, render_pdf_page
+
+PAGE_PREFETCH_COUNT = int(os.getenv("PAGE_PREFETCH_COUNT", "3"))
+PAGE_CACHE_MAX_MB = float(os.getenv("PAGE_CACHE_MAX_MB", "64"))
+PENDING_WAIT_SECONDS = 10.0
+
+CacheKey = tuple[str, int]
+
+
+class PageRenderCache:
+    def __init__(self, max_bytes: int, prefetch_count: int = PAGE_PREFETCH_COUNT) -> None:
+        self.max_bytes = max_bytes
+        self.prefetch_count = max(0, prefetch_count)
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[CacheKey, bytes] = OrderedDict()
+        self._size = 0
+        self._pending: dict[CacheKey, Future[bytes | None]] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __contains__(self, key: CacheKey) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def _lookup(self, key: CacheKey) -> bytes | None:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def _store(self, key: CacheKey, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, file_key: str, pdf_path: Path, page_no: int) -> bytes:
+        """Return the rendered page, waiting on an in-flight prefetch if there is one.
+
+        Raises ``ValueError`` for pages outside the document, like
+        ``render_single_page_pdf``.
+        """
+        key = (file_key, page_no)
+        content = self._lookup(key)
+        if content is None:
+            with self._lock:
+                pending = self._pending.get(key)
+            if pending is not None:
+                try:
+                    content = pending.result(timeout=PENDING_WAIT_SECONDS)
+                except Exception:
+                    content = None
+        if content is not None:
+            self.hits += 1
+            return content
+
+        self.misses += 1
+        reader = open_pdf(pdf_path)
+        if page_no < 1 or page_no > len(reader.pages):
+            raise ValueError("page out of range")
+        content = render_pdf_page(reader, page_no)
+        self._store(key, content)
+        return content
+
+    def prefetch(self, file_key: str, pdf_path: Path, page_no: int) -> None:
+        """Warm the pages after ``page_no`` in the background."""
+        if not self.prefetch_count:
+            return
+        futures: dict[int, Future[bytes | None]] = {}
+        with self._lock:
+            for next_page in range(page_no + 1, page_no + 1 + self.prefetch_count):
+                key = (file_key, next_page)
+                if key in self._entries or key in self._pending:
+                    continue
+                futures[next_page] = self._pending[key] = Future()
+            if not futures:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-prefetch")
+        self._executor.submit(self._prefetch_pages, file_key, pdf_path, futures)
+
+    def _prefetch_pages(self, file_key: str, pdf_path: Path, futures: dict[int, Future[bytes | None]]) -> None:
+        try:
+            reader = open_pdf(pdf_path)
+            total = len(reader.pages)
+            for page_no, future in futures.items():
+                content = render_pdf_page(reader, page_no) if page_no <= total else None
+                if content is not None:
+                    self._store((file_key, page_no), content)
+                future.set_result(content)
+        except Exception as exc:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            with self._lock:
+                for page_no in futures:
+                    self._pending.pop((file_key, page_no), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+page_cache = PageRenderCache(int(PAGE_CACHE_MAX_MB * 1024 * 1024))
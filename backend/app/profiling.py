@@ -0,0 +1,250 @@
+"""Opt-in request profiling.
+
+With ``PROFILING=1`` the middleware samples ``PROFILE_SAMPLE_RATE`` of the
+requests, plus any request sent with ``X-Profile: 1``. Every route handler
+runs under cProfile while its request is sampled. A ``process_paper`` job
+queued by that request is also profiled, as a separate capture. Each
+capture is written to ``PROFILE_DIR``:
+
+- ``<id>.prof`` holds pstats data that snakeviz or ``python -m pstats`` can open.
+- ``<id>.json`` holds a summary with timings and the top functions by cumulative time.
+
+Captures are written from the thread pool, never on the event loop. Only
+the newest ``PROFILE_KEEP`` captures are kept. ``GET /api/profiles`` lists
+them, slowest first; it and the download route are only mounted when
+profiling is on.
+
+Async handlers are profiled on the event-loop thread, so their profile also
+contains whatever else the loop ran meanwhile. Sync handlers run in a worker
+thread and are isolated.
+"""
+
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from fastapi.routing import APIRoute
+
+from .db import DATA_DIR
+from .executors import run_blocking
+
+PROFILING_ENABLED = os.getenv("PROFILING", "").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_HEADER = "x-profile"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", DATA_DIR / "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_TOP_FUNCTIONS = 15
+
+_thread_state = threading.local()
+
+
+class RequestProfile:
+    """Per-request capture state, shared by the middleware and the profiled route handler."""
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.profile: cProfile.Profile | None = None
+        self.handler_ms: float | None = None
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+def _should_sample(headers: list[tuple[bytes, bytes]]) -> bool:
+    for name, value in headers:
+        if name.decode("latin-1").lower() == PROFILE_HEADER:
+            return value.strip() in (b"1", b"true")
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+@contextmanager
+def _profiled() -> Iterator[cProfile.Profile | None]:
+    # cProfile hooks are per thread; never stack two on one thread.
+    if getattr(_thread_state, "active", False):
+        yield None
+        return
+    profile = cProfile.Profile()
+    _thread_state.active = True
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        _thread_state.active = False
+
+
+def _top_functions(profile: cProfile.Profile) -> list[dict[str, Any]]:
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP_FUNCTIONS]
+    return [
+        {
+            "function": f"{Path(filename).name}:{line}({name})",
+            "calls": ncalls,
+            "total_ms": round(tottime * 1000, 3),
+            "cumulative_ms": round(cumtime * 1000, 3),
+        }
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in rows
+    ]
+
+
+def _write_capture(capture_id: str, profile: cProfile.Profile | None, summary: dict[str, Any]) -> None:
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    if profile is not None:
+        pstats.Stats(profile).dump_stats(PROFILE_DIR / f"{capture_id}.prof")
+        summary["top_functions"] = _top_functions(profile)
+    summary["id"] = capture_id
+    summary["captured_at"] = datetime.now(timezone.utc).isoformat()
+    (PROFILE_DIR / f"{capture_id}.json").write_text(json.dumps(summary, ensure_ascii=False), encoding="utf-8")
+    _rotate()
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0  # rotated away by another writer
+
+
+def _rotate() -> None:
+    # By write time, not name: a "<id>-bg" capture is written long after the request that named it.
+    captures = sorted(PROFILE_DIR.glob("*.json"), key=_mtime)
+    for stale in captures[: max(0, len(captures) - PROFILE_KEEP)]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def list_captures(limit: int = 50) -> list[dict[str, Any]]:
+    """Captured profiles, slowest first."""
+    captures: list[dict[str, Any]] = []
+    for path in PROFILE_DIR.glob("*.json") if PROFILE_DIR.exists() else []:
+        try:
+            captures.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, json.JSONDecodeError):
+            continue  # rotated away or half-written
+    captures.sort(key=lambda item: item.get("duration_ms", 0), reverse=True)
+    return captures[:limit]
+
+
+def capture_path(capture_id: str) -> Path | None:
+    path = PROFILE_DIR / f"{Path(capture_id).name}.prof"
+    return path if path.exists() else None
+
+
+def profile_handler(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a route endpoint so it runs under cProfile when its request is sampled."""
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            request = _current.get()
+            if request is None:
+                return await endpoint(*args, **kwargs)
+            start = time.perf_counter()
+            with _profiled() as profile:
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    request.profile, request.handler_ms = profile, (time.perf_counter() - start) * 1000
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        request = _current.get()
+        if request is None:
+            return endpoint(*args, **kwargs)
+        start = time.perf_counter()
+        with _profiled() as profile:
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                request.profile, request.handler_ms = profile, (time.perf_counter() - start) * 1000
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class that wraps every endpoint with ``profile_handler``; unsampled requests pay one ContextVar lookup."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, profile_handler(endpoint), **kwargs)
+
+
+@contextmanager
+def profile_background(name: str) -> Iterator[None]:
+    """Profile a background job as its own capture when the request that queued it is sampled."""
+    request = _current.get()
+    if request is None:
+        yield
+        return
+    start = time.perf_counter()
+    with _profiled() as profile:
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+    _write_capture(
+        f"{request.id}-bg",
+        profile,
+        {"kind": "background", "name": name, "request_id": request.id, "duration_ms": round(duration_ms, 3)},
+    )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that marks sampled requests and writes their captures."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not PROFILING_ENABLED or not _should_sample(scope.get("headers", [])):
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestProfile(scope["method"], scope["path"])
+        start = time.perf_counter()
+        state: dict[str, Any] = {"status": None, "duration_ms": None}
+
+        async def _send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message.setdefault("headers", []).append((b"x-profile-id", request.id.encode("ascii")))
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Background tasks run after the body is sent; they are captured separately.
+                state["duration_ms"] = (time.perf_counter() - start) * 1000
+            await send(message)
+
+        token = _current.set(request)
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            _current.reset(token)
+            duration_ms = state["duration_ms"] or (time.perf_counter() - start) * 1000
+            await run_blocking(
+                _write_capture,
+                request.id,
+                request.profile,
+                {
+                    "kind": "request",
+                    "method": request.method,
+                    "path": request.path,
+                    "status_code": state["status"],
+                    "duration_ms": round(duration_ms, 3),
+                    "handler_ms": round(request.handler_ms, 3) if request.handler_ms is not None else None,
+                },
+            )
@@ -0,0 +1,45 @@
+import threading
+import time
+from collections.abc import Callable
+
+
+class RateLimiter:
+    """Thread-safe token bucket that spaces out calls to at most ``per_minute``.
+
+    ``acquire(cost)`` charges ``cost`` units instead of one, so the same
+    bucket can meter tokens per minute. A charge larger than the bucket
+    proceeds as soon as the bucket is full and leaves it in debt, so later
+    callers wait until the debt is paid off.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.interval = 60.0 / per_minute
+        self.capacity = float(max(1, burst))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) / self.interval)
+        self._last = now
+
+    def acquire(self, cost: float = 1.0) -> None:
+        needed = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                self._refill(self._clock())
+                if self._tokens >= needed:
+                    self._tokens -= cost
+                    return
+                wait = (needed - self._tokens) * self.interval
+            self._sleep(wait)
@@ -0,0 +1,235 @@
+"""Regenerate summaries across the library after a model or prompt change.
+
+    python -m backend.app.resummarize --concurrency 4 --rpm 30 --tpm 200000
+    python -m backend.app.resummarize --model gpt-4.1 --dry-run
+
+Without filters it selects every completed paper whose summary came from a
+model other than ``OPENAI_SUMMARY_MODEL`` or from a prompt older than
+``SUMMARY_PROMPT_VERSION``. ``--model``, ``--prompt-version-below`` and
+``--summary-version-below`` narrow that selection, and ``--all`` takes every
+completed paper.
+
+Stored full text is reused, so no PDF is re-read. Calls run on a bounded
+thread pool behind requests-per-minute and tokens-per-minute limiters. A
+failed call keeps the previous summary. Each result is appended to a JSONL
+checkpoint, and re-running the same command skips papers already done for
+this model and prompt version. Papers deleted or reprocessed while the run
+is going are skipped and keep their current status.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from . import services
+from .db import DATA_DIR, get_conn, init_db
+from .ratelimit import RateLimiter
+from .services import MODEL_SUMMARY, SUMMARY_INPUT_CHARS, SUMMARY_PROMPT_VERSION, now_iso, store_summary
+
+CHECKPOINT_DIR = DATA_DIR / "resummarize_checkpoints"
+# Fixed instructions around the paper text, and a typical three-language reply.
+PROMPT_OVERHEAD_TOKENS = 600
+SUMMARY_OUTPUT_TOKENS = 2500
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: about four ASCII characters per token, one per CJK character."""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+class Checkpoint:
+    """Append-only JSONL log keyed by paper id; the last entry per paper wins."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[int, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                self.entries[entry["paper_id"]] = entry
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def is_done(self, paper_id: int) -> bool:
+        entry = self.entries.get(paper_id)
+        return bool(entry and entry["state"] == "done")
+
+    def record(self, paper_id: int, state: str, **extra: Any) -> None:
+        entry = {"paper_id": paper_id, "state": state, "at": now_iso(), **extra}
+        with self._lock:
+            self.entries[paper_id] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+
+
+def default_checkpoint_path() -> Path:
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "_", MODEL_SUMMARY)
+    return CHECKPOINT_DIR / f"{slug}-p{SUMMARY_PROMPT_VERSION}.jsonl"
+
+
+class Progress:
+    """Throughput and ETA over the papers finished so far."""
+
+    def __init__(self, total: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.tokens = 0
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+
+    def record(self, tokens: int, ok: bool) -> None:
+        with self._lock:
+            self.done += 1
+            self.failed += 0 if ok else 1
+            self.tokens += tokens
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            elapsed = max(self._clock() - self._start, 1e-9)
+            rate = self.done / elapsed
+            remaining = self.total - self.done
+            return {
+                "done": self.done,
+                "failed": self.failed,
+                "total": self.total,
+                "elapsed_s": round(elapsed, 1),
+                "papers_per_min": round(rate * 60, 2),
+                "tokens_per_min": round(self.tokens / elapsed * 60),
+                "eta_s": round(remaining / rate, 1) if rate > 0 else None,
+            }
+
+    def format(self) -> str:
+        snap = self.snapshot()
+        eta = f"{snap['eta_s'] / 60:.1f} min" if snap["eta_s"] is not None else "?"
+        return (
+            f"[{snap['done']}/{snap['total']}] {snap['papers_per_min']} papers/min, "
+            f"~{snap['tokens_per_min']} tokens/min, ETA {eta}"
+        )
+
+
+def select_papers(
+    all_papers: bool = False,
+    model: str | None = None,
+    prompt_version_below: int | None = None,
+    summary_version_below: int | None = None,
+) -> list[Any]:
+    clauses = ["status = 'completed'", "COALESCE(full_text, '') != ''"]
+    params: list[Any] = []
+    if model is not None:
+        clauses.append("summary_model IS ?")
+        params.append(model or None)
+    if prompt_version_below is not None:
+        clauses.append("COALESCE(summary_prompt_version, 0) < ?")
+        params.append(prompt_version_below)
+    if summary_version_below is not None:
+        clauses.append("summary_version < ?")
+        params.append(summary_version_below)
+    if not all_papers and not params:
+        clauses.append("(summary_model IS NOT ? OR COALESCE(summary_prompt_version, 0) < ?)")
+        params.extend([MODEL_SUMMARY, SUMMARY_PROMPT_VERSION])
+    with get_conn() as conn:
+        return conn.execute(
+            f"SELECT id, title FROM papers WHERE {' AND '.join(clauses)} ORDER BY id", params
+        ).fetchall()
+
+
+class Resummarizer:
+    def __init__(
+        self,
+        checkpoint: Checkpoint,
+        concurrency: int = 2,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.concurrency = max(1, concurrency)
+        self.request_limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.token_limiter = RateLimiter(tokens_per_minute) if tokens_per_minute else None
+        self.progress = Progress(0)
+
+    def _skip(self, paper_id: int, reason: str) -> None:
+        # Not "done": a later run picks the paper up again if it qualifies by then.
+        self.checkpoint.record(paper_id, "skipped", reason=reason)
+        self.progress.record(0, ok=True)
+        print(f"skipped #{paper_id}: {reason}  {self.progress.format()}")
+
+    def _resummarize(self, paper_id: int, title: str) -> None:
+        with get_conn() as conn:
+            row = conn.execute(
+                "SELECT substr(full_text, 1, ?) AS head FROM papers WHERE id = ?", (SUMMARY_INPUT_CHARS, paper_id)
+            ).fetchone()
+        if row is None or not row["head"]:
+            self._skip(paper_id, "paper was deleted or has no text")
+            return
+        tokens = estimate_tokens(row["head"]) + PROMPT_OVERHEAD_TOKENS + SUMMARY_OUTPUT_TOKENS
+        if self.request_limiter:
+            self.request_limiter.acquire()
+        if self.token_limiter:
+            self.token_limiter.acquire(tokens)
+        try:
+            summary = services.summarize_paper(title, row["head"])
+        except Exception as exc:
+            self.checkpoint.record(paper_id, "failed", error=str(exc))
+            self.progress.record(tokens, ok=False)
+            print(f"failed #{paper_id}: {exc}  {self.progress.format()}")
+            return
+        with get_conn() as conn:
+            stored = store_summary(conn, paper_id, summary, only_completed=True)
+        if not stored:
+            self._skip(paper_id, "paper is no longer completed")
+            return
+        self.checkpoint.record(paper_id, "done", model=MODEL_SUMMARY, prompt_version=SUMMARY_PROMPT_VERSION)
+        self.progress.record(tokens, ok=True)
+        print(f"resummarized #{paper_id} {title[:60]}  {self.progress.format()}")
+
+    def run(self, papers: list[Any]) -> dict[str, Any]:
+        pending = [paper for paper in papers if not self.checkpoint.is_done(paper["id"])]
+        self.progress = Progress(len(pending))
+        print(f"{len(papers)} selected, {len(papers) - len(pending)} already done, {len(pending)} to go")
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for job in [pool.submit(self._resummarize, paper["id"], paper["title"]) for paper in pending]:
+                job.result()
+        return {**self.progress.snapshot(), "skipped": len(papers) - len(pending)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Regenerate summaries after a model or prompt change.")
+    parser.add_argument("--all", action="store_true", help="every completed paper")
+    parser.add_argument("--model", default=None, help="only summaries made by this model ('' for unknown)")
+    parser.add_argument("--prompt-version-below", type=int, default=None)
+    parser.add_argument("--summary-version-below", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=2, help="parallel summary calls")
+    parser.add_argument("--rpm", type=float, default=None, help="max summary requests per minute")
+    parser.add_argument("--tpm", type=float, default=None, help="max estimated tokens per minute")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="progress checkpoint (JSONL)")
+    parser.add_argument("--dry-run", action="store_true", help="list the selection and exit")
+    args = parser.parse_args()
+
+    init_db()
+    papers = select_papers(args.all, args.model, args.prompt_version_below, args.summary_version_below)
+    if args.dry_run:
+        for paper in papers:
+            print(f"#{paper['id']} {paper['title']}")
+        print(f"{len(papers)} papers would be resummarized with {MODEL_SUMMARY} (prompt v{SUMMARY_PROMPT_VERSION})")
+        return
+    checkpoint = Checkpoint(args.checkpoint or default_checkpoint_path())
+    result = Resummarizer(checkpoint, args.concurrency, args.rpm, args.tpm).run(papers)
+    print("done: " + ", ".join(f"{key}={value}" for key, value in result.items()))
+    print(f"checkpoint: {checkpoint.path}")
+
+
+if __name__ == "__main__":
+    main()
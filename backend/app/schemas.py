@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UploadPaperResponse(BaseModel):
@@ -19,6 +19,12 @@ class PaperListItem(BaseModel):
     created_at: datetime
 
 
+class NearDuplicate(BaseModel):
+    paper_id: int
+    title: str
+    similarity: float
+
+
 class PaperDetail(BaseModel):
     id: int
     title: str
@@ -28,10 +34,15 @@ class PaperDetail(BaseModel):
     summary_version: int
     summary_updated_at: datetime | None
     page_count: int | None = None
+    near_duplicates: list[NearDuplicate] = []
     created_at: datetime
     updated_at: datetime
 
 
+class ReuseSummaryIn(BaseModel):
+    source_id: int
+
+
 class ChatMessageIn(BaseModel):
     message: str
     update_summary: bool = False
@@ -42,11 +53,57 @@ class ChatMessageOut(BaseModel):
     role: str
     content: str
     source_hint: str | None
+    reply_to_id: int | None = None
     created_at: datetime
 
 
+class ChatHistoryPage(BaseModel):
+    messages: list[ChatMessageOut]
+    next_before: int | None = None
+
+
 class ChatReply(BaseModel):
     answer: ChatMessageOut
     summary: dict | None
     summary_version: int
     summary_updated_at: datetime | None
+
+
+class LibraryChatIn(BaseModel):
+    message: str
+    paper_ids: list[int] | None = None
+    max_papers: int = Field(default=5, ge=1, le=20)
+
+
+class LibraryCitation(BaseModel):
+    number: int
+    paper_id: int
+    title: str
+    pages: list[str]
+    cited: bool
+
+
+class LibraryChatReply(BaseModel):
+    answer: str
+    citations: list[LibraryCitation]
+
+
+class ProfileFunction(BaseModel):
+    function: str
+    calls: int
+    total_ms: float
+    cumulative_ms: float
+
+
+class ProfileCapture(BaseModel):
+    id: str
+    kind: str
+    captured_at: datetime
+    duration_ms: float
+    method: str | None = None
+    path: str | None = None
+    status_code: int | None = None
+    handler_ms: float | None = None
+    name: str | None = None
+    request_id: str | None = None
+    top_functions: list[ProfileFunction] = []
@@ -3,65 +3,130 @@ import json
 import os
 import re
 import sqlite3
+import threading
 from hashlib import sha256
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
-
-from pypdf import PdfReader
-from pypdf import PdfWriter
+from typing import TYPE_CHECKING, Any
 
+from . import jobs
 from .db import from_json, get_conn, to_json
+from .near_dup import MinHasher, find_near_duplicates_of, store_signature
 
-try:
+# pypdf and the OpenAI SDK are imported on first use: together they account for
+# most of the API process import time, and many requests never touch either.
+if TYPE_CHECKING:
     from openai import OpenAI
-except Exception:  # pragma: no cover
-    OpenAI = None
+    from pypdf import PdfReader
 
 MODEL_SUMMARY = os.getenv("OPENAI_SUMMARY_MODEL", "gpt-5.2-pro")
 MODEL_CHAT = os.getenv("OPENAI_CHAT_MODEL", "gpt-5.2-pro")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Bump when extraction/normalization output changes so stored text is rebuilt on refresh.
+EXTRACTOR_VERSION = 1
+PIPELINE_STAGES = ("extract", "chunk", "summarize")
+SUMMARY_INPUT_CHARS = 120000
+# Bump when the prompt in ``summarize_paper`` changes so ``resummarize`` picks up older summaries.
+SUMMARY_PROMPT_VERSION = 1
+# How long a job waits for the job it superseded; a cancelled LLM call closes its stream, so this is rarely reached.
+SUPERSEDE_WAIT_SECONDS = 30.0
 
 
 class ServiceError(Exception):
     pass
 
 
-def _get_openai_client() -> OpenAI:
-    if OpenAI is None:
-        raise ServiceError("OpenAI SDK is unavailable.")
+_openai_client: "OpenAI | None" = None
+_openai_client_lock = threading.Lock()
+
+
+def _get_openai_client() -> "OpenAI":
+    global _openai_client
+    if _openai_client is not None:
+        return _openai_client
     if not OPENAI_API_KEY:
         raise ServiceError("OPENAI_API_KEY is missing.")
-    return OpenAI(api_key=OPENAI_API_KEY)
+    with _openai_client_lock:
+        if _openai_client is None:
+            try:
+                from openai import OpenAI
+            except Exception as exc:  # pragma: no cover
+                raise ServiceError("OpenAI SDK is unavailable.") from exc
+            _openai_client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+    return _openai_client
+
+
+def _complete(model: str, prompt: str) -> str:
+    """Run a Responses API call and return its output text.
+
+    Inside a cancellable job the call is streamed, so cancelling the job can
+    close the connection mid-request instead of waiting for the full reply.
+    """
+    client = _get_openai_client()
+    token = jobs.current_token()
+    if token is None:
+        return client.responses.create(model=model, input=prompt).output_text
+
+    token.raise_if_cancelled()
+    stream = client.responses.create(model=model, input=prompt, stream=True)
+    unregister = token.on_cancel(stream.close)
+    parts: list[str] = []
+    final_text = None
+    try:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                parts.append(event.delta)
+            elif event.type == "response.completed":
+                final_text = event.response.output_text
+            elif event.type in ("response.failed", "error"):
+                raise ServiceError(f"Model request failed: {event.type}")
+    except Exception:
+        token.raise_if_cancelled()
+        raise
+    finally:
+        unregister()
+        stream.close()
+    token.raise_if_cancelled()
+    return final_text if final_text is not None else "".join(parts)
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def extract_pages_from_pdf(pdf_path: Path) -> list[tuple[int, str]]:
-    reader = PdfReader(str(pdf_path))
-    pages: list[tuple[int, str]] = []
+def open_pdf(pdf_path: Path) -> "PdfReader":
+    from pypdf import PdfReader
+
+    return PdfReader(str(pdf_path))
+
+
+def _clean_page_text(text: str) -> str:
+    text = text.replace("\r", "\n")
+    text = re.sub(r"[ \t]+", " ", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def iter_pdf_pages(pdf_path: Path) -> Iterator[tuple[int, str]]:
+    reader = open_pdf(pdf_path)
     for idx, page in enumerate(reader.pages, start=1):
-        text = page.extract_text() or ""
-        text = text.replace("\r", "\n")
-        text = re.sub(r"[ \t]+", " ", text)
-        clean = re.sub(r"\n{3,}", "\n\n", text).strip()
-        pages.append((idx, clean))
-    return pages
+        yield idx, _clean_page_text(page.extract_text() or "")
+
+
+def extract_pages_from_pdf(pdf_path: Path) -> list[tuple[int, str]]:
+    return list(iter_pdf_pages(pdf_path))
 
 
 def get_pdf_page_count(pdf_path: Path) -> int:
-    reader = PdfReader(str(pdf_path))
+    reader = open_pdf(pdf_path)
     return len(reader.pages)
 
 
-def render_single_page_pdf(pdf_path: Path, page_no: int) -> bytes:
-    reader = PdfReader(str(pdf_path))
-    total = len(reader.pages)
-    if page_no < 1 or page_no > total:
-        raise ValueError("page out of range")
+def render_pdf_page(reader: "PdfReader", page_no: int) -> bytes:
+    from pypdf import PdfWriter
+
     writer = PdfWriter()
     writer.add_page(reader.pages[page_no - 1])
     buffer = io.BytesIO()
@@ -69,6 +134,14 @@ def render_single_page_pdf(pdf_path: Path, page_no: int) -> bytes:
     return buffer.getvalue()
 
 
+def render_single_page_pdf(pdf_path: Path, page_no: int) -> bytes:
+    reader = open_pdf(pdf_path)
+    total = len(reader.pages)
+    if page_no < 1 or page_no > total:
+        raise ValueError("page out of range")
+    return render_pdf_page(reader, page_no)
+
+
 def infer_paper_title(fallback_title: str, pages: list[tuple[int, str]]) -> str:
     def _clean_line(raw: str) -> str:
         return re.sub(r"\s+", " ", raw).strip(" -_:\t")
@@ -142,11 +215,40 @@ def normalize_title(title: str) -> str:
     return re.sub(r"\s+", " ", normalized).strip()
 
 
+class ContentFingerprinter:
+    """Incremental form of ``compute_content_fingerprint``.
+
+    Feeding the pieces of a text in order yields the same digest as hashing
+    the whole text at once, because normalization works character by character.
+    """
+
+    def __init__(self, max_chars: int = 500000) -> None:
+        self._digest = sha256()
+        self._remaining = max_chars
+
+    def update(self, text: str) -> None:
+        if self._remaining <= 0:
+            return
+        normalized = re.sub(r"[^a-z0-9\u4e00-\u9fff\u3040-\u30ff]+", "", text.lower())[: self._remaining]
+        self._remaining -= len(normalized)
+        self._digest.update(normalized.encode("utf-8"))
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
 def compute_content_fingerprint(full_text: str) -> str:
-    normalized = re.sub(r"[^a-z0-9\u4e00-\u9fff\u3040-\u30ff]+", "", full_text.lower())
-    if len(normalized) > 500000:
-        normalized = normalized[:500000]
-    return sha256(normalized.encode("utf-8")).hexdigest()
+    fingerprinter = ContentFingerprinter()
+    fingerprinter.update(full_text)
+    return fingerprinter.hexdigest()
+
+
+def compute_file_sha256(path: Path) -> str:
+    digest = sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 def build_full_text(pages: Iterable[tuple[int, str]]) -> str:
@@ -208,7 +310,110 @@ def build_chunks(pages: list[tuple[int, str]]) -> list[dict[str, Any]]:
     return chunks
 
 
-def _trim_text(text: str, max_chars: int = 120000) -> str:
+def extract_paper_text(pdf_path: Path, fallback_title: str) -> dict[str, Any]:
+    """Run the CPU-bound text stages for one PDF; the result is picklable for process pools."""
+    pages = extract_pages_from_pdf(pdf_path)
+    full_text = build_full_text(pages)
+    title = infer_paper_title(fallback_title, pages)
+    minhasher = MinHasher()
+    for _, text in pages:
+        minhasher.update(text)
+    return {
+        "title": title,
+        "canonical_title": normalize_title(title),
+        "content_fingerprint": compute_content_fingerprint(full_text),
+        "full_text": full_text,
+        "chunks": build_chunks(pages),
+        "minhash": minhasher.digest(),
+    }
+
+
+class StreamingTextPipeline:
+    """Consume extracted pages one at a time.
+
+    Each ``feed`` returns that page's slice of ``full_text`` (same layout as
+    ``build_full_text``) and its chunks, so callers can flush them as they go.
+    Only the first pages (for title inference) and a prefix bounded by the
+    summary prompt size are retained.
+    """
+
+    def __init__(
+        self,
+        fallback_title: str,
+        title_pages: int = 2,
+        summary_chars: int = SUMMARY_INPUT_CHARS,
+        with_minhash: bool = True,
+    ) -> None:
+        self.fallback_title = fallback_title
+        self.page_count = 0
+        self._fingerprinter = ContentFingerprinter()
+        self._minhasher = MinHasher() if with_minhash else None
+        self._title_pages: list[tuple[int, str]] = []
+        self._title_page_limit = title_pages
+        self._summary_parts: list[str] = []
+        self._summary_remaining = summary_chars
+
+    def feed(self, page_no: int, text: str) -> tuple[str, list[dict[str, Any]]]:
+        part = f"[Page {page_no}]\n{text}"
+        if self.page_count:
+            part = "\n\n" + part
+        self.page_count += 1
+        self._fingerprinter.update(part)
+        if self._minhasher is not None:
+            self._minhasher.update(text)
+        if len(self._title_pages) < self._title_page_limit:
+            self._title_pages.append((page_no, text))
+        if self._summary_remaining > 0:
+            self._summary_parts.append(part[: self._summary_remaining])
+            self._summary_remaining -= len(self._summary_parts[-1])
+        return part, build_chunks([(page_no, text)])
+
+    def result(self) -> dict[str, Any]:
+        title = infer_paper_title(self.fallback_title, self._title_pages)
+        return {
+            "title": title,
+            "canonical_title": normalize_title(title),
+            "content_fingerprint": self._fingerprinter.hexdigest(),
+            "summary_text": "".join(self._summary_parts).strip(),
+            "page_count": self.page_count,
+            "minhash": self._minhasher.digest() if self._minhasher is not None else None,
+        }
+
+
+def _docinfo_title(reader: "PdfReader") -> str:
+    try:
+        title = (reader.metadata or {}).get("/Title") or ""
+    except Exception:
+        return ""
+    title = re.sub(r"\s+", " ", str(title)).strip()
+    # Producers often leave the source file name or a template name here.
+    if len(title) < 8 or re.search(r"\.(pdf|docx?|tex|dvi|ps)$", title, re.IGNORECASE):
+        return ""
+    if title.lower().startswith(("microsoft word", "untitled")):
+        return ""
+    return title
+
+
+def read_quick_metadata(pdf_path: Path, fallback_title: str, title_pages: int = 2) -> dict[str, Any]:
+    """Title, canonical title and page count from the first pages and the document info dictionary.
+
+    pypdf parses page content on demand, so only the first ``title_pages``
+    pages are decoded and the cost does not grow with the document. The
+    title is inferred from the page text the same way the full pipeline does
+    (``infer_paper_title``), then taken from the info dictionary, then from
+    ``fallback_title``.
+    """
+    reader = open_pdf(pdf_path)
+    page_count = len(reader.pages)
+    head = [
+        (page_no, _clean_page_text(reader.pages[page_no - 1].extract_text() or ""))
+        for page_no in range(1, min(title_pages, page_count) + 1)
+    ]
+    title = infer_paper_title("", head) or _docinfo_title(reader) or fallback_title.strip()
+    return {"title": title, "canonical_title": normalize_title(title), "page_count": page_count}
+
+
+def _trim_text(text: str, max_chars: int = SUMMARY_INPUT_CHARS) -> str:
     if len(text) <= max_chars:
         return text
     return text[:max_chars]
@@ -344,7 +549,6 @@ def _render_context(chunks: list[sqlite3.Row]) -> str:
 
 
 def summarize_paper(title: str, full_text: str) -> dict[str, Any]:
-    client = _get_openai_client()
     prompt = (
         "You are an expert research paper reader. Return JSON only with keys zh, en, ja. "
         "Use English source content as the primary basis for understanding and reasoning first, "
@@ -372,8 +576,7 @@ def summarize_paper(title: str, full_text: str) -> dict[str, Any]:
         f"{_trim_text(full_text)}"
     )
 
-    response = client.responses.create(model=MODEL_SUMMARY, input=prompt)
-    data = _parse_json_from_text(response.output_text)
+    data = _parse_json_from_text(_complete(MODEL_SUMMARY, prompt))
     normalized = _normalize_summary_shape(data, title)
     _assert_summary_complete(normalized)
     return normalized
@@ -383,7 +586,6 @@ def generate_chat_reply(paper: sqlite3.Row, user_message: str) -> tuple[str, str
     summary = from_json(paper["summary_json"]) or {}
     chunks = retrieve_relevant_chunks(paper["id"], user_message, limit=6)
     source_hint = format_source_hint(chunks)
-    client = _get_openai_client()
     prompt = (
         "You are a research assistant for scientific papers. "
         "Use English source content as the primary basis for understanding and reasoning first. "
@@ -407,8 +609,7 @@ def generate_chat_reply(paper: sqlite3.Row, user_message: str) -> tuple[str, str
         f"User question: {user_message}"
     )
 
-    response = client.responses.create(model=MODEL_CHAT, input=prompt)
-    answer = response.output_text.strip()
+    answer = _complete(MODEL_CHAT, prompt).strip()
     return answer, source_hint
 
 
@@ -417,7 +618,6 @@ def update_summary_from_discussion(
 ) -> tuple[dict[str, Any], int, str]:
     current_summary = _normalize_summary_shape(from_json(paper["summary_json"]), paper["title"])
     now = now_iso()
-    client = _get_openai_client()
     prompt = (
         "You are updating an existing multilingual paper summary after a user discussion. "
         "Use English source content as the primary basis for understanding and reasoning first, "
@@ -443,8 +643,7 @@ def update_summary_from_discussion(
         f"Assistant answer: {assistant_answer}\n"
         f"Source hint: {source_hint or 'N/A'}\n"
     )
-    response = client.responses.create(model=MODEL_SUMMARY, input=prompt)
-    parsed = _parse_json_from_text(response.output_text)
+    parsed = _parse_json_from_text(_complete(MODEL_SUMMARY, prompt))
     merged = _normalize_summary_shape(parsed, paper["title"])
     _assert_summary_complete(merged)
 
@@ -468,21 +667,245 @@ def update_summary_from_discussion(
     return merged, row["summary_version"], row["summary_updated_at"]
 
 
+def _insert_chunks(conn: sqlite3.Connection, paper_id: int, chunks: list[dict[str, Any]]) -> None:
+    created_at = now_iso()
+    conn.executemany(
+        """
+        INSERT INTO chunks (paper_id, page_start, page_end, content, created_at)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(paper_id, chunk["page_start"], chunk["page_end"], chunk["content"], created_at) for chunk in chunks],
+    )
+
+
 def _replace_chunks(conn: sqlite3.Connection, paper_id: int, chunks: list[dict[str, Any]]) -> None:
     conn.execute("DELETE FROM chunks WHERE paper_id = ?", (paper_id,))
-    for chunk in chunks:
+    _insert_chunks(conn, paper_id, chunks)
+
+
+def _clear_staging(conn: sqlite3.Connection, paper_id: int) -> None:
+    conn.execute("DELETE FROM staged_text WHERE paper_id = ?", (paper_id,))
+    conn.execute("DELETE FROM staged_chunks WHERE paper_id = ?", (paper_id,))
+
+
+def stream_extract_to_db(paper_id: int, pdf_path: Path, fallback_title: str, batch_pages: int = 16) -> dict[str, Any]:
+    """Extract a PDF page by page, staging full text and chunks every ``batch_pages`` pages.
+
+    Peak memory is bounded by the batch rather than the document; see
+    ``StreamingTextPipeline`` for what is retained. The staged output
+    replaces the paper's text and chunks in a single transaction once the
+    whole PDF is read, so a failed or cancelled run keeps the old ones.
+    """
+    pipeline = StreamingTextPipeline(fallback_title)
+    text_parts: list[str] = []
+    chunk_batch: list[dict[str, Any]] = []
+    token = jobs.current_token()
+    seq = 0
+
+    def _flush() -> None:
+        nonlocal seq
+        if token is not None:
+            token.raise_if_cancelled()
+        created_at = now_iso()
+        with get_conn() as conn:
+            conn.execute(
+                "INSERT INTO staged_text (paper_id, seq, part) VALUES (?, ?, ?)", (paper_id, seq, "".join(text_parts))
+            )
+            conn.executemany(
+                """
+                INSERT INTO staged_chunks (paper_id, page_start, page_end, content, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(paper_id, c["page_start"], c["page_end"], c["content"], created_at) for c in chunk_batch],
+            )
+        seq += 1
+        text_parts.clear()
+        chunk_batch.clear()
+
+    with get_conn() as conn:
+        _clear_staging(conn, paper_id)
+    try:
+        for page_no, text in iter_pdf_pages(pdf_path):
+            if token is not None:
+                token.raise_if_cancelled()
+            part, chunks = pipeline.feed(page_no, text)
+            text_parts.append(part)
+            chunk_batch.extend(chunks)
+            if len(text_parts) >= batch_pages:
+                _flush()
+        _flush()
+        with get_conn() as conn:
+            conn.execute("DELETE FROM chunks WHERE paper_id = ?", (paper_id,))
+            conn.execute(
+                """
+                INSERT INTO chunks (paper_id, page_start, page_end, content, created_at)
+                SELECT paper_id, page_start, page_end, content, created_at
+                FROM staged_chunks WHERE paper_id = ? ORDER BY id
+                """,
+                (paper_id,),
+            )
+            conn.execute(
+                """
+                UPDATE papers
+                SET full_text = COALESCE(
+                    (SELECT group_concat(part, '') FROM (SELECT part FROM staged_text WHERE paper_id = ? ORDER BY seq)),
+                    ''
+                )
+                WHERE id = ?
+                """,
+                (paper_id, paper_id),
+            )
+            _clear_staging(conn, paper_id)
+    except BaseException:
+        with get_conn() as conn:
+            _clear_staging(conn, paper_id)
+        raise
+    return pipeline.result()
+
+
+def is_placeholder_summary(summary_json: str | None) -> bool:
+    if not summary_json:
+        return True
+    try:
+        payload = json.loads(summary_json)
+        text = json.dumps(payload, ensure_ascii=False).lower()
+    except Exception:
+        text = str(summary_json).lower()
+
+    markers = [
+        "no model is configured",
+        "openai_api_key",
+    ]
+    return any(marker in text for marker in markers)
+
+
+def has_usable_summary(summary_json: str | None) -> bool:
+    """True for a real summary; False for none, a placeholder, or the error object left by a failed run."""
+    summary = from_json(summary_json)
+    return isinstance(summary, dict) and "error" not in summary and not is_placeholder_summary(summary_json)
+
+
+def store_summary(conn: sqlite3.Connection, paper_id: int, summary: dict[str, Any], only_completed: bool = False) -> bool:
+    """Save a freshly generated summary, recording the model and prompt version that produced it.
+
+    The paper becomes ``completed``. With ``only_completed`` the summary is stored only if the
+    paper still is, so a paper that started reprocessing or failed meanwhile keeps its status.
+    Returns whether a row was updated.
+    """
+    now = now_iso()
+    cursor = conn.execute(
+        f"""
+        UPDATE papers
+        SET status = ?,
+            summary_json = ?,
+            summary_version = COALESCE(summary_version, 0) + 1,
+            summary_updated_at = ?,
+            summary_model = ?,
+            summary_prompt_version = ?,
+            updated_at = ?
+        WHERE id = ? {"AND status = 'completed'" if only_completed else ""}
+        """,
+        ("completed", to_json(summary), now, MODEL_SUMMARY, SUMMARY_PROMPT_VERSION, now, paper_id),
+    )
+    return cursor.rowcount > 0
+
+
+def _mark_failed(paper_id: int, exc: Exception) -> None:
+    with get_conn() as conn:
         conn.execute(
-            """
-            INSERT INTO chunks (paper_id, page_start, page_end, content, created_at)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (paper_id, chunk["page_start"], chunk["page_end"], chunk["content"], now_iso()),
+            "UPDATE papers SET status = ?, updated_at = ?, summary_json = ? WHERE id = ?",
+            ("failed", now_iso(), to_json({"error": str(exc)}), paper_id),
         )
 
 
-def process_paper(paper_id: int) -> None:
+def _mark_cancelled(paper_id: int, token: jobs.CancelToken) -> None:
+    if jobs.is_superseded(paper_id, token):
+        return  # the newer job owns the status now
     with get_conn() as conn:
-        paper = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        conn.execute(
+            "UPDATE papers SET status = ?, updated_at = ? WHERE id = ?",
+            ("cancelled", now_iso(), paper_id),
+        )
+
+
+def plan_stages(paper: sqlite3.Row, file_sha256: str | None) -> tuple[str, ...]:
+    """Return the stages a reprocess actually needs, given the current source file hash."""
+    source_unchanged = (
+        bool(paper["has_text"])
+        and file_sha256 is not None
+        and paper["file_sha256"] == file_sha256
+        and paper["extractor_version"] == EXTRACTOR_VERSION
+    )
+    if not source_unchanged:
+        return PIPELINE_STAGES
+    with get_conn() as conn:
+        has_chunks = conn.execute("SELECT 1 FROM chunks WHERE paper_id = ? LIMIT 1", (paper["id"],)).fetchone()
+    return ("summarize",) if has_chunks else ("chunk", "summarize")
+
+
+def normalize_stages(stages: Iterable[str]) -> tuple[str, ...]:
+    requested = set(stages)
+    if not requested:
+        raise ServiceError(f"No pipeline stage given; choose from {', '.join(PIPELINE_STAGES)}.")
+    unknown = requested - set(PIPELINE_STAGES)
+    if unknown:
+        raise ServiceError(f"Unknown pipeline stage(s): {', '.join(sorted(unknown))}")
+    # Chunks are derived from the extracted pages, so fresh text always means fresh chunks.
+    if "extract" in requested:
+        requested.add("chunk")
+    return tuple(stage for stage in PIPELINE_STAGES if stage in requested)
+
+
+def process_paper(
+    paper_id: int,
+    stages: Iterable[str] | None = None,
+    check_near_duplicates: bool = False,
+    token: jobs.CancelToken | None = None,
+) -> None:
+    """Run the ingest pipeline for a paper.
+
+    With ``stages=None`` the stages are planned automatically: an unchanged
+    source (same file hash and extractor version) reuses the stored text and
+    chunks and only regenerates the summary. Explicit stages are any of
+    ``extract``, ``chunk`` and ``summarize``.
+
+    With ``check_near_duplicates`` a paper that has never been summarized
+    stops before the summary call when a near-duplicate with a summary
+    exists; it is left as ``pending_summary`` so the user can reuse that
+    summary or ask for a fresh one.
+
+    ``token`` is the cancellation token registered when the job was queued;
+    without one a new job is registered here. A cancelled job stops at the
+    next page or stage boundary and leaves the paper ``cancelled``, unless a
+    newer job superseded it; that newer job waits for it to finish first.
+    """
+    token = token or jobs.start(paper_id)
+    token.mark_started()
+    handle = jobs.bind(token)
+    try:
+        jobs.wait_for_previous(token, SUPERSEDE_WAIT_SECONDS)
+        _run_pipeline(paper_id, stages, check_near_duplicates, token)
+    finally:
+        jobs.unbind(handle)
+        jobs.finish(paper_id, token)
+
+
+def _run_pipeline(
+    paper_id: int, stages: Iterable[str] | None, check_near_duplicates: bool, token: jobs.CancelToken
+) -> None:
+    if token.cancelled:
+        _mark_cancelled(paper_id, token)
+        return
+    with get_conn() as conn:
+        # Avoid loading full_text here: the extract stage streams it and summarization only needs a prefix.
+        paper = conn.execute(
+            """
+            SELECT id, title, filepath, file_sha256, extractor_version, summary_version, summary_json,
+                   COALESCE(full_text, '') != '' AS has_text
+            FROM papers WHERE id = ?
+            """,
+            (paper_id,),
+        ).fetchone()
         if not paper:
             return
         conn.execute(
@@ -491,33 +914,167 @@ def process_paper(paper_id: int) -> None:
         )
 
     try:
-        pages = extract_pages_from_pdf(Path(paper["filepath"]))
-        full_text = build_full_text(pages)
-        canonical_title = normalize_title(infer_paper_title(paper["title"], pages))
-        fingerprint = compute_content_fingerprint(full_text)
-        chunks = build_chunks(pages)
-        summary = summarize_paper(paper["title"], full_text)
-
-        with get_conn() as conn:
-            _replace_chunks(conn, paper_id, chunks)
-            conn.execute(
-                """
-                UPDATE papers
-                SET status = ?,
-                    full_text = ?,
-                    canonical_title = ?,
-                    content_fingerprint = ?,
-                    summary_json = ?,
-                    summary_version = COALESCE(summary_version, 0) + 1,
-                    summary_updated_at = ?,
-                    updated_at = ?
-                WHERE id = ?
-                """,
-                ("completed", full_text, canonical_title, fingerprint, to_json(summary), now_iso(), now_iso(), paper_id),
-            )
+        pdf_path = Path(paper["filepath"]) if paper["filepath"] else None
+        has_pdf = pdf_path is not None and pdf_path.is_file()
+        # Hashing reads the whole PDF; explicit stages only need it when they re-extract.
+        # Without the PDF (a snapshot imported without it) the stored hash stands in, so stored text is reused.
+        file_sha256 = None
+        if stages is None:
+            file_sha256 = compute_file_sha256(pdf_path) if has_pdf else paper["file_sha256"]
+        planned = normalize_stages(stages) if stages is not None else plan_stages(paper, file_sha256)
+        if not paper["has_text"] and "extract" not in planned:
+            planned = normalize_stages((*planned, "extract"))
+        if "extract" in planned and not has_pdf:
+            if not paper["has_text"]:
+                raise ServiceError("The PDF file for this paper is missing and no text is stored.")
+            planned = tuple(stage for stage in planned if stage != "extract")  # rebuild chunks from stored text
+
+        summary_text = None
+        if "extract" in planned:
+            token.raise_if_cancelled()
+            if file_sha256 is None:
+                file_sha256 = compute_file_sha256(pdf_path)
+            extracted = stream_extract_to_db(paper_id, pdf_path, paper["title"])
+            summary_text = extracted["summary_text"]
+            with get_conn() as conn:
+                conn.execute(
+                    """
+                    UPDATE papers
+                    SET canonical_title = ?,
+                        content_fingerprint = ?,
+                        file_sha256 = ?,
+                        extractor_version = ?,
+                        updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        extracted["canonical_title"],
+                        extracted["content_fingerprint"],
+                        file_sha256,
+                        EXTRACTOR_VERSION,
+                        now_iso(),
+                        paper_id,
+                    ),
+                )
+                store_signature(conn, paper_id, extracted["minhash"])
+        elif "chunk" in planned:
+            token.raise_if_cancelled()
+            with get_conn() as conn:
+                row = conn.execute("SELECT full_text FROM papers WHERE id = ?", (paper_id,)).fetchone()
+                _replace_chunks(conn, paper_id, build_chunks(parse_pages_from_full_text(row["full_text"])))
+
+        if "summarize" in planned and check_near_duplicates and not paper["summary_version"]:
+            with get_conn() as conn:
+                if _reuse_identical_content(conn, paper_id):
+                    return
+                if find_near_duplicates_of(conn, paper_id):
+                    planned = tuple(stage for stage in planned if stage != "summarize")
+
+        if "summarize" in planned:
+            if summary_text is None:
+                with get_conn() as conn:
+                    row = conn.execute(
+                        "SELECT substr(full_text, 1, ?) AS head FROM papers WHERE id = ?",
+                        (SUMMARY_INPUT_CHARS, paper_id),
+                    ).fetchone()
+                summary_text = row["head"]
+            token.raise_if_cancelled()
+            summary = summarize_paper(paper["title"], summary_text)
+            token.raise_if_cancelled()
+            with get_conn() as conn:
+                store_summary(conn, paper_id, summary)
+        else:
+            with get_conn() as conn:
+                status = "completed" if has_usable_summary(paper["summary_json"]) else "pending_summary"
+                conn.execute(
+                    "UPDATE papers SET status = ?, updated_at = ? WHERE id = ?",
+                    (status, now_iso(), paper_id),
+                )
+    except jobs.JobCancelled:
+        _mark_cancelled(paper_id, token)
     except Exception as exc:  # pragma: no cover
-        with get_conn() as conn:
-            conn.execute(
-                "UPDATE papers SET status = ?, updated_at = ?, summary_json = ? WHERE id = ?",
-                ("failed", now_iso(), to_json({"error": str(exc)}), paper_id),
-            )
+        if token.cancelled:
+            _mark_cancelled(paper_id, token)
+        else:
+            _mark_failed(paper_id, exc)
+
+
+def _reuse_identical_content(conn: sqlite3.Connection, paper_id: int) -> bool:
+    """Copy the summary of a completed paper with the same content fingerprint, if there is one.
+
+    Upload only reads the first pages, so a re-export of an existing paper
+    (different bytes, same text) is recognised here, after extraction.
+    """
+    source = conn.execute(
+        """
+        SELECT other.id, other.summary_json, other.summary_model, other.summary_prompt_version FROM papers AS paper
+        JOIN papers AS other ON other.content_fingerprint = paper.content_fingerprint
+        WHERE paper.id = ? AND other.id != paper.id AND other.status = 'completed'
+        ORDER BY other.id DESC
+        LIMIT 1
+        """,
+        (paper_id,),
+    ).fetchone()
+    if not source or is_placeholder_summary(source["summary_json"]):
+        return False
+    now = now_iso()
+    conn.execute(
+        """
+        UPDATE papers
+        SET status = ?,
+            summary_json = ?,
+            summary_version = COALESCE(summary_version, 0) + 1,
+            summary_updated_at = ?,
+            summary_model = ?,
+            summary_prompt_version = ?,
+            updated_at = ?
+        WHERE id = ?
+        """,
+        (
+            "completed",
+            source["summary_json"],
+            now,
+            source["summary_model"],
+            source["summary_prompt_version"],
+            now,
+            paper_id,
+        ),
+    )
+    return True
+
+
+def reuse_summary(paper_id: int, source_id: int) -> None:
+    """Copy the summary of ``source_id`` (typically a near-duplicate) onto ``paper_id``."""
+    now = now_iso()
+    with get_conn() as conn:
+        source = conn.execute(
+            """
+            SELECT summary_json, status, summary_version, summary_model, summary_prompt_version
+            FROM papers WHERE id = ?
+            """,
+            (source_id,),
+        ).fetchone()
+        if not source or source["status"] != "completed" or not source["summary_version"]:
+            raise ServiceError("Source paper has no completed summary to reuse.")
+        conn.execute(
+            """
+            UPDATE papers
+            SET status = ?,
+                summary_json = ?,
+                summary_version = COALESCE(summary_version, 0) + 1,
+                summary_updated_at = ?,
+                summary_model = ?,
+                summary_prompt_version = ?,
+                updated_at = ?
+            WHERE id = ?
+            """,
+            (
+                "completed",
+                source["summary_json"],
+                now,
+                source["summary_model"],
+                source["summary_prompt_version"],
+                now,
+                paper_id,
+            ),
+        )
@@ -0,0 +1,262 @@
+"""Online backups and portable library snapshots.
+
+    python -m backend.app.snapshot backup /backups/paper_reader-20261019.db
+    python -m backend.app.snapshot export /backups/library.jsonl.gz --include-pdfs
+    python -m backend.app.snapshot import /backups/library.jsonl.gz
+
+``backup`` uses SQLite's online backup API and copies a bounded number of
+pages per step. Readers are never blocked, and writers wait at most one
+step. ``export`` first takes such a backup, then streams papers, summaries,
+messages and MinHash signatures from it as gzip-compressed JSON lines. With
+``--include-pdfs`` it also streams the PDF blobs. Legacy papers stored
+before file hashes existed are hashed on export, so their PDFs travel too.
+
+Chunks are not written to the export. They are a pure function of
+``full_text`` (``build_chunks``), so ``import`` rebuilds them locally. An
+import therefore needs no extraction and no LLM calls.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from . import db
+from .blob_store import add_ref, blob_path, store_bytes
+from .near_dup import _unpack, store_signature
+from .services import _insert_chunks, build_chunks, compute_file_sha256, now_iso, parse_pages_from_full_text
+
+SNAPSHOT_FORMAT = 1
+PAPER_COLUMNS = (
+    "id",
+    "title",
+    "canonical_title",
+    "content_fingerprint",
+    "file_sha256",
+    "extractor_version",
+    "filename",
+    "status",
+    "summary_json",
+    "full_text",
+    "summary_version",
+    "summary_updated_at",
+    "summary_model",
+    "summary_prompt_version",
+    "created_at",
+    "updated_at",
+)
+MESSAGE_COLUMNS = ("id", "role", "content", "source_hint", "reply_to_id", "created_at")
+IMPORT_BATCH = 200
+
+
+def backup_database(
+    dest: Path,
+    pages_per_step: int = 1024,
+    sleep: float = 0.01,
+    progress: Callable[[int, int], None] | None = None,
+) -> Path:
+    """Copy the live database to ``dest`` without stopping the service."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    src = sqlite3.connect(db.DB_PATH)
+    dst = sqlite3.connect(tmp)
+    try:
+        src.backup(
+            dst,
+            pages=pages_per_step,
+            progress=(lambda status, remaining, total: progress(total - remaining, total)) if progress else None,
+            sleep=sleep,
+        )
+        if dst.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            raise RuntimeError("backup failed its integrity check")
+    finally:
+        dst.close()
+        src.close()
+    os.replace(tmp, dest)
+    return dest
+
+
+def _write(stream: IO[str], record: dict[str, Any]) -> None:
+    stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+    stream.write("\n")
+
+
+def _export_from(conn: sqlite3.Connection, out: Path, include_pdfs: bool) -> dict[str, int]:
+    counts = {"papers": 0, "messages": 0, "blobs": 0}
+    exported_blobs: set[str] = set()
+    with gzip.open(out, "wt", encoding="utf-8", compresslevel=6) as stream:
+        _write(stream, {"type": "header", "format": SNAPSHOT_FORMAT, "exported_at": now_iso()})
+        papers = conn.execute(f"SELECT {', '.join(PAPER_COLUMNS)}, filepath FROM papers ORDER BY id")
+        for paper in papers:
+            sha = paper["file_sha256"]
+            pdf_path = Path(paper["filepath"]) if paper["filepath"] else None
+            has_pdf = pdf_path is not None and pdf_path.is_file()
+            if sha is None and has_pdf:
+                sha = compute_file_sha256(pdf_path)  # legacy row from before file hashes were stored
+            if include_pdfs and sha and sha not in exported_blobs and has_pdf:
+                data = pdf_path.read_bytes()
+                _write(stream, {"type": "blob", "sha256": sha, "data": base64.b64encode(data).decode("ascii")})
+                exported_blobs.add(sha)
+                counts["blobs"] += 1
+
+            record = {"type": "paper", **{column: paper[column] for column in PAPER_COLUMNS}}
+            record["file_sha256"] = sha
+            signature = conn.execute(
+                "SELECT signature FROM minhash_signatures WHERE paper_id = ?", (paper["id"],)
+            ).fetchone()
+            record["minhash"] = base64.b64encode(signature["signature"]).decode("ascii") if signature else None
+            record["messages"] = [
+                [row[column] for column in MESSAGE_COLUMNS]
+                for row in conn.execute(
+                    f"SELECT {', '.join(MESSAGE_COLUMNS)} FROM messages WHERE paper_id = ? ORDER BY id",
+                    (paper["id"],),
+                )
+            ]
+            _write(stream, record)
+            counts["papers"] += 1
+            counts["messages"] += len(record["messages"])
+    return counts
+
+
+def export_library(out: Path, include_pdfs: bool = False) -> dict[str, int]:
+    """Export from a fresh online backup, so the live database is never held open for the whole export."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="paperreader-export-") as tmp_dir:
+        snapshot = backup_database(Path(tmp_dir) / "snapshot.db")
+        conn = sqlite3.connect(snapshot)
+        conn.row_factory = sqlite3.Row
+        try:
+            return _export_from(conn, out, include_pdfs)
+        finally:
+            conn.close()
+
+
+def _read_records(path: Path) -> Iterator[dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _already_present(conn: sqlite3.Connection, record: dict[str, Any], before_id: int) -> bool:
+    """Whether a paper that existed before this import matches ``record``.
+
+    Matched by PDF hash, else by content fingerprint, else by file name and creation time.
+    Papers added earlier in the same import are not compared, so an export holding two
+    papers with the same PDF restores both.
+    """
+    if record["file_sha256"]:
+        clause, params = "file_sha256 = ?", (record["file_sha256"],)
+    elif record.get("content_fingerprint"):
+        clause, params = "content_fingerprint = ?", (record["content_fingerprint"],)
+    else:
+        clause, params = "filename = ? AND created_at = ?", (record["filename"], record["created_at"])
+    row = conn.execute(f"SELECT 1 FROM papers WHERE {clause} AND id <= ? LIMIT 1", (*params, before_id)).fetchone()
+    return row is not None
+
+
+def _import_paper(conn: sqlite3.Connection, record: dict[str, Any], before_id: int) -> int | None:
+    if _already_present(conn, record, before_id):
+        return None  # already in this library
+    sha = record["file_sha256"]
+
+    status = record["status"]
+    if status in ("queued", "processing"):
+        status = "cancelled"  # exported mid-flight; re-run with refresh-summary
+    values = {column: record.get(column) for column in PAPER_COLUMNS if column != "id"}
+    values["status"] = status
+    values["filepath"] = str(blob_path(sha)) if sha else None
+    columns = list(values)
+    paper_id = conn.execute(
+        f"INSERT INTO papers ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+        [values[column] for column in columns],
+    ).lastrowid
+    if sha:
+        add_ref(conn, sha)
+    if record["full_text"]:
+        _insert_chunks(conn, paper_id, build_chunks(parse_pages_from_full_text(record["full_text"])))
+    if record["minhash"]:
+        store_signature(conn, paper_id, _unpack(base64.b64decode(record["minhash"])))
+
+    message_ids: dict[int, int] = {}
+    for old_id, role, content, source_hint, reply_to_id, created_at in record["messages"]:
+        message_ids[old_id] = conn.execute(
+            """
+            INSERT INTO messages (paper_id, role, content, source_hint, reply_to_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (paper_id, role, content, source_hint, message_ids.get(reply_to_id), created_at),
+        ).lastrowid
+    return paper_id
+
+
+def import_library(path: Path) -> dict[str, int]:
+    """Load an export into the current library; papers it already holds are skipped (see ``_already_present``)."""
+    db.init_db()
+    counts = {"papers": 0, "skipped": 0, "messages": 0, "blobs": 0}
+    records = _read_records(path)
+    header = next(records, None)
+    if not header or header.get("type") != "header" or header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a paperReader snapshot (format {SNAPSHOT_FORMAT})")
+
+    conn = sqlite3.connect(db.DB_PATH)
+    try:
+        before_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM papers").fetchone()[0]
+        pending = 0
+        for record in records:
+            if record["type"] == "blob":
+                store_bytes(record["sha256"], base64.b64decode(record["data"]))
+                counts["blobs"] += 1
+            elif record["type"] == "paper":
+                if _import_paper(conn, record, before_id) is None:
+                    counts["skipped"] += 1
+                else:
+                    counts["papers"] += 1
+                    counts["messages"] += len(record["messages"])
+                pending += 1
+                if pending >= IMPORT_BATCH:
+                    conn.commit()
+                    pending = 0
+        conn.commit()
+    finally:
+        conn.close()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Back up, export and import the paper library.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backup = commands.add_parser("backup", help="online copy of the SQLite database")
+    backup.add_argument("dest", type=Path)
+    backup.add_argument("--pages-per-step", type=int, default=1024)
+    export = commands.add_parser("export", help="write a compressed JSONL snapshot")
+    export.add_argument("out", type=Path)
+    export.add_argument("--include-pdfs", action="store_true")
+    restore = commands.add_parser("import", help="load a snapshot into this library")
+    restore.add_argument("path", type=Path)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "backup":
+        db.init_db()
+        backup_database(args.dest, pages_per_step=args.pages_per_step)
+        print(f"backed up {db.DB_PATH} -> {args.dest}")
+    elif args.command == "export":
+        db.init_db()
+        counts = export_library(args.out, include_pdfs=args.include_pdfs)
+        print(f"exported {counts} -> {args.out} ({args.out.stat().st_size / 1e6:.1f} MB)")
+    else:
+        print(f"imported {import_library(args.path)}")
+    print(f"took {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
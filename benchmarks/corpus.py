@@ -0,0 +1,235 @@
+"""Synthetic text-PDF corpus for benchmarking the text pipeline.
+
+PDFs are assembled by hand so the generator has no dependency beyond the
+standard library. Latin text uses the built-in Helvetica font; Chinese and
+Japanese lines use an Identity-H CID font with a ToUnicode map, which is
+enough for pypdf to extract the original characters.
+"""
+
+import argparse
+import io
+import random
+import zlib
+from pathlib import Path
+
+LANGUAGES = ("en", "zh", "ja")
+
+_EN_TITLES = [
+    "Sparse Mixture Routing for Efficient Long Context Language Modeling",
+    "Contrastive Pretraining of Molecular Graphs with Geometric Priors",
+    "Robust Policy Optimization under Partially Observed Dynamics",
+    "Diffusion Based Layout Generation for Scientific Figures",
+]
+_EN_SENTENCES = [
+    "We propose a retrieval augmented method that improves factual accuracy on long documents.",
+    "Our model reduces inference latency by routing tokens to a small subset of experts.",
+    "Experiments on three benchmarks show consistent gains over strong baselines.",
+    "The ablation study indicates that the auxiliary loss is critical for stability.",
+    "We analyze failure cases and find that most errors come from ambiguous references.",
+    "Training uses a cosine schedule with warmup over the first two thousand steps.",
+    "The dataset contains forty thousand annotated samples collected from public sources.",
+    "Limitations include sensitivity to tokenizer choice and the cost of pretraining.",
+    "Table 2 reports accuracy, recall and calibration error for every configuration.",
+    "Compared with prior work, the proposed objective converges in fewer epochs.",
+]
+_ZH_SENTENCES = [
+    "本文提出了一种基于检索增强的方法，用于提升长文档上的事实准确性。",
+    "实验结果表明，该模型在三个基准数据集上均优于现有方法。",
+    "消融实验显示辅助损失对训练稳定性至关重要。",
+    "我们分析了失败案例，发现大部分错误来自指代歧义。",
+    "该方法显著降低了推理延迟，同时保持了较高的精度。",
+    "数据集包含四万条人工标注样本，来源于公开资料。",
+]
+_JA_SENTENCES = [
+    "本研究では長文書における事実の正確性を高める検索拡張手法を提案する。",
+    "三つのベンチマークにおいて既存手法を一貫して上回る結果が得られた。",
+    "アブレーション実験により補助損失が学習の安定性に重要であることを示した。",
+    "失敗例を分析したところ、多くの誤りは曖昧な参照に起因していた。",
+    "提案手法は推論遅延を大幅に削減しつつ高い精度を維持する。",
+    "データセットは公開資料から収集した四万件の注釈付きサンプルを含む。",
+]
+_SENTENCES = {"en": _EN_SENTENCES, "zh": _ZH_SENTENCES, "ja": _JA_SENTENCES}
+_EN_WRAP = 95
+_CJK_WRAP = 48
+
+
+def parse_language_mix(raw: str) -> dict[str, float]:
+    """Parse ``"en:0.6,zh:0.2,ja:0.2"`` (or just ``"en"``) into normalized weights."""
+    weights: dict[str, float] = {}
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lang, _, weight = part.partition(":")
+        lang = lang.strip().lower()
+        if lang not in LANGUAGES:
+            raise ValueError(f"Unsupported language: {lang}")
+        weights[lang] = float(weight) if weight else 1.0
+    total = sum(weights.values())
+    if not weights or total <= 0:
+        raise ValueError("Language mix must contain at least one positive weight.")
+    return {lang: value / total for lang, value in weights.items()}
+
+
+def _wrap(sentence: str, width: int) -> list[str]:
+    if " " not in sentence:
+        return [sentence[i : i + width] for i in range(0, len(sentence), width)]
+    lines: list[str] = []
+    current = ""
+    for word in sentence.split():
+        candidate = f"{current} {word}".strip()
+        if len(candidate) > width and current:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def generate_page_lines(
+    pages: int, mix: dict[str, float], seed: int = 0, lines_per_page: int = 48
+) -> list[list[str]]:
+    """Return the text lines of every page, starting with a paper-like front matter."""
+    rng = random.Random(seed)
+    langs = list(mix)
+    weights = [mix[lang] for lang in langs]
+    front = [
+        rng.choice(_EN_TITLES),
+        "Alice Chen, Bob Tanaka, and Carol Li",
+        "Department of Computer Science, Example University",
+        "Abstract",
+    ]
+    result: list[list[str]] = []
+    for page_no in range(1, pages + 1):
+        lines = list(front) if page_no == 1 else []
+        while len(lines) < lines_per_page:
+            lang = rng.choices(langs, weights=weights)[0]
+            width = _EN_WRAP if lang == "en" else _CJK_WRAP
+            lines.extend(_wrap(rng.choice(_SENTENCES[lang]), width))
+        result.append(lines[:lines_per_page])
+    return result
+
+
+def _to_unicode_cmap(chars: set[str]) -> bytes:
+    lines = [
+        "/CIDInit /ProcSet findresource begin",
+        "12 dict begin",
+        "begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def",
+        "/CMapType 2 def",
+        "1 begincodespacerange",
+        "<0000> <FFFF>",
+        "endcodespacerange",
+    ]
+    # Codes are the UTF-16 units themselves, so each used character maps onto itself.
+    entries = [f"<{ord(ch):04X}> <{ord(ch):04X}>" for ch in sorted(chars)]
+    for start in range(0, len(entries), 100):
+        block = entries[start : start + 100]
+        lines.append(f"{len(block)} beginbfchar")
+        lines.extend(block)
+        lines.append("endbfchar")
+    lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+    return "\n".join(lines).encode("ascii")
+
+
+def _stream(data: bytes, compress: bool = True) -> bytes:
+    if compress:
+        data = zlib.compress(data)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream"
+    return b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+
+def _text_op(line: str) -> str:
+    if line.isascii():
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return f"/F1 10 Tf ({escaped}) Tj T*"
+    return f"/F2 10 Tf <{line.encode('utf-16-be').hex().upper()}> Tj T*"
+
+
+def build_pdf(pages: list[list[str]]) -> bytes:
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")
+    pages_id = add(b"")
+    latin_font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    cjk_chars = {ch for lines in pages for line in lines if not line.isascii() for ch in line}
+    cmap_id = add(_stream(_to_unicode_cmap(cjk_chars), compress=False))
+    cid_font = add(
+        b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 1000 >>"
+    )
+    cjk_font = add(
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /Identity-H "
+        b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (cid_font, cmap_id)
+    )
+
+    kids: list[int] = []
+    for lines in pages:
+        ops = ["BT", "14 TL", "40 800 Td", *(_text_op(line) for line in lines), "ET"]
+        content_id = add(_stream("\n".join(ops).encode("ascii")))
+        kids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+                b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages_id, latin_font, cjk_font, content_id)
+            )
+        )
+
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids),
+        len(kids),
+    )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    offsets: list[int] = []
+    for obj_id, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+    xref_at = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog_id, xref_at)
+    )
+    return out.getvalue()
+
+
+def generate_paper_pdf(pages: int = 10, mix: dict[str, float] | None = None, seed: int = 0) -> bytes:
+    return build_pdf(generate_page_lines(pages, mix or {"en": 1.0}, seed=seed))
+
+
+def write_corpus(out_dir: Path, count: int, pages: int, mix: dict[str, float], seed: int = 0) -> list[Path]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths: list[Path] = []
+    for idx in range(count):
+        path = out_dir / f"synthetic_{pages}p_{idx:04d}.pdf"
+        path.write_bytes(generate_paper_pdf(pages, mix, seed=seed + idx))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic text PDFs.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--mix", default="en:0.7,zh:0.15,ja:0.15", help="language weights, e.g. en:0.6,zh:0.4")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths = write_corpus(args.out_dir, args.count, args.pages, parse_language_mix(args.mix), seed=args.seed)
+    print(f"wrote {len(paths)} PDFs to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
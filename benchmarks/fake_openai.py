@@ -0,0 +1,196 @@
+"""Local stand-in for the OpenAI Responses API, for load tests without model spend.
+
+Start it and point the app at it through the usual settings:
+
+    python -m benchmarks.fake_openai --port 9100 --latency-ms 800 --error-rate 0.02
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:9100/v1 uvicorn backend.app.main:app
+
+Prompts asking for JSON get a well-formed EN/JA/ZH summary; everything else
+gets a chat-style plain text answer. ``stream: true`` requests are answered
+with server-sent events in the same format the SDK expects.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    stream_chunk_chars: int = 40
+    stream_chunk_delay_ms: float = 15.0
+    seed: int | None = None
+
+
+def _summary_text() -> str:
+    block = {
+        "question": "The paper addresses slow and inaccurate reading of long documents.",
+        "solution": "It proposes a retrieval augmented pipeline.\n- Chunk the text by page\n- Score chunks lexically",
+        "findings": "Reported results improve over baselines.\n- Higher accuracy\n- Lower latency",
+    }
+    return json.dumps({"zh": block, "en": block, "ja": block}, ensure_ascii=False)
+
+
+def _chat_text(prompt: str) -> str:
+    question = prompt.rsplit("User question:", 1)[-1].strip()[:200] or "(empty)"
+    return (
+        f"Conclusion: Synthetic answer for: {question}\n"
+        "Evidence: - [Page 1] The method is described in the introduction.\n"
+        "Details: - The fake server does not read the paper.\n"
+        "Uncertainty: This reply was generated by the local load-test stub."
+    )
+
+
+def _input_text(payload: dict[str, Any]) -> str:
+    raw = payload.get("input", "")
+    if isinstance(raw, str):
+        return raw
+    return json.dumps(raw, ensure_ascii=False)
+
+
+def _response_object(response_id: str, model: str, text: str, prompt: str) -> dict[str, Any]:
+    input_tokens = max(1, len(prompt) // 4)
+    output_tokens = max(1, len(text) // 4)
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": f"msg_{response_id}",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _error(status_code: int, message: str, error_type: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": error_type}},
+    )
+
+
+def create_app(config: FakeConfig | None = None) -> FastAPI:
+    config = config or FakeConfig()
+    rng = random.Random(config.seed)
+    app = FastAPI(title="fake OpenAI Responses API")
+    app.state.config = config
+    app.state.request_count = 0
+
+    def _latency() -> float:
+        jitter = rng.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0.0
+        return max(0.0, config.latency_ms + jitter) / 1000
+
+    @app.post("/v1/responses")
+    async def create_response(request: Request) -> Any:
+        app.state.request_count += 1
+        payload = await request.json()
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            return _error(429, "Rate limit reached (fake server).", "rate_limit_exceeded")
+        if roll < config.rate_limit_rate + config.error_rate:
+            return _error(500, "Injected server error (fake server).", "server_error")
+
+        prompt = _input_text(payload)
+        model = payload.get("model", "fake-model")
+        text = _summary_text() if "Return JSON only" in prompt else _chat_text(prompt)
+        response_id = f"resp_{uuid.uuid4().hex[:24]}"
+        final = _response_object(response_id, model, text, prompt)
+
+        if not payload.get("stream"):
+            await asyncio.sleep(_latency())
+            return final
+
+        async def events() -> AsyncIterator[bytes]:
+            seq = 0
+
+            def _event(name: str, data: dict[str, Any]) -> bytes:
+                nonlocal seq
+                data = {"type": name, "sequence_number": seq, **data}
+                seq += 1
+                return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+            in_progress = {**final, "status": "in_progress", "output": []}
+            yield _event("response.created", {"response": in_progress})
+            await asyncio.sleep(_latency())
+            item_id = final["output"][0]["id"]
+            step = max(1, config.stream_chunk_chars)
+            for start in range(0, len(text), step):
+                yield _event(
+                    "response.output_text.delta",
+                    {"item_id": item_id, "output_index": 0, "content_index": 0, "delta": text[start : start + step], "logprobs": []},
+                )
+                await asyncio.sleep(config.stream_chunk_delay_ms / 1000)
+            yield _event(
+                "response.output_text.done",
+                {"item_id": item_id, "output_index": 0, "content_index": 0, "text": text, "logprobs": []},
+            )
+            yield _event("response.completed", {"response": final})
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/v1/stats")
+    def stats() -> dict[str, int]:
+        return {"requests": app.state.request_count}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI Responses API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--stream-chunk-chars", type=int, default=40)
+    parser.add_argument("--stream-chunk-delay-ms", type=float, default=15.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        stream_chunk_chars=args.stream_chunk_chars,
+        stream_chunk_delay_ms=args.stream_chunk_delay_ms,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""End-to-end load driver for the paperReader API.
+
+Replays a weighted mix of uploads, detail polls, page renders and chat turns
+and reports p50/p95/p99 latency and throughput per endpoint.
+
+Self-contained run (spawns the fake OpenAI server and the app on free ports,
+with a throwaway data directory):
+
+    python -m benchmarks.load_test --spawn --requests 400 --concurrency 16
+
+Against an already running app (which should itself point ``OPENAI_BASE_URL``
+at ``benchmarks.fake_openai``):
+
+    python -m benchmarks.load_test --target http://127.0.0.1:8000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+from benchmarks.corpus import generate_paper_pdf, parse_language_mix
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MIX = "upload:1,detail:8,page:6,chat:2"
+OPERATIONS = ("upload", "detail", "page", "chat")
+QUESTIONS = (
+    "What problem does this paper solve?",
+    "How is the method evaluated?",
+    "本文的主要贡献是什么？",
+    "この論文の限界は何ですか？",
+)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; ``pct`` is in the 0-100 range."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def parse_operation_mix(raw: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.strip().partition(":")
+        if not name:
+            continue
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {name}")
+        weights[name] = float(weight) if weight else 1.0
+    if not weights:
+        raise ValueError("Operation mix is empty.")
+    return weights
+
+
+class LoadRecorder:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[endpoint].append(seconds * 1000)
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def report(self, wall_seconds: float) -> dict[str, Any]:
+        endpoints: dict[str, Any] = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            endpoints[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            }
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "wall_seconds": round(wall_seconds, 3),
+            "total_requests": total,
+            "total_rps": round(total / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+class LoadDriver:
+    def __init__(self, target: str, mix: dict[str, float], pdf_pages: int, seed: int = 0) -> None:
+        self.target = target.rstrip("/")
+        self.mix = mix
+        self.pdf_pages = pdf_pages
+        self.recorder = LoadRecorder()
+        self.paper_ids: list[int] = []
+        self.page_counts: dict[int, int] = {}
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._upload_seq = 0
+        self._local = threading.local()
+
+    def _client(self) -> httpx.Client:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = httpx.Client(base_url=self.target, timeout=300.0)
+            self._local.client = client
+        return client
+
+    def _pick(self, seq: list[Any] | tuple[Any, ...]) -> Any:
+        with self._rng_lock:
+            return self._rng.choice(seq)
+
+    def _timed(self, endpoint: str, method: str, url: str, **kwargs: Any) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = self._client().request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, time.perf_counter() - start, ok=False)
+            return None
+        self.recorder.record(endpoint, time.perf_counter() - start, ok=response.status_code < 400)
+        return response
+
+    def _upload(self, record: bool = True) -> int | None:
+        with self._rng_lock:
+            self._upload_seq += 1
+            seed = self._rng.randrange(1 << 30) + self._upload_seq
+        pdf = generate_paper_pdf(self.pdf_pages, parse_language_mix("en:0.7,zh:0.15,ja:0.15"), seed=seed)
+        files = {"file": (f"load_{seed}.pdf", pdf, "application/pdf")}
+        if record:
+            response = self._timed("POST /api/papers/upload", "POST", "/api/papers/upload", files=files)
+        else:
+            response = self._client().post("/api/papers/upload", files=files)
+        if response is None or response.status_code >= 400:
+            return None
+        return response.json()["id"]
+
+    def seed_library(self, papers: int, timeout: float = 120.0) -> None:
+        ids = [paper_id for paper_id in (self._upload(record=False) for _ in range(papers)) if paper_id]
+        deadline = time.monotonic() + timeout
+        pending = set(ids)
+        while pending and time.monotonic() < deadline:
+            for paper_id in list(pending):
+                detail = self._client().get(f"/api/papers/{paper_id}").json()
+                if detail["status"] in ("completed", "failed"):
+                    pending.discard(paper_id)
+                    self.page_counts[paper_id] = detail.get("page_count") or 1
+            time.sleep(0.5)
+        if pending:
+            raise RuntimeError(f"Seed papers did not finish processing: {sorted(pending)}")
+        self.paper_ids = ids
+
+    def run_one(self) -> None:
+        with self._rng_lock:
+            op = self._rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        paper_id = self._pick(self.paper_ids)
+        if op == "upload":
+            self._upload()
+        elif op == "detail":
+            self._timed("GET /api/papers/{id}", "GET", f"/api/papers/{paper_id}")
+        elif op == "page":
+            page_no = self._pick(range(1, self.page_counts.get(paper_id, 1) + 1))
+            self._timed("GET /api/papers/{id}/pdf/page/{n}", "GET", f"/api/papers/{paper_id}/pdf/page/{page_no}")
+        elif op == "chat":
+            self._timed(
+                "POST /api/papers/{id}/chat",
+                "POST",
+                f"/api/papers/{paper_id}/chat",
+                json={"message": self._pick(QUESTIONS)},
+            )
+
+    def run(self, requests: int, concurrency: int) -> dict[str, Any]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(self.run_one) for _ in range(requests)]:
+                future.result()
+        return self.recorder.report(time.perf_counter() - start)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not come up: {url}")
+
+
+@contextmanager
+def spawn_stack(fake_args: list[str]) -> Iterator[str]:
+    """Start the fake OpenAI server and the app on free ports; yield the app URL."""
+    fake_port, app_port = _free_port(), _free_port()
+    with tempfile.TemporaryDirectory(prefix="paperreader-load-") as data_dir:
+        env = {
+            **os.environ,
+            "OPENAI_API_KEY": "fake-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+            "PAPERREADER_DATA_DIR": data_dir,
+        }
+        procs = [
+            subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.fake_openai", "--port", str(fake_port), *fake_args],
+                cwd=ROOT,
+                env=env,
+            ),
+            subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(app_port), "--log-level", "warning"],
+                cwd=ROOT,
+                env=env,
+            ),
+        ]
+        try:
+            _wait_ready(f"http://127.0.0.1:{fake_port}/v1/stats")
+            _wait_ready(f"http://127.0.0.1:{app_port}/api/papers")
+            yield f"http://127.0.0.1:{app_port}"
+        finally:
+            for proc in procs:
+                proc.terminate()
+            for proc in procs:
+                proc.wait(timeout=10)
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f"{'endpoint':<40} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for endpoint, stats in report["endpoints"].items():
+        print(
+            f"{endpoint:<40} {stats['requests']:>6} {stats['errors']:>5} {stats['p50_ms']:>9.1f} "
+            f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['throughput_rps']:>8.2f}"
+        )
+    print(f"total: {report['total_requests']} requests in {report['wall_seconds']}s ({report['total_rps']} req/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the paperReader API.")
+    parser.add_argument("--target", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start fake OpenAI server + app locally")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"operation weights (default {DEFAULT_MIX})")
+    parser.add_argument("--pdf-pages", type=int, default=12)
+    parser.add_argument("--seed-papers", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake-latency-ms", type=float, default=300.0)
+    parser.add_argument("--fake-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+
+    def _run(target: str) -> dict[str, Any]:
+        driver = LoadDriver(target, parse_operation_mix(args.mix), args.pdf_pages, seed=args.seed)
+        driver.seed_library(args.seed_papers)
+        return driver.run(args.requests, args.concurrency)
+
+    if args.spawn:
+        fake_args = ["--latency-ms", str(args.fake_latency_ms), "--error-rate", str(args.fake_error_rate)]
+        with spawn_stack(fake_args) as target:
+            report = _run(target)
+    else:
+        report = _run(args.target)
+
+    _print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
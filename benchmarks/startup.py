@@ -0,0 +1,126 @@
+"""Cold-start benchmark for the API process.
+
+Measures, in fresh interpreters, how long ``import backend.app.main`` takes
+and how long a spawned uvicorn worker needs to answer its first request:
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --budget-import-ms 800 --budget-first-request-ms 3000
+
+With budgets given the command exits 1 when the median exceeds either one.
+It also reports which heavy optional dependencies were loaded by the import
+alone; those are expected to stay lazy.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from benchmarks.load_test import _free_port
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_MODULE = "backend.app.main"
+LAZY_MODULES = ("openai", "pypdf")
+IMPORT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "800"))
+FIRST_REQUEST_BUDGET_MS = float(os.getenv("STARTUP_FIRST_REQUEST_BUDGET_MS", "3000"))
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"import_ms": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def _env(data_dir: str) -> dict[str, str]:
+    return {**os.environ, "OPENAI_API_KEY": "startup-benchmark", "PAPERREADER_DATA_DIR": data_dir}
+
+
+def measure_import(runs: int = 5, module: str = APP_MODULE) -> dict[str, Any]:
+    samples: list[float] = []
+    loaded: set[str] = set()
+    with tempfile.TemporaryDirectory(prefix="paperreader-startup-") as data_dir:
+        for _ in range(runs):
+            out = subprocess.run(
+                [sys.executable, "-c", _IMPORT_PROBE.format(module=module, lazy=LAZY_MODULES)],
+                cwd=ROOT,
+                env=_env(data_dir),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            samples.append(result["import_ms"])
+            loaded.update(result["loaded"])
+    return {"median_ms": round(statistics.median(samples), 1), "samples_ms": [round(v, 1) for v in samples], "eager_heavy_modules": sorted(loaded)}
+
+
+def measure_first_request(runs: int = 3, timeout: float = 30.0) -> dict[str, Any]:
+    """Time from spawning uvicorn until ``GET /api/papers`` succeeds."""
+    samples: list[float] = []
+    for _ in range(runs):
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}/api/papers"
+        with tempfile.TemporaryDirectory(prefix="paperreader-startup-") as data_dir:
+            start = time.perf_counter()
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port), "--log-level", "warning"],
+                cwd=ROOT,
+                env=_env(data_dir),
+            )
+            try:
+                while True:
+                    if time.perf_counter() - start > timeout:
+                        raise RuntimeError("API did not answer within the timeout")
+                    if proc.poll() is not None:
+                        raise RuntimeError(f"API exited with code {proc.returncode}")
+                    try:
+                        if httpx.get(url, timeout=1.0).status_code == 200:
+                            break
+                    except httpx.HTTPError:
+                        pass
+                    time.sleep(0.01)
+                samples.append((time.perf_counter() - start) * 1000)
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+    return {"median_ms": round(statistics.median(samples), 1), "samples_ms": [round(v, 1) for v in samples]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-import-ms", type=float, default=None)
+    parser.add_argument("--budget-first-request-ms", type=float, default=None)
+    parser.add_argument("--json", type=Path, help="write the results as JSON")
+    args = parser.parse_args()
+
+    results = {"import": measure_import(args.runs), "first_request": measure_first_request(max(1, args.runs // 2))}
+    print(f"import {APP_MODULE}: median {results['import']['median_ms']} ms {results['import']['samples_ms']}")
+    if results["import"]["eager_heavy_modules"]:
+        print(f"  loaded eagerly: {', '.join(results['import']['eager_heavy_modules'])}")
+    print(f"first request: median {results['first_request']['median_ms']} ms {results['first_request']['samples_ms']}")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    over = []
+    if args.budget_import_ms is not None and results["import"]["median_ms"] > args.budget_import_ms:
+        over.append(f"import {results['import']['median_ms']} ms > {args.budget_import_ms} ms")
+    if args.budget_first_request_ms is not None and results["first_request"]["median_ms"] > args.budget_first_request_ms:
+        over.append(f"first request {results['first_request']['median_ms']} ms > {args.budget_first_request_ms} ms")
+    if over:
+        print("over budget: " + "; ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
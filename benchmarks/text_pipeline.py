@@ -0,0 +1,168 @@
+"""Microbenchmarks for the PDF text pipeline in ``backend.app.services``.
+
+Usage (from the repository root):
+
+    python -m benchmarks.text_pipeline --save benchmarks/baseline.json
+    python -m benchmarks.text_pipeline --compare benchmarks/baseline.json --threshold 0.2
+
+``--compare`` exits with status 1 when any case got slower than the baseline
+by more than the threshold (relative change of the median).
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from benchmarks.corpus import generate_paper_pdf, parse_language_mix
+
+DEFAULT_SIZES = (4, 32)
+DEFAULT_MIXES = ("en", "en:0.6,zh:0.2,ja:0.2")
+QUERIES = ("retrieval augmented accuracy", "消融实验 稳定性", "推論遅延")
+
+
+def _time_case(fn: Callable[[], Any], repeat: int) -> dict[str, float]:
+    fn()
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "runs": repeat,
+    }
+
+
+def run_benchmarks(sizes: tuple[int, ...], mixes: tuple[str, ...], repeat: int, workdir: Path) -> dict[str, Any]:
+    import backend.app.db as db
+
+    db.DB_PATH = workdir / "bench.db"
+    db.init_db()
+
+    from backend.app import services
+
+    results: dict[str, dict[str, float]] = {}
+    paper_id = 0
+    for mix_raw in mixes:
+        mix = parse_language_mix(mix_raw)
+        for pages_count in sizes:
+            paper_id += 1
+            label = f"pages={pages_count},mix={mix_raw}"
+            pdf_path = workdir / f"bench_{paper_id}.pdf"
+            pdf_path.write_bytes(generate_paper_pdf(pages_count, mix, seed=paper_id))
+
+            pages = services.extract_pages_from_pdf(pdf_path)
+            full_text = services.build_full_text(pages)
+            chunks = services.build_chunks(pages)
+            with db.get_conn() as conn:
+                conn.execute(
+                    """
+                    INSERT INTO papers (id, title, filename, filepath, status, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (paper_id, label, pdf_path.name, str(pdf_path), "completed", services.now_iso(), services.now_iso()),
+                )
+                services._replace_chunks(conn, paper_id, chunks)
+
+            cases: dict[str, Callable[[], Any]] = {
+                "extract_pages_from_pdf": lambda p=pdf_path: services.extract_pages_from_pdf(p),
+                "build_full_text": lambda p=pages: services.build_full_text(p),
+                "compute_content_fingerprint": lambda t=full_text: services.compute_content_fingerprint(t),
+                "build_chunks": lambda p=pages: services.build_chunks(p),
+                "infer_paper_title": lambda p=pages: services.infer_paper_title("fallback", p),
+                "retrieve_relevant_chunks": lambda i=paper_id: [
+                    services.retrieve_relevant_chunks(i, q) for q in QUERIES
+                ],
+            }
+            for name, fn in cases.items():
+                results[f"{name}[{label}]"] = _time_case(fn, repeat)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[dict[str, Any]]:
+    """Return the cases whose median regressed by more than ``threshold`` (0.2 == 20%)."""
+    regressions: list[dict[str, Any]] = []
+    base_cases = baseline.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        base = base_cases.get(name)
+        if not base or base["median_ms"] <= 0:
+            continue
+        change = stats["median_ms"] / base["median_ms"] - 1
+        if change > threshold:
+            regressions.append(
+                {
+                    "case": name,
+                    "baseline_ms": base["median_ms"],
+                    "current_ms": stats["median_ms"],
+                    "change": round(change, 4),
+                }
+            )
+    return regressions
+
+
+def _print_table(report: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    base_cases = (baseline or {}).get("results", {})
+    for name, stats in report["results"].items():
+        line = f"{name:<72} {stats['median_ms']:>10.3f} ms"
+        base = base_cases.get(name)
+        if base and base["median_ms"] > 0:
+            line += f"  ({(stats['median_ms'] / base['median_ms'] - 1) * 100:+.1f}%)"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the PDF text pipeline.")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--mix", nargs="+", default=list(DEFAULT_MIXES), help="language mixes, e.g. en:0.6,zh:0.4")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="write results as JSON (e.g. a new baseline)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown (default 0.2)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="paperreader-bench-") as tmp:
+        report = run_benchmarks(tuple(args.pages), tuple(args.mix), args.repeat, Path(tmp))
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    _print_table(report, baseline)
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"saved results to {args.save}")
+
+    if baseline is not None:
+        regressions = compare_results(baseline, report, args.threshold)
+        for item in regressions:
+            print(
+                f"REGRESSION {item['case']}: {item['baseline_ms']:.3f} -> {item['current_ms']:.3f} ms "
+                f"({item['change'] * 100:+.1f}%)"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ const detailTitle = document.getElementById('detailTitle');
 const detailCloseBtn = document.getElementById('detailCloseBtn');
 const summaryMeta = document.getElementById('summaryMeta');
 const refreshSummaryBtn = document.getElementById('refreshSummaryBtn');
+const nearDupBox = document.getElementById('nearDupBox');
+const cancelProcessingBtn = document.getElementById('cancelProcessingBtn');
 const chatForm = document.getElementById('chatForm');
 const chatInput = document.getElementById('chatInput');
 const chatBox = document.getElementById('chatBox');
@@ -25,6 +27,9 @@ let selectedPaperId = null;
 let statusPollTimer = null;
 let currentPdfPage = 1;
 let totalPdfPages = null;
+let chatNextBefore = null;
+let chatLoadingOlder = false;
+const CHAT_PAGE_SIZE = 30;
 
 const summaryFields = {
   zh: {
@@ -78,6 +83,47 @@ function setSummaryMeta(version, updatedAt) {
   summaryMeta.textContent = `Summary version: v${version}, last updated: ${timeText}`;
 }
 
+function renderNearDuplicates(paper) {
+  nearDupBox.innerHTML = '';
+  const matches = paper.status === 'pending_summary' ? paper.near_duplicates || [] : [];
+  nearDupBox.classList.toggle('hidden', matches.length === 0);
+  if (!matches.length) return;
+
+  const intro = document.createElement('p');
+  intro.textContent = 'Similar papers already have a summary. Reuse one, or summarize this paper anyway.';
+  nearDupBox.appendChild(intro);
+
+  matches.forEach((match) => {
+    const reuseBtn = document.createElement('button');
+    reuseBtn.type = 'button';
+    reuseBtn.textContent = `Reuse: ${match.title} (${Math.round(match.similarity * 100)}% similar)`;
+    reuseBtn.addEventListener('click', async () => {
+      try {
+        await fetchJson(`/api/papers/${paper.id}/reuse-summary`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ source_id: match.paper_id }),
+        });
+        await selectPaper(paper.id);
+        await loadPaperList();
+      } catch (error) {
+        uploadStatus.textContent = `Reuse failed: ${error.message}`;
+      }
+    });
+    nearDupBox.appendChild(reuseBtn);
+  });
+
+  const freshBtn = document.createElement('button');
+  freshBtn.type = 'button';
+  freshBtn.textContent = 'Summarize anyway';
+  freshBtn.addEventListener('click', async () => {
+    await fetchJson(`/api/papers/${paper.id}/refresh-summary?stages=summarize`, { method: 'POST' });
+    nearDupBox.classList.add('hidden');
+    await startStatusPoll(paper.id);
+  });
+  nearDupBox.appendChild(freshBtn);
+}
+
 function buildPdfPageUrl(paperId, page) {
   const safePage = Number.isFinite(page) && page > 0 ? Math.floor(page) : 1;
   return `/api/papers/${paperId}/pdf/page/${safePage}?t=${Date.now()}`;
@@ -130,7 +176,7 @@ function setPdfPage(page) {
   updatePdfNavState();
 }
 
-function addChatLine(role, content, sourceHint = null) {
+function buildChatLine(role, content, sourceHint = null) {
   const line = document.createElement('div');
   line.className = `chat-line ${role}`;
   const bubble = document.createElement('div');
@@ -143,10 +189,47 @@ function addChatLine(role, content, sourceHint = null) {
     bubble.appendChild(source);
   }
   line.appendChild(bubble);
-  chatBox.appendChild(line);
+  return line;
+}
+
+function addChatLine(role, content, sourceHint = null) {
+  chatBox.appendChild(buildChatLine(role, content, sourceHint));
   chatBox.scrollTop = chatBox.scrollHeight;
 }
 
+function chatPageUrl(paperId, before = null) {
+  const params = new URLSearchParams({ limit: String(CHAT_PAGE_SIZE) });
+  if (before) params.set('before', String(before));
+  return `/api/papers/${paperId}/chat?${params}`;
+}
+
+async function loadOlderChat() {
+  if (!selectedPaperId || !chatNextBefore || chatLoadingOlder) return;
+  chatLoadingOlder = true;
+  const paperId = selectedPaperId;
+  try {
+    const page = await fetchJson(chatPageUrl(paperId, chatNextBefore));
+    if (paperId !== selectedPaperId) return;
+    // Prepend while keeping the currently visible message in place.
+    const previousHeight = chatBox.scrollHeight;
+    const fragment = document.createDocumentFragment();
+    page.messages.forEach((m) => fragment.appendChild(buildChatLine(m.role, m.content, m.source_hint)));
+    chatBox.prepend(fragment);
+    chatBox.scrollTop += chatBox.scrollHeight - previousHeight;
+    chatNextBefore = page.next_before;
+  } finally {
+    chatLoadingOlder = false;
+  }
+}
+
+async function fillChatViewport() {
+  // No scroll event fires while the history is shorter than the box, so keep loading until it overflows.
+  const paperId = selectedPaperId;
+  while (paperId === selectedPaperId && chatNextBefore && !chatLoadingOlder && chatBox.scrollHeight <= chatBox.clientHeight) {
+    await loadOlderChat();
+  }
+}
+
 async function fetchJson(url, options = {}) {
   const res = await fetch(url, options);
   if (!res.ok) {
@@ -221,12 +304,15 @@ async function startStatusPoll(paperId) {
       const paper = await fetchJson(`/api/papers/${paperId}`);
       await loadPaperList();
       uploadStatus.textContent = `Processing status: ${paper.status}`;
-      if (paper.status === 'completed' || paper.status === 'failed') {
+      if (['completed', 'failed', 'pending_summary', 'cancelled'].includes(paper.status)) {
         clearStatusPoll();
-        if (paper.status === 'completed') {
-          uploadStatus.textContent = `Completed: ${paper.title}`;
+        if (paper.status === 'completed' || paper.status === 'pending_summary') {
+          uploadStatus.textContent =
+            paper.status === 'completed' ? `Completed: ${paper.title}` : `Similar paper found: ${paper.title}`;
           await selectPaper(paperId);
           switchTab('results');
+        } else if (paper.status === 'cancelled') {
+          uploadStatus.textContent = `Cancelled: ${paper.title}`;
         } else {
           uploadStatus.textContent = `Failed: ${paper.title}`;
         }
@@ -246,12 +332,17 @@ async function selectPaper(paperId) {
   detailTitle.textContent = `${paper.title} (${paper.status})`;
   setSummary(paper.summary);
   setSummaryMeta(paper.summary_version, paper.summary_updated_at);
+  renderNearDuplicates(paper);
+  cancelProcessingBtn.classList.toggle('hidden', !['queued', 'processing'].includes(paper.status));
   setPdfTotalPages(paper.page_count);
   bindPaperViewer(paperId, paper.title);
 
   chatBox.innerHTML = '';
-  const messages = await fetchJson(`/api/papers/${paperId}/chat`);
-  messages.forEach((m) => addChatLine(m.role, m.content, m.source_hint));
+  chatNextBefore = null;
+  const page = await fetchJson(chatPageUrl(paperId));
+  page.messages.forEach((m) => addChatLine(m.role, m.content, m.source_hint));
+  chatNextBefore = page.next_before;
+  await fillChatViewport();
 }
 
 async function uploadSelectedFile(file) {
@@ -298,6 +389,14 @@ pdfInput.addEventListener('change', async () => {
   await uploadSelectedFile(file);
 });
 
+chatBox.addEventListener('scroll', () => {
+  if (chatBox.scrollTop < 40) {
+    loadOlderChat().catch((error) => {
+      uploadStatus.textContent = `Loading chat history failed: ${error.message}`;
+    });
+  }
+});
+
 detailCloseBtn.addEventListener('click', () => {
   detail.classList.add('hidden');
 });
@@ -340,6 +439,16 @@ refreshSummaryBtn.addEventListener('click', async () => {
   await selectPaper(selectedPaperId);
 });
 
+cancelProcessingBtn.addEventListener('click', async () => {
+  if (!selectedPaperId) return;
+  try {
+    await fetchJson(`/api/papers/${selectedPaperId}/cancel`, { method: 'POST' });
+  } catch (error) {
+    uploadStatus.textContent = `Cancel failed: ${error.message}`;
+  }
+  await selectPaper(selectedPaperId);
+});
+
 chatForm.addEventListener('submit', async (event) => {
   event.preventDefault();
   if (!selectedPaperId || !chatInput.value.trim()) return;
@@ -0,0 +1,137 @@
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.admission import AdmissionRejected, ClientLimiter
+from benchmarks.corpus import generate_paper_pdf
+
+
+def test_limiter_caps_per_client_and_total() -> None:
+    limiter = ClientLimiter("ingest", max_total=3, max_per_client=2, retry_after=9)
+    bulk = [limiter.acquire("bulk"), limiter.acquire("bulk")]
+    with pytest.raises(AdmissionRejected) as rejected:
+        limiter.acquire("bulk")
+    assert rejected.value.retry_after == 9
+
+    interactive = limiter.acquire("reader")  # one client's burst does not lock others out
+    with pytest.raises(AdmissionRejected):
+        limiter.acquire("someone-else")
+    interactive.release()
+    interactive.release()  # idempotent
+    assert limiter.in_use == 2
+    for slot in bulk:
+        slot.release()
+    assert limiter.in_use == 0
+
+
+def _client(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+    from backend.app import blob_store
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    db.init_db()
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    return db, main, TestClient(main.app)
+
+
+def test_upload_over_limit_gets_429_and_slot_frees_after_job(tmp_path: Path, monkeypatch) -> None:
+    db, main, client = _client(tmp_path, monkeypatch)
+    limiter = ClientLimiter("ingest", max_total=4, max_per_client=1, retry_after=12)
+    monkeypatch.setattr(main, "ingest_limiter", limiter)
+    ran: list[int] = []
+    monkeypatch.setattr(main, "process_paper", lambda paper_id, *args, **kwargs: ran.append(paper_id))
+    files = {"file": ("a.pdf", generate_paper_pdf(pages=1, seed=21), "application/pdf")}
+
+    held = limiter.acquire("testclient")
+    busy = client.post("/api/papers/upload", files=files)
+    assert busy.status_code == 429 and busy.headers["retry-after"] == "12"
+    # A self-declared client id does not buy a fresh per-client budget.
+    assert client.post("/api/papers/upload", files=files, headers={"X-Client-Id": "other"}).status_code == 429
+    held.release()
+
+    accepted = client.post("/api/papers/upload", files=files)
+    assert accepted.status_code == 200
+    assert ran == [accepted.json()["id"]] and limiter.in_use == 0
+
+
+def test_cancel_drops_a_queued_ingest_job_without_waiting_for_a_worker(tmp_path: Path, monkeypatch) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.app import admission
+
+    db, main, client = _client(tmp_path, monkeypatch)
+    limiter = ClientLimiter("ingest", max_total=4, max_per_client=4, retry_after=12)
+    monkeypatch.setattr(main, "ingest_limiter", limiter)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(admission, "ingest_pool", pool)
+    ran: list[int] = []
+    monkeypatch.setattr(main, "process_paper", lambda paper_id, *args, **kwargs: ran.append(paper_id))
+    release = threading.Event()
+    busy = pool.submit(release.wait, 10)  # the only worker is taken
+
+    responses: list = []
+    upload = threading.Thread(
+        target=lambda: responses.append(
+            client.post("/api/papers/upload", files={"file": ("a.pdf", generate_paper_pdf(pages=1, seed=22), "application/pdf")})
+        )
+    )
+    upload.start()
+    try:
+        paper_id = None
+        for _ in range(500):
+            with db.get_conn() as conn:
+                row = conn.execute("SELECT id FROM papers").fetchone()
+            if row and limiter.in_use == 1 and main.jobs.is_active(row["id"]):
+                paper_id = row["id"]
+                break
+            time.sleep(0.01)
+        assert paper_id is not None
+
+        assert client.post(f"/api/papers/{paper_id}/cancel").json()["status"] == "cancelled"
+        upload.join(5)
+        assert not upload.is_alive() and not busy.done()
+        assert responses[0].status_code == 200
+        assert ran == [] and limiter.in_use == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_concurrent_chat_is_capped_per_client(tmp_path: Path, monkeypatch) -> None:
+    db, main, client = _client(tmp_path, monkeypatch)
+    limiter = ClientLimiter("chat", max_total=4, max_per_client=1, retry_after=3)
+    monkeypatch.setattr(main, "chat_limiter", limiter)
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+            VALUES ('p', 'p.pdf', '/missing.pdf', 'completed', datetime('now'), datetime('now'))
+            """
+        ).lastrowid
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_reply(paper, message):
+        entered.set()
+        release.wait(5)
+        return "answer", None
+
+    monkeypatch.setattr(main, "generate_chat_reply", slow_reply)
+    first = threading.Thread(target=client.post, args=(f"/api/papers/{paper_id}/chat",), kwargs={"json": {"message": "q1"}})
+    first.start()
+    assert entered.wait(5)
+
+    second = client.post(f"/api/papers/{paper_id}/chat", json={"message": "q2"})
+    assert second.status_code == 429 and second.headers["retry-after"] == "3"
+    release.set()
+    first.join(5)
+    assert limiter.in_use == 0
+    with db.get_conn() as conn:
+        contents = [row[0] for row in conn.execute("SELECT content FROM messages ORDER BY id")]
+    assert contents == ["q1", "answer"]
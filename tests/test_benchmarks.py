@@ -0,0 +1,30 @@
+import io
+
+from pypdf import PdfReader
+
+from backend.app.services import extract_pages_from_pdf, infer_paper_title
+from benchmarks.corpus import generate_paper_pdf, parse_language_mix
+from benchmarks.text_pipeline import compare_results
+
+
+def test_synthetic_pdf_has_extractable_multilingual_text(tmp_path) -> None:
+    pdf_path = tmp_path / "synthetic.pdf"
+    pdf_path.write_bytes(generate_paper_pdf(pages=3, mix=parse_language_mix("en:1,zh:1,ja:1"), seed=7))
+
+    assert len(PdfReader(io.BytesIO(pdf_path.read_bytes())).pages) == 3
+    pages = extract_pages_from_pdf(pdf_path)
+    text = "\n".join(content for _, content in pages)
+    assert "We propose" in text or "Experiments" in text or "The ablation" in text
+    assert any("一" <= ch <= "鿿" for ch in text)
+    assert any("぀" <= ch <= "ヿ" for ch in text)
+    assert infer_paper_title("fallback", pages) != "fallback"
+
+
+def test_compare_results_flags_only_regressions_beyond_threshold() -> None:
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}, "c": {"median_ms": 10.0}}}
+    current = {"results": {"a": {"median_ms": 11.0}, "b": {"median_ms": 13.0}, "c": {"median_ms": 5.0}, "d": {"median_ms": 1.0}}}
+
+    regressions = compare_results(baseline, current, threshold=0.2)
+
+    assert [item["case"] for item in regressions] == ["b"]
+    assert regressions[0]["change"] == 0.3
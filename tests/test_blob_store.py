@@ -0,0 +1,99 @@
+import importlib
+import sys
+from hashlib import sha256
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import blob_store
+from benchmarks.corpus import generate_paper_pdf
+
+
+def _setup(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    db.init_db()
+    return db
+
+
+def _refcount(db, digest: str) -> int | None:
+    with db.get_conn() as conn:
+        row = conn.execute("SELECT refcount FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+    return row["refcount"] if row else None
+
+
+def test_identical_uploads_share_one_sharded_blob(tmp_path: Path, monkeypatch) -> None:
+    db = _setup(tmp_path, monkeypatch)
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    monkeypatch.setattr(main, "process_paper", lambda *args, **kwargs: None)
+    client = TestClient(main.app)
+
+    pdf = generate_paper_pdf(pages=2, seed=11)
+    digest = sha256(pdf).hexdigest()
+    ids = [
+        client.post("/api/papers/upload", files={"file": (name, pdf, "application/pdf")}).json()["id"]
+        for name in ("first.pdf", "renamed.pdf")
+    ]
+    blob = tmp_path / "blobs" / digest[:2] / digest[2:4] / f"{digest}.pdf"
+    assert blob.read_bytes() == pdf
+    assert len(list((tmp_path / "blobs").rglob("*.pdf"))) == 1
+    assert _refcount(db, digest) == 2
+
+    assert client.delete(f"/api/papers/{ids[0]}").status_code == 200
+    assert blob.exists() and _refcount(db, digest) == 1
+    assert client.get(f"/api/papers/{ids[1]}/pdf").content == pdf
+    assert client.delete(f"/api/papers/{ids[1]}").status_code == 200
+    assert not blob.exists() and _refcount(db, digest) is None
+
+
+def test_migrate_moves_flat_uploads_and_counts_references(tmp_path: Path, monkeypatch) -> None:
+    db = _setup(tmp_path, monkeypatch)
+    uploads = tmp_path / "uploads"
+    uploads.mkdir()
+    pdf = generate_paper_pdf(pages=1, seed=12)
+    flat_a, flat_b = uploads / "20260101000000_a.pdf", uploads / "20260102000000_a-again.pdf"
+    flat_a.write_bytes(pdf)
+    flat_b.write_bytes(pdf)
+    with db.get_conn() as conn:
+        for path in (flat_a, flat_b):
+            conn.execute(
+                """
+                INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+                VALUES ('a', ?, ?, 'completed', datetime('now'), datetime('now'))
+                """,
+                (path.name, str(path)),
+            )
+
+    assert blob_store.migrate_uploads() == 2
+    digest = sha256(pdf).hexdigest()
+    assert not flat_a.exists() and not flat_b.exists()
+    with db.get_conn() as conn:
+        paths = {row["filepath"] for row in conn.execute("SELECT filepath FROM papers")}
+    assert paths == {str(blob_store.blob_path(digest))}
+    assert _refcount(db, digest) == 2
+    assert blob_store.migrate_uploads() == 0
+
+
+def test_duplicate_upload_releases_its_reference_and_orphan_blobs_are_removed(tmp_path: Path, monkeypatch) -> None:
+    db = _setup(tmp_path, monkeypatch)
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    monkeypatch.setattr(main, "process_paper", lambda *args, **kwargs: None)
+    client = TestClient(main.app)
+
+    pdf = generate_paper_pdf(pages=1, seed=13)
+    digest = sha256(pdf).hexdigest()
+    paper_id = client.post("/api/papers/upload", files={"file": ("a.pdf", pdf, "application/pdf")}).json()["id"]
+    with db.get_conn() as conn:
+        conn.execute("UPDATE papers SET status = 'completed', summary_json = '{\"en\": \"ok\"}' WHERE id = ?", (paper_id,))
+    again = client.post("/api/papers/upload", files={"file": ("b.pdf", pdf, "application/pdf")}).json()
+    assert again["duplicate"] and _refcount(db, digest) == 1
+
+    # A row whose blobs entry went missing still removes its file instead of leaking it.
+    with db.get_conn() as conn:
+        conn.execute("DELETE FROM blobs")
+    assert client.delete(f"/api/papers/{paper_id}").status_code == 200
+    assert not blob_store.blob_path(digest).exists()
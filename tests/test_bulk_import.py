@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from backend.app import blob_store, bulk_import, services
+from benchmarks.corpus import generate_paper_pdf
+
+
+def _setup(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    calls: list[str] = []
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        calls.append(title)
+        block = {"question": "q", "solution": "s", "findings": "f"}
+        return {"zh": block, "en": block, "ja": block}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+    return db, calls
+
+
+def test_bulk_import_dedups_and_resumes_from_journal(tmp_path: Path, monkeypatch) -> None:
+    db, calls = _setup(tmp_path, monkeypatch)
+    library = tmp_path / "library"
+    (library / "nested").mkdir(parents=True)
+    (library / "a.pdf").write_bytes(generate_paper_pdf(pages=2, seed=1))
+    (library / "nested" / "b.PDF").write_bytes(generate_paper_pdf(pages=2, seed=2))
+    (library / "nested" / "a-copy.pdf").write_bytes((library / "a.pdf").read_bytes())
+    journal_path = tmp_path / "journal.jsonl"
+
+    first = bulk_import.BulkImporter(bulk_import.ImportJournal(journal_path), workers=2, summarize=False)
+    assert first.run(library) == {"imported": 2, "skipped": 1}
+    assert calls == []
+
+    second = bulk_import.BulkImporter(bulk_import.ImportJournal(journal_path), llm_concurrency=2)
+    assert second.run(library) == {"summarized": 2, "skipped": 1}
+    assert len(calls) == 2
+
+    third = bulk_import.BulkImporter(bulk_import.ImportJournal(journal_path))
+    assert third.run(library) == {"skipped": 3}
+
+    with db.get_conn() as conn:
+        rows = conn.execute("SELECT status, file_sha256, full_text FROM papers").fetchall()
+        chunk_count = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    assert [row["status"] for row in rows] == ["completed", "completed"]
+    assert all(row["file_sha256"] and row["full_text"] for row in rows)
+    assert chunk_count > 0
+
+
+def test_bulk_import_skips_files_already_in_library(tmp_path: Path, monkeypatch) -> None:
+    db, _ = _setup(tmp_path, monkeypatch)
+    library = tmp_path / "library"
+    library.mkdir()
+    pdf = library / "existing.pdf"
+    pdf.write_bytes(generate_paper_pdf(pages=1, seed=3))
+    db.init_db()
+    with db.get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, summary_json, created_at, updated_at)
+            VALUES ('Existing', 'existing.pdf', ?, 'completed', '{"en": {"question": "q"}}', datetime('now'), datetime('now'))
+            """,
+            (str(pdf),),
+        )
+
+    importer = bulk_import.BulkImporter(bulk_import.ImportJournal(tmp_path / "journal.jsonl"))
+    assert importer.run(library) == {"duplicate": 1}
+
+
+def test_bulk_import_retries_files_whose_row_failed(tmp_path: Path, monkeypatch) -> None:
+    db, calls = _setup(tmp_path, monkeypatch)
+    library = tmp_path / "library"
+    library.mkdir()
+    failed, placeholder = library / "failed.pdf", library / "placeholder.pdf"
+    failed.write_bytes(generate_paper_pdf(pages=1, seed=4))
+    placeholder.write_bytes(generate_paper_pdf(pages=1, seed=5))
+    db.init_db()
+    with db.get_conn() as conn:
+        for title, path, status, summary in (
+            ("Failed", failed, "failed", '{"error": "timeout"}'),
+            ("Placeholder", placeholder, "completed", '{"en": "No model is configured"}'),
+        ):
+            conn.execute(
+                """
+                INSERT INTO papers (title, filename, filepath, status, summary_json, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, datetime('now'), datetime('now'))
+                """,
+                (title, path.name, str(path), status, summary),
+            )
+
+    importer = bulk_import.BulkImporter(bulk_import.ImportJournal(tmp_path / "journal.jsonl"))
+    assert importer.run(library) == {"summarized": 2}
+    assert sorted(calls) == ["Failed", "Placeholder"]
+    with db.get_conn() as conn:
+        assert [row[0] for row in conn.execute("SELECT status FROM papers ORDER BY id")] == ["completed", "completed"]
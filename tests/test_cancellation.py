@@ -0,0 +1,187 @@
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import jobs, services
+
+
+def _setup(tmp_path: Path, monkeypatch, full_text: str | None = None):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4\n")  # page text comes from the patched iter_pdf_pages
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, full_text, created_at, updated_at)
+            VALUES ('paper', 'paper.pdf', ?, 'queued', ?, datetime('now'), datetime('now'))
+            """,
+            (str(pdf_path), full_text),
+        ).lastrowid
+    return db, paper_id
+
+
+class _HangingStream:
+    """Stands in for a streamed Responses call that never produces output until closed."""
+
+    def __init__(self) -> None:
+        self.opened = threading.Event()
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        self.opened.set()
+        if self.closed.wait(10):
+            raise ConnectionError("stream closed")
+        return iter(())
+
+    def close(self) -> None:
+        self.closed.set()
+
+
+class _FakeClient:
+    def __init__(self, stream: _HangingStream) -> None:
+        self.responses = self
+        self.stream = stream
+
+    def create(self, model: str, input: str, stream: bool = False):
+        assert stream, "calls inside a job should stream so they can be aborted"
+        return self.stream
+
+
+def test_cancel_aborts_outstanding_summary_call(tmp_path: Path, monkeypatch) -> None:
+    db, paper_id = _setup(tmp_path, monkeypatch, full_text="[[PAGE 1]]\nsome text")
+    stream = _HangingStream()
+    monkeypatch.setattr(services, "_get_openai_client", lambda: _FakeClient(stream))
+
+    worker = threading.Thread(
+        target=services.process_paper, args=(paper_id, ("summarize",)), kwargs={"token": jobs.start(paper_id)}
+    )
+    worker.start()
+    assert stream.opened.wait(5)
+    started = time.monotonic()
+    assert jobs.cancel(paper_id) is not None
+    worker.join(5)
+
+    assert not worker.is_alive() and time.monotonic() - started < 2
+    assert stream.closed.is_set()
+    with db.get_conn() as conn:
+        row = conn.execute("SELECT status, summary_json FROM papers WHERE id = ?", (paper_id,)).fetchone()
+    assert row["status"] == "cancelled" and row["summary_json"] is None
+    assert not jobs.is_active(paper_id)
+
+
+def test_delete_cancels_extraction_before_removing_rows(tmp_path: Path, monkeypatch) -> None:
+    db, paper_id = _setup(tmp_path, monkeypatch)
+    first_page = threading.Event()
+    pages_read: list[int] = []
+
+    def slow_pages(pdf_path: Path):
+        for page_no in range(1, 200):
+            pages_read.append(page_no)
+            first_page.set()
+            time.sleep(0.02)
+            yield page_no, f"page {page_no} text " * 50
+
+    monkeypatch.setattr(services, "iter_pdf_pages", slow_pages)
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+
+    assert client.post(f"/api/papers/{paper_id}/cancel").status_code == 409
+    worker = threading.Thread(target=services.process_paper, args=(paper_id,), kwargs={"token": jobs.start(paper_id)})
+    worker.start()
+    assert first_page.wait(5)
+
+    assert client.delete(f"/api/papers/{paper_id}").status_code == 200
+    worker.join(5)
+    assert not worker.is_alive()
+    assert len(pages_read) < 199
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM chunks WHERE paper_id = ?", (paper_id,)).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM papers WHERE id = ?", (paper_id,)).fetchone()[0] == 0
+
+
+def test_cancelled_before_start_never_runs(tmp_path: Path, monkeypatch) -> None:
+    db, paper_id = _setup(tmp_path, monkeypatch)
+    token = jobs.start(paper_id)
+    jobs.cancel(paper_id)
+
+    def must_not_run(*args, **kwargs):
+        raise AssertionError("cancelled job should not extract")
+
+    monkeypatch.setattr(services, "stream_extract_to_db", must_not_run)
+    services.process_paper(paper_id, token=token)
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT status FROM papers WHERE id = ?", (paper_id,)).fetchone()[0] == "cancelled"
+
+
+def test_superseded_job_finishes_before_the_new_one_and_keeps_its_status(tmp_path: Path, monkeypatch) -> None:
+    db, paper_id = _setup(tmp_path, monkeypatch, full_text="[[PAGE 1]]\nsome text")
+    first_call = threading.Event()
+    events: list[str] = []
+
+    def fake_summarize(title: str, text: str) -> dict:
+        token = jobs.current_token()
+        if not first_call.is_set():
+            first_call.set()
+            while not token.cancelled:
+                time.sleep(0.01)
+            time.sleep(0.2)  # slow wind-down after the cancel
+            events.append("old finished")
+            token.raise_if_cancelled()
+        events.append("new started")
+        return {"en": "fresh summary"}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summarize)
+    old = threading.Thread(
+        target=services.process_paper, args=(paper_id, ("summarize",)), kwargs={"token": jobs.start(paper_id)}
+    )
+    old.start()
+    assert first_call.wait(5)
+    services.process_paper(paper_id, ("summarize",), token=jobs.start(paper_id))
+    old.join(5)
+
+    assert events == ["old finished", "new started"]
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT status FROM papers WHERE id = ?", (paper_id,)).fetchone()[0] == "completed"
+    assert not jobs.is_active(paper_id)
+
+
+def test_restart_after_cancel_waits_for_the_cancelled_extraction(tmp_path: Path, monkeypatch) -> None:
+    db, paper_id = _setup(tmp_path, monkeypatch)
+    first_page = threading.Event()
+    old_token = jobs.start(paper_id)
+    old_done_when_new_read: list[bool] = []
+
+    def pages(pdf_path: Path):
+        if jobs.current_token() is old_token:
+            for page_no in range(1, 200):
+                first_page.set()
+                yield page_no, f"stale page {page_no} " * 50
+                time.sleep(0.3)  # slow to notice the cancel
+        else:
+            old_done_when_new_read.append(old_token.wait_finished(0))
+            for page_no in range(1, 6):
+                yield page_no, f"fresh page {page_no} " * 50
+
+    monkeypatch.setattr(services, "iter_pdf_pages", pages)
+    old = threading.Thread(target=services.process_paper, args=(paper_id, ("extract",)), kwargs={"token": old_token})
+    old.start()
+    assert first_page.wait(5)
+
+    assert jobs.cancel(paper_id) is old_token
+    services.process_paper(paper_id, ("extract",), token=jobs.start(paper_id))
+    old.join(5)
+
+    assert old_done_when_new_read == [True]
+    with db.get_conn() as conn:
+        full_text = conn.execute("SELECT full_text FROM papers WHERE id = ?", (paper_id,)).fetchone()[0]
+        assert conn.execute("SELECT COUNT(*) FROM staged_text").fetchone()[0] == 0
+    assert all(f"fresh page {page_no}" in full_text for page_no in range(1, 6))
+    assert "stale page" not in full_text
+    assert not jobs.is_active(paper_id)
@@ -0,0 +1,73 @@
+import importlib
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+
+def _client(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+            VALUES ('paper', 'paper.pdf', '/nonexistent.pdf', 'completed', datetime('now'), datetime('now'))
+            """
+        ).lastrowid
+    return db, main, TestClient(main.app), paper_id
+
+
+def test_chat_history_pages_backwards_with_cursor(tmp_path: Path, monkeypatch) -> None:
+    db, main, client, paper_id = _client(tmp_path, monkeypatch)
+    monkeypatch.setattr(main, "generate_chat_reply", lambda paper, message: (f"answer to {message}", "Page 1"))
+
+    for n in range(5):
+        answer = client.post(f"/api/papers/{paper_id}/chat", json={"message": f"q{n}"}).json()["answer"]
+        assert answer["reply_to_id"] == answer["id"] - 1
+
+    first = client.get(f"/api/papers/{paper_id}/chat", params={"limit": 4}).json()
+    assert [m["content"] for m in first["messages"]] == ["q3", "answer to q3", "q4", "answer to q4"]
+    assert first["next_before"] == first["messages"][0]["id"]
+
+    older = client.get(f"/api/papers/{paper_id}/chat", params={"limit": 4, "before": first["next_before"]}).json()
+    assert [m["content"] for m in older["messages"]] == ["q1", "answer to q1", "q2", "answer to q2"]
+    last = client.get(f"/api/papers/{paper_id}/chat", params={"limit": 4, "before": older["next_before"]}).json()
+    assert [m["content"] for m in last["messages"]] == ["q0", "answer to q0"]
+    assert last["next_before"] is None
+
+    assert client.get(f"/api/papers/{paper_id}/chat", params={"limit": 0}).status_code == 422
+
+
+def test_summary_update_uses_linked_pair_and_legacy_rows_are_backfilled(tmp_path: Path, monkeypatch) -> None:
+    db, main, client, paper_id = _client(tmp_path, monkeypatch)
+    with db.get_conn() as conn:
+        conn.execute("ALTER TABLE messages DROP COLUMN reply_to_id")  # database from before the column existed
+        for role, content in (("user", "old question"), ("assistant", "old answer"), ("user", "unanswered")):
+            conn.execute(
+                "INSERT INTO messages (paper_id, role, content, created_at) VALUES (?, ?, ?, datetime('now'))",
+                (paper_id, role, content),
+            )
+    db.init_db()
+    with db.get_conn() as conn:
+        linked = conn.execute("SELECT reply_to_id FROM messages WHERE role = 'assistant'").fetchone()[0]
+        assert linked == conn.execute("SELECT id FROM messages WHERE content = 'old question'").fetchone()[0]
+        conn.execute("UPDATE messages SET reply_to_id = NULL WHERE role = 'assistant'")
+    db.init_db()
+    with db.get_conn() as conn:
+        # The backfill is a one-time migration, not a rewrite on every startup.
+        assert conn.execute("SELECT reply_to_id FROM messages WHERE role = 'assistant'").fetchone()[0] is None
+        conn.execute("UPDATE messages SET reply_to_id = ? WHERE role = 'assistant'", (linked,))
+
+    seen: list[tuple[str, str]] = []
+    monkeypatch.setattr(
+        main,
+        "update_summary_from_discussion",
+        lambda paper, question, answer, hint: seen.append((question, answer)),
+    )
+    assert client.post(f"/api/papers/{paper_id}/update-summary-from-discussion").status_code == 200
+    assert seen == [("old question", "old answer")]
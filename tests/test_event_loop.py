@@ -0,0 +1,67 @@
+import asyncio
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import blob_store, executors, services
+from benchmarks.corpus import generate_paper_pdf
+
+PARSE_SECONDS = 0.8
+
+
+def test_pdf_parsing_runs_in_a_process_pool(tmp_path: Path) -> None:
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(generate_paper_pdf(pages=3, seed=7))
+    try:
+        meta = asyncio.run(executors.run_parse(services.read_quick_metadata, path, "paper"))
+    finally:
+        executors.shutdown()
+    assert meta == services.read_quick_metadata(path, "paper")
+
+
+def test_status_polls_stay_fast_during_a_large_upload(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    # Run the parser in a thread so the patched, slow version is the one used.
+    monkeypatch.setattr(executors, "PARSE_WORKERS", 0)
+    real_metadata = services.read_quick_metadata
+
+    def slow_metadata(*args, **kwargs):
+        time.sleep(PARSE_SECONDS)  # stands in for a large, slow-to-parse PDF
+        return real_metadata(*args, **kwargs)
+
+    monkeypatch.setattr(services, "read_quick_metadata", slow_metadata)
+    monkeypatch.setattr(services, "process_paper", lambda *args, **kwargs: None)
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    pdf = generate_paper_pdf(pages=200, seed=11)
+
+    with TestClient(main.app) as client:
+        client.get("/api/papers")  # warm up
+        upload: dict = {}
+
+        def _upload() -> None:
+            start = time.perf_counter()
+            upload["response"] = client.post("/api/papers/upload", files={"file": ("big.pdf", pdf, "application/pdf")})
+            upload["seconds"] = time.perf_counter() - start
+
+        worker = threading.Thread(target=_upload)
+        worker.start()
+        latencies: list[float] = []
+        while worker.is_alive():
+            start = time.perf_counter()
+            assert client.get("/api/papers").status_code == 200
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.02)
+        worker.join()
+
+    assert upload["response"].status_code == 200
+    assert upload["seconds"] >= PARSE_SECONDS
+    assert len(latencies) >= 5
+    assert max(latencies) < PARSE_SECONDS / 2
@@ -0,0 +1,84 @@
+import importlib
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import http_cache
+
+
+def _client(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    block = {"question": "q" * 800, "solution": "s" * 800, "findings": "f" * 800}
+    with db.get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, summary_json, summary_version, created_at, updated_at)
+            VALUES ('Paper', 'p.pdf', 'missing.pdf', 'completed', ?, 1, '2026-10-19T00:00:00+00:00', '2026-10-19T00:00:00+00:00')
+            """,
+            (json.dumps({"zh": block, "en": block, "ja": block}),),
+        )
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    return db, main, TestClient(main.app)
+
+
+def test_repeat_reads_get_304_until_the_data_changes(tmp_path: Path, monkeypatch) -> None:
+    db, main, client = _client(tmp_path, monkeypatch)
+    opened: list[Path] = []
+    monkeypatch.setattr(main, "get_pdf_page_count", lambda path: opened.append(path) or 1)
+
+    for url in ("/api/papers", "/api/papers/1", "/api/papers/1/chat"):
+        first = client.get(url)
+        assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+        again = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == first.headers["etag"]
+    assert len(opened) == 1  # the 304 skipped loading the paper and opening its PDF
+
+    etags = {url: client.get(url).headers["etag"] for url in ("/api/papers", "/api/papers/1", "/api/papers/1/chat")}
+    with db.get_conn() as conn:
+        conn.execute("UPDATE papers SET summary_version = 2, updated_at = '2026-10-19T01:00:00+00:00' WHERE id = 1")
+        conn.execute(
+            "INSERT INTO messages (paper_id, role, content, created_at) VALUES (1, 'user', 'hi', '2026-10-19T01:00:00+00:00')"
+        )
+    for url, etag in etags.items():
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    # A write that leaves updated_at as it was still changes the list's version.
+    etag = client.get("/api/papers").headers["etag"]
+    with db.get_conn() as conn:
+        conn.execute("UPDATE papers SET status = 'failed' WHERE id = 1")
+    assert client.get("/api/papers", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get("/api/papers/2", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get("/api/papers/2/chat", headers={"If-None-Match": "*"}).status_code == 404
+
+
+def test_large_json_is_compressed_when_accepted(tmp_path: Path, monkeypatch) -> None:
+    _, _, client = _client(tmp_path, monkeypatch)
+    monkeypatch.setattr(http_cache, "brotli", None)
+
+    detail = client.get("/api/papers/1", headers={"Accept-Encoding": "br, gzip"})
+    assert detail.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in detail.headers["vary"]
+    assert int(detail.headers["content-length"]) < len(detail.content) / 4
+    assert detail.json()["summary"]["en"]["question"].startswith("q")
+
+    plain = client.get("/api/papers/1", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.content == detail.content
+    small = client.get("/api/papers", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    # Uncompressed representations vary by Accept-Encoding too, or a cache could serve them to anyone.
+    assert "Accept-Encoding" in plain.headers["vary"] and "Accept-Encoding" in small.headers["vary"]
+    refused = client.get("/api/papers/1", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "content-encoding" not in refused.headers
+
+
+def test_etag_comparison_is_weak() -> None:
+    assert http_cache.make_etag("a", 1).startswith('W/"')
+    assert http_cache._matches('"other", W/"abc"', 'W/"abc"')
+    assert not http_cache._matches('"other"', 'W/"abc"')
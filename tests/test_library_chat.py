@@ -0,0 +1,131 @@
+import importlib
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import library_chat, services
+
+PAPERS = {
+    "Contrastive Pretraining at Scale": [
+        (1, "We train with a contrastive loss and a learned temperature on image text pairs."),
+        (4, "Lowering the temperature of the contrastive loss sharpens the similarity distribution."),
+    ],
+    "Temperature Scaling Revisited": [
+        (2, "Temperature scaling calibrates classifiers; we compare it with contrastive loss temperature."),
+    ],
+    "Graph Partitioning Heuristics": [
+        (1, "Multilevel partitioning coarsens the graph before refinement."),
+    ],
+}
+
+
+def _library(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    with db.get_conn() as conn:
+        for title, pages in PAPERS.items():
+            paper_id = conn.execute(
+                """
+                INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+                VALUES (?, 'p.pdf', 'p.pdf', 'completed', datetime('now'), datetime('now'))
+                """,
+                (title,),
+            ).lastrowid
+            services._replace_chunks(conn, paper_id, services.build_chunks(pages))
+    return db
+
+
+def test_library_chat_cites_matching_papers_within_budget(tmp_path: Path, monkeypatch) -> None:
+    _library(tmp_path, monkeypatch)
+    prompts: list[str] = []
+
+    def fake_complete(model: str, prompt: str) -> str:
+        prompts.append(prompt)
+        return "Conclusion: both tune it [Paper 1, Page 4] [Paper 2, Page 2]."
+
+    monkeypatch.setattr(library_chat, "_complete", fake_complete)
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+
+    reply = client.post("/api/chat", json={"message": "contrastive loss temperature"}).json()
+    assert reply["answer"].startswith("Conclusion")
+    assert [c["title"] for c in reply["citations"]] == ["Contrastive Pretraining at Scale", "Temperature Scaling Revisited"]
+    assert reply["citations"][0]["pages"] == ["1", "4"]  # best bm25 match first
+    assert all(c["cited"] for c in reply["citations"])
+    assert len(prompts) == 1 and "Graph Partitioning" not in prompts[0]
+
+    monkeypatch.setattr(library_chat, "LIBRARY_PROMPT_CHARS", 250)
+    reply = client.post("/api/chat", json={"message": "contrastive temperature", "max_papers": 2}).json()
+    assert [c["pages"] for c in reply["citations"]] == [["1"], ["2"]]  # one chunk each before the budget runs out
+    assert sum(len(block) for block in re.findall(r"\[Paper \d, Page \d\]\n[^\n]*", prompts[-1])) <= 250
+
+    scoped = client.post("/api/chat", json={"message": "temperature", "paper_ids": [2]}).json()
+    assert [c["paper_id"] for c in scoped["citations"]] == [2]
+    assert client.post("/api/chat", json={"message": "quantum chromodynamics"}).status_code == 404
+
+
+def test_index_follows_chunk_writes_and_backfills(tmp_path: Path, monkeypatch) -> None:
+    db = _library(tmp_path, monkeypatch)
+    assert [row["id"] for row in library_chat.rank_papers("refinement", 5)[0]] == [3]
+    with db.get_conn() as conn:
+        conn.execute("DELETE FROM chunks WHERE paper_id = 3")
+    assert library_chat.rank_papers("refinement", 5) == ([], [])
+    assert library_chat.rank_papers('"; DROP TABLE papers; -- NEAR(', 5) == ([], [])
+
+    with sqlite3.connect(db.DB_PATH) as conn:  # a library created before the index existed
+        conn.execute("DROP TABLE chunks_fts")
+    db.init_db()
+    assert [row["id"] for row in library_chat.rank_papers("calibrates", 5)[0]] == [2]
+
+
+def test_chinese_and_japanese_questions_match(tmp_path: Path, monkeypatch) -> None:
+    db = _library(tmp_path, monkeypatch)
+    with db.get_conn() as conn:
+        ids = []
+        for title, text in (
+            ("消融实验", "我们通过消融实验验证了注意力机制对长文档的作用。"),
+            ("注意機構の評価", "本研究では長い文書に対する注意機構の有効性を評価する。"),
+        ):
+            ids.append(
+                conn.execute(
+                    """
+                    INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+                    VALUES (?, 'p.pdf', 'p.pdf', 'completed', datetime('now'), datetime('now'))
+                    """,
+                    (title,),
+                ).lastrowid
+            )
+            services._replace_chunks(conn, ids[-1], services.build_chunks([(1, text)]))
+    zh, ja = ids
+
+    with sqlite3.connect(db.DB_PATH) as conn:  # an index built with the old word tokenizer
+        conn.execute("DROP TABLE chunks_fts")
+        conn.execute(
+            "CREATE VIRTUAL TABLE chunks_fts USING fts5(content, content='chunks', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.execute("INSERT INTO chunks_fts (chunks_fts) VALUES ('rebuild')")
+    db.init_db()
+    with db.get_conn() as conn:
+        assert "trigram" in conn.execute("SELECT sql FROM sqlite_master WHERE name = 'chunks_fts'").fetchone()[0]
+
+    assert [row["id"] for row in library_chat.rank_papers("消融实验的结论是什么？", 5)[0]] == [zh]
+    assert [row["id"] for row in library_chat.rank_papers("注意機構の評価は？", 5)[0]] == [ja]
+    # Two-character words are shorter than a trigram and go through the token fallback.
+    assert [row["id"] for row in library_chat.rank_papers("消融", 5)[0]] == [zh]
+    assert [row["id"] for row in library_chat.rank_papers("評価", 5)[0]] == [ja]
+    assert library_chat.rank_papers("量子色力学", 5) == ([], [])
+
+
+def test_ranking_falls_back_to_per_paper_retrieval_without_fts5(tmp_path: Path, monkeypatch) -> None:
+    _library(tmp_path, monkeypatch)
+    monkeypatch.setattr(library_chat, "has_chunks_fts", lambda conn: False)
+    papers, chunks_by_paper = library_chat.rank_papers("contrastive temperature", 5)
+    assert [row["id"] for row in papers] == [1, 2]
+    assert [[chunk["page_start"] for chunk in chunks] for chunks in chunks_by_paper] == [[1, 4], [2]]
+    assert library_chat.rank_papers("quantum", 5) == ([], [])
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from openai import InternalServerError, OpenAI
+
+from backend.app import services
+from benchmarks.fake_openai import FakeConfig, create_app
+from benchmarks.load_test import parse_operation_mix, percentile
+
+
+def _fake_client(config: FakeConfig) -> OpenAI:
+    http_client = TestClient(create_app(config))
+    return OpenAI(api_key="fake-key", base_url="http://testserver/v1", http_client=http_client, max_retries=0)
+
+
+def test_summarize_paper_against_fake_server(monkeypatch) -> None:
+    client = _fake_client(FakeConfig(latency_ms=0, jitter_ms=0))
+    monkeypatch.setattr(services, "_get_openai_client", lambda: client)
+
+    summary = services.summarize_paper("Test Paper", "[Page 1]\nSome text")
+
+    assert set(summary) == {"zh", "en", "ja"}
+    assert summary["en"]["solution"]
+
+
+def test_fake_server_streams_output_text() -> None:
+    client = _fake_client(FakeConfig(latency_ms=0, jitter_ms=0, stream_chunk_chars=8, stream_chunk_delay_ms=0))
+
+    events = list(client.responses.create(model="fake", input="User question: hi", stream=True))
+
+    deltas = "".join(event.delta for event in events if event.type == "response.output_text.delta")
+    assert events[-1].type == "response.completed"
+    assert deltas == events[-1].response.output_text
+    assert deltas.startswith("Conclusion:")
+
+
+def test_fake_server_injects_errors() -> None:
+    client = _fake_client(FakeConfig(latency_ms=0, jitter_ms=0, error_rate=1.0))
+    with pytest.raises(InternalServerError):
+        client.responses.create(model="fake", input="hello")
+
+
+def test_percentile_and_mix_parsing() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+    assert parse_operation_mix("detail:3,chat") == {"detail": 3.0, "chat": 1.0}
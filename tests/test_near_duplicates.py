@@ -0,0 +1,82 @@
+import importlib
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import services
+from backend.app.near_dup import MinHasher, estimate_similarity
+from benchmarks.corpus import build_pdf, generate_page_lines, parse_language_mix
+
+
+def _signature(pages: list[str]) -> list[int]:
+    hasher = MinHasher()
+    for text in pages:
+        hasher.update(text)
+    return hasher.digest()
+
+
+def test_minhash_is_incremental_and_separates_documents() -> None:
+    mix = parse_language_mix("en:0.7,zh:0.3")
+    doc = ["\n".join(lines) for lines in generate_page_lines(6, mix, seed=1)]
+    revised = doc[:-1] + ["\n".join(generate_page_lines(1, mix, seed=99)[0])]
+    other = ["\n".join(lines) for lines in generate_page_lines(6, parse_language_mix("ja"), seed=2)]
+
+    assert _signature(doc) == _signature(["\n".join(doc)])
+    assert estimate_similarity(_signature(doc), _signature(revised)) >= 0.7
+    assert estimate_similarity(_signature(doc), _signature(other)) < 0.3
+    assert MinHasher().digest() is None
+
+
+def test_near_duplicate_upload_waits_for_summary_reuse(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    calls: list[str] = []
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        calls.append(title)
+        block = {"question": f"q {title}", "solution": "s", "findings": "f"}
+        return {"zh": block, "en": block, "ja": block}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+    lines = generate_page_lines(5, parse_language_mix("en"), seed=3)
+    v1, v2 = tmp_path / "v1.pdf", tmp_path / "v2.pdf"
+    v1.write_bytes(build_pdf(lines))
+    v2.write_bytes(build_pdf(lines + [["Appendix: additional ablation results for the camera ready version."]]))
+
+    ids = []
+    with db.get_conn() as conn:
+        for title, path in (("v1", v1), ("v2", v2)):
+            ids.append(
+                conn.execute(
+                    """
+                    INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+                    VALUES (?, ?, ?, 'queued', datetime('now'), datetime('now'))
+                    """,
+                    (title, path.name, str(path)),
+                ).lastrowid
+            )
+    first, second = ids
+
+    services.process_paper(first, check_near_duplicates=True)
+    services.process_paper(second, check_near_duplicates=True)
+    assert calls == ["v1"]
+
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+    detail = client.get(f"/api/papers/{second}").json()
+    assert detail["status"] == "pending_summary"
+    assert detail["near_duplicates"][0]["paper_id"] == first
+    assert detail["near_duplicates"][0]["similarity"] >= 0.8
+
+    reused = client.post(f"/api/papers/{second}/reuse-summary", json={"source_id": first}).json()
+    assert reused["status"] == "completed"
+    assert reused["summary"]["en"]["question"] == "q v1"
+    assert reused["near_duplicates"] == []
+    assert client.post(f"/api/papers/{second}/reuse-summary", json={"source_id": 999}).status_code == 400
+
+    assert client.delete(f"/api/papers/{first}").status_code == 200
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM lsh_buckets WHERE paper_id = ?", (first,)).fetchone()[0] == 0
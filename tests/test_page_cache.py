@@ -0,0 +1,74 @@
+import importlib
+import sys
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app.page_cache import PageRenderCache
+from benchmarks.corpus import build_pdf, generate_page_lines, parse_language_mix
+
+
+def _pdf(tmp_path: Path, pages: int) -> Path:
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(build_pdf(generate_page_lines(pages, parse_language_mix("en"), seed=5)))
+    return path
+
+
+def _wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "prefetch did not finish"
+        time.sleep(0.01)
+
+
+def test_prefetch_warms_following_pages_and_lru_respects_cap(tmp_path: Path) -> None:
+    pdf = _pdf(tmp_path, 6)
+    cache = PageRenderCache(max_bytes=1 << 30, prefetch_count=2)
+
+    first = cache.get("k", pdf, 1)
+    assert first.startswith(b"%PDF") and cache.misses == 1
+    cache.prefetch("k", pdf, 1)
+    _wait_for(lambda: ("k", 3) in cache)
+    cache.get("k", pdf, 2)
+    cache.get("k", pdf, 3)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.prefetch("k", pdf, 5)  # page 7 does not exist and is skipped
+    _wait_for(lambda: ("k", 6) in cache)
+    assert ("k", 7) not in cache
+
+    page_size = len(first)
+    small = PageRenderCache(max_bytes=int(page_size * 2.5), prefetch_count=0)
+    for page_no in (1, 2, 3):
+        small.get("k", pdf, page_no)
+    assert ("k", 1) not in small and ("k", 3) in small
+    assert small.size_bytes <= small.max_bytes
+
+
+def test_page_endpoint_serves_from_cache(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    pdf = _pdf(tmp_path, 4)
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, file_sha256, status, created_at, updated_at)
+            VALUES ('p', 'paper.pdf', ?, 'abc', 'completed', datetime('now'), datetime('now'))
+            """,
+            (str(pdf),),
+        ).lastrowid
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    cache = PageRenderCache(max_bytes=1 << 30, prefetch_count=2)
+    monkeypatch.setattr(main, "page_cache", cache)
+    client = TestClient(main.app)
+
+    assert client.get(f"/api/papers/{paper_id}/pdf/page/1").status_code == 200
+    _wait_for(lambda: ("abc", 3) in cache)
+    second = client.get(f"/api/papers/{paper_id}/pdf/page/2")
+    assert second.status_code == 200 and second.content.startswith(b"%PDF")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert client.get(f"/api/papers/{paper_id}/pdf/page/9").status_code == 404
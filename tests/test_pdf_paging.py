@@ -1,4 +1,5 @@
 import importlib
+import io
 import sys
 from pathlib import Path
 
@@ -50,7 +51,7 @@ def test_pdf_page_endpoint_and_count(tmp_path: Path) -> None:
     page1 = client.get(f"/api/papers/{paper_id}/pdf/page/1")
     assert page1.status_code == 200
     assert page1.headers["content-type"].startswith("application/pdf")
-    reader = PdfReader(page1.content)
+    reader = PdfReader(io.BytesIO(page1.content))
     assert len(reader.pages) == 1
 
     missing = client.get(f"/api/papers/{paper_id}/pdf/page/3")
@@ -0,0 +1,63 @@
+import importlib
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import profiling
+from benchmarks.corpus import generate_paper_pdf
+
+
+def _client(tmp_path: Path, monkeypatch, **settings):
+    import backend.app.db as db
+    from backend.app import blob_store
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    for name, value in settings.items():
+        monkeypatch.setattr(profiling, name, value)
+    db.init_db()
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    return main, TestClient(main.app)
+
+
+def test_header_triggers_capture_of_handler_and_background_job(tmp_path: Path, monkeypatch) -> None:
+    main, client = _client(tmp_path, monkeypatch)
+    monkeypatch.setattr(main, "process_paper", lambda paper_id, *args, **kwargs: sum(range(10000)))
+
+    assert "x-profile-id" not in client.get("/api/papers").headers
+    assert client.get("/api/profiles").json() == []
+
+    listed = client.get("/api/papers", headers={"X-Profile": "1"})
+    capture_id = listed.headers["x-profile-id"]
+    files = {"file": ("a.pdf", generate_paper_pdf(pages=1, seed=31), "application/pdf")}
+    upload = client.post("/api/papers/upload", files=files, headers={"X-Profile": "1"})
+
+    captures = {item["id"]: item for item in client.get("/api/profiles").json()}
+    assert captures[capture_id]["path"] == "/api/papers" and captures[capture_id]["status_code"] == 200
+    assert captures[capture_id]["handler_ms"] is not None
+    assert any("list_papers" in row["function"] for row in captures[capture_id]["top_functions"])
+    background = captures[f"{upload.headers['x-profile-id']}-bg"]
+    assert background["kind"] == "background" and background["name"].startswith("process_paper #")
+    assert client.get(f"/api/profiles/{capture_id}").content
+    assert client.get("/api/profiles/missing").status_code == 404
+
+
+def test_sampling_rate_and_rotation(tmp_path: Path, monkeypatch) -> None:
+    main, client = _client(tmp_path, monkeypatch, PROFILE_SAMPLE_RATE=1.0, PROFILE_KEEP=3)
+    for _ in range(5):
+        client.get("/api/papers")
+    assert len(list((tmp_path / "profiles").glob("*.json"))) == 3
+    assert len(list((tmp_path / "profiles").glob("*.prof"))) == 3
+    durations = [item["duration_ms"] for item in client.get("/api/profiles").json()]
+    assert durations == sorted(durations, reverse=True)
+
+
+def test_profile_routes_are_not_mounted_when_profiling_is_off(tmp_path: Path, monkeypatch) -> None:
+    main, client = _client(tmp_path, monkeypatch, PROFILING_ENABLED=False)
+    assert client.get("/api/profiles").status_code == 404
+    assert "x-profile-id" not in client.get("/api/papers", headers={"X-Profile": "1"}).headers
+    assert not (tmp_path / "profiles").exists()
@@ -0,0 +1,80 @@
+import importlib
+import io
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from pypdf import PageObject, PdfReader, PdfWriter
+
+from backend.app import blob_store, services
+from benchmarks.corpus import build_pdf, generate_page_lines, parse_language_mix
+
+
+def _pdf(tmp_path: Path, name: str, pages: int, docinfo: str | None = None, untitled: bool = False) -> Path:
+    data = build_pdf([["1"]] * pages if untitled else generate_page_lines(pages, parse_language_mix("en"), seed=5))
+    if docinfo is not None:
+        writer = PdfWriter(clone_from=PdfReader(io.BytesIO(data)))
+        writer.add_metadata({"/Title": docinfo})
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        data = buffer.getvalue()
+    path = tmp_path / name
+    path.write_bytes(data)
+    return path
+
+
+def test_quick_metadata_reads_only_the_first_pages(tmp_path: Path, monkeypatch) -> None:
+    decoded: list[int] = []
+    original = PageObject.extract_text
+
+    def counting_extract(page, *args, **kwargs):
+        decoded.append(1)
+        return original(page, *args, **kwargs)
+
+    monkeypatch.setattr(PageObject, "extract_text", counting_extract)
+    path = _pdf(tmp_path, "long.pdf", pages=40)
+    meta = services.read_quick_metadata(path, "long")
+    assert len(decoded) == 2
+    full_title = services.infer_paper_title("long", services.extract_pages_from_pdf(path))
+    assert meta == {"title": full_title, "canonical_title": services.normalize_title(full_title), "page_count": 40}
+
+    untitled = _pdf(tmp_path, "untitled.pdf", pages=1, untitled=True, docinfo="Graph Sparsification in Practice")
+    assert services.read_quick_metadata(untitled, "untitled")["title"] == "Graph Sparsification in Practice"
+    junk = _pdf(tmp_path, "junk.pdf", pages=1, untitled=True, docinfo="Microsoft Word - draft3.docx")
+    assert services.read_quick_metadata(junk, "junk")["title"] == "junk"
+
+
+def test_same_text_upload_reuses_summary_after_extraction(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", tmp_path / "blobs")
+    db.init_db()
+    calls: list[str] = []
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        calls.append(title)
+        block = {"question": "q", "solution": "s", "findings": "f"}
+        return {"zh": block, "en": block, "ja": block}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+
+    original = _pdf(tmp_path, "a.pdf", pages=3)
+    reexport = _pdf(tmp_path, "b.pdf", pages=3, docinfo="Camera ready")  # same text, different bytes
+    title = services.infer_paper_title("a", services.extract_pages_from_pdf(original))
+    first = client.post("/api/papers/upload", files={"file": ("a.pdf", original.read_bytes(), "application/pdf")}).json()
+    assert first["title"] == title and first["status"] == "queued"
+
+    again = client.post("/api/papers/upload", files={"file": ("a.pdf", original.read_bytes(), "application/pdf")}).json()
+    assert again["duplicate"] and again["duplicate_of"] == first["id"]
+
+    with db.get_conn() as conn:  # keep the title check from short-circuiting the re-export
+        conn.execute("UPDATE papers SET canonical_title = 'renamed' WHERE id = ?", (first["id"],))
+    second = client.post("/api/papers/upload", files={"file": ("b.pdf", reexport.read_bytes(), "application/pdf")}).json()
+    assert not second["duplicate"]
+    detail = client.get(f"/api/papers/{second['id']}").json()
+    assert detail["status"] == "completed"
+    assert detail["summary"]["en"]["question"] == "q"
+    assert calls == [title]
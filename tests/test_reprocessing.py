@@ -0,0 +1,108 @@
+import importlib
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import services
+from benchmarks.corpus import generate_paper_pdf
+
+
+def _setup(tmp_path: Path, monkeypatch) -> tuple:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    calls = {"extract": 0, "summarize": 0}
+    real_extract = services.stream_extract_to_db
+
+    def counting_extract(*args, **kwargs):
+        calls["extract"] += 1
+        return real_extract(*args, **kwargs)
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        calls["summarize"] += 1
+        block = {"question": "q", "solution": "s", "findings": "f"}
+        return {"zh": block, "en": block, "ja": block}
+
+    monkeypatch.setattr(services, "stream_extract_to_db", counting_extract)
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(generate_paper_pdf(pages=3, seed=5))
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, created_at, updated_at)
+            VALUES ('Paper', 'paper.pdf', ?, 'queued', datetime('now'), datetime('now'))
+            """,
+            (str(pdf_path),),
+        ).lastrowid
+    return db, calls, paper_id, pdf_path
+
+
+def _paper(db, paper_id: int):
+    with db.get_conn() as conn:
+        row = conn.execute("SELECT * FROM papers WHERE id = ?", (paper_id,)).fetchone()
+        chunk_ids = [r["id"] for r in conn.execute("SELECT id FROM chunks WHERE paper_id = ?", (paper_id,))]
+    return row, chunk_ids
+
+
+def test_refresh_reuses_text_and_chunks_when_source_unchanged(tmp_path: Path, monkeypatch) -> None:
+    db, calls, paper_id, pdf_path = _setup(tmp_path, monkeypatch)
+
+    services.process_paper(paper_id)
+    first, first_chunks = _paper(db, paper_id)
+    assert calls == {"extract": 1, "summarize": 1}
+    assert first["status"] == "completed"
+    assert first["extractor_version"] == services.EXTRACTOR_VERSION
+    assert first_chunks
+
+    services.process_paper(paper_id)
+    second, second_chunks = _paper(db, paper_id)
+    assert calls == {"extract": 1, "summarize": 2}
+    assert second["summary_version"] == 2
+    assert second_chunks == first_chunks
+
+    services.process_paper(paper_id, stages=["chunk"])
+    third, third_chunks = _paper(db, paper_id)
+    assert calls == {"extract": 1, "summarize": 2}
+    assert third["summary_version"] == 2
+    assert third_chunks and set(third_chunks).isdisjoint(first_chunks)
+
+    pdf_path.write_bytes(generate_paper_pdf(pages=4, seed=6))
+    services.process_paper(paper_id)
+    assert calls == {"extract": 2, "summarize": 3}
+
+
+def test_refresh_summary_rejects_unknown_stage(tmp_path: Path, monkeypatch) -> None:
+    db, _, paper_id, _ = _setup(tmp_path, monkeypatch)
+    sys.modules.pop("backend.app.main", None)
+    main = importlib.import_module("backend.app.main")
+    client = TestClient(main.app)
+
+    bad = client.post(f"/api/papers/{paper_id}/refresh-summary", params={"stages": "summarize,reticulate"})
+    assert bad.status_code == 400
+
+    ok = client.post(f"/api/papers/{paper_id}/refresh-summary", params={"stages": "summarize"})
+    assert ok.status_code == 200
+
+
+def test_empty_stages_are_rejected_and_failed_papers_do_not_become_completed(tmp_path: Path, monkeypatch) -> None:
+    db, calls, paper_id, _ = _setup(tmp_path, monkeypatch)
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+
+    for empty in ("", ",", " , "):
+        assert client.post(f"/api/papers/{paper_id}/refresh-summary", params={"stages": empty}).status_code == 400
+
+    services.process_paper(paper_id, stages=("extract",))
+    with db.get_conn() as conn:
+        conn.execute(
+            "UPDATE papers SET status = 'failed', summary_json = '{\"error\": \"timeout\"}', summary_version = 1 WHERE id = ?",
+            (paper_id,),
+        )
+    services.process_paper(paper_id, stages=("chunk",))
+    row, chunk_ids = _paper(db, paper_id)
+    assert row["status"] == "pending_summary" and chunk_ids
+    assert calls["summarize"] == 0
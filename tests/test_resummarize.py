@@ -0,0 +1,117 @@
+from pathlib import Path
+
+from backend.app import resummarize, services
+from backend.app.ratelimit import RateLimiter
+
+
+def _library(tmp_path: Path, monkeypatch):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    with db.get_conn() as conn:
+        for title, model, prompt_version in (
+            ("legacy", None, None),
+            ("old model", "gpt-4.1", 1),
+            ("old prompt", services.MODEL_SUMMARY, 0),
+            ("current", services.MODEL_SUMMARY, services.SUMMARY_PROMPT_VERSION),
+        ):
+            conn.execute(
+                """
+                INSERT INTO papers (
+                    title, filename, filepath, status, summary_json, full_text, summary_version,
+                    summary_model, summary_prompt_version, created_at, updated_at
+                )
+                VALUES (?, 'p.pdf', 'missing.pdf', 'completed', '{"en": "old"}', ?, 1, ?, ?, datetime('now'), datetime('now'))
+                """,
+                (title, f"[Page 1]\nText of {title}.", model, prompt_version),
+            )
+    return db
+
+
+def test_resummarize_selects_stale_summaries_and_resumes(tmp_path: Path, monkeypatch) -> None:
+    db = _library(tmp_path, monkeypatch)
+    calls: list[str] = []
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        calls.append(title)
+        if title == "old prompt" and calls.count(title) == 1:
+            raise services.ServiceError("rate limited")
+        block = {"question": f"q {title}", "solution": "s", "findings": "f"}
+        return {"zh": block, "en": block, "ja": block}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+    assert [row["title"] for row in resummarize.select_papers()] == ["legacy", "old model", "old prompt"]
+    assert [row["title"] for row in resummarize.select_papers(model="gpt-4.1")] == ["old model"]
+    assert [row["title"] for row in resummarize.select_papers(model="")] == ["legacy"]
+    assert len(resummarize.select_papers(all_papers=True)) == 4
+
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    first = resummarize.Resummarizer(resummarize.Checkpoint(checkpoint_path), concurrency=2)
+    result = first.run(resummarize.select_papers())
+    assert (result["done"], result["failed"], result["skipped"]) == (3, 1, 0)
+
+    with db.get_conn() as conn:
+        rows = {row["title"]: row for row in conn.execute("SELECT * FROM papers")}
+    assert rows["legacy"]["summary_model"] == services.MODEL_SUMMARY
+    assert rows["legacy"]["summary_prompt_version"] == services.SUMMARY_PROMPT_VERSION
+    assert rows["legacy"]["summary_version"] == 2
+    assert rows["old prompt"]["summary_json"] == '{"en": "old"}'  # a failed call keeps the old summary
+    assert rows["old prompt"]["status"] == "completed"
+
+    # A stale selection taken before the first run still skips what the checkpoint has.
+    second = resummarize.Resummarizer(resummarize.Checkpoint(checkpoint_path))
+    result = second.run(resummarize.select_papers(all_papers=True))
+    assert (result["done"], result["skipped"]) == (2, 2)
+    assert sorted(calls) == ["current", "legacy", "old model", "old prompt", "old prompt"]
+
+
+def test_progress_reports_throughput_and_eta() -> None:
+    now = [0.0]
+    progress = resummarize.Progress(10, clock=lambda: now[0])
+    for _ in range(4):
+        progress.record(3000, ok=True)
+    now[0] = 60.0
+    snap = progress.snapshot()
+    assert snap["papers_per_min"] == 4.0
+    assert snap["tokens_per_min"] == 12000
+    assert snap["eta_s"] == 90.0
+    assert resummarize.estimate_tokens("a" * 400 + "注意力") == 103
+
+
+def test_rate_limiter_charges_token_cost() -> None:
+    now = [0.0]
+    waits: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(per_minute=60000, clock=lambda: now[0], sleep=sleep)  # one unit per millisecond
+    limiter.acquire(200)  # larger than the bucket: goes through, leaves a debt
+    assert waits == []
+    limiter.acquire()
+    assert abs(sum(waits) - 0.2) < 1e-9  # 199 units of debt plus the unit asked for
+
+
+def test_papers_deleted_or_reprocessed_mid_run_are_skipped(tmp_path: Path, monkeypatch) -> None:
+    db = _library(tmp_path, monkeypatch)
+    selection = resummarize.select_papers()
+    with db.get_conn() as conn:
+        conn.execute("DELETE FROM papers WHERE title = 'legacy'")
+
+    def fake_summary(title: str, full_text: str) -> dict:
+        if title == "old model":  # the user started a refresh while the call was out
+            with db.get_conn() as conn:
+                conn.execute("UPDATE papers SET status = 'processing' WHERE title = ?", (title,))
+        return {"en": {"question": f"q {title}"}}
+
+    monkeypatch.setattr(services, "summarize_paper", fake_summary)
+    checkpoint = resummarize.Checkpoint(tmp_path / "checkpoint.jsonl")
+    result = resummarize.Resummarizer(checkpoint).run(selection)
+    assert (result["done"], result["failed"]) == (3, 0)
+    assert [checkpoint.entries[row["id"]]["state"] for row in selection] == ["skipped", "skipped", "done"]
+    with db.get_conn() as conn:
+        rows = {row["title"]: row for row in conn.execute("SELECT * FROM papers")}
+    assert rows["old model"]["status"] == "processing" and rows["old model"]["summary_json"] == '{"en": "old"}'
+    assert rows["old prompt"]["summary_version"] == 2
@@ -0,0 +1,189 @@
+import importlib
+import sqlite3
+import sys
+from hashlib import sha256
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from backend.app import blob_store, services, snapshot
+from backend.app.near_dup import MinHasher, find_near_duplicates_of, store_signature
+from backend.app.services import _replace_chunks, build_chunks, build_full_text
+from benchmarks.corpus import generate_paper_pdf
+
+
+def _use_library(monkeypatch, root: Path):
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", root / "paper_reader.db")
+    monkeypatch.setattr(blob_store, "BLOB_DIR", root / "blobs")
+    db.init_db()
+    return db
+
+
+def _seed(db) -> None:
+    pages = [(1, "Sparse attention for long documents " * 30), (2, "We evaluate on three benchmarks " * 30)]
+    pdf = generate_paper_pdf(pages=1, seed=41)
+    digest = sha256(pdf).hexdigest()
+    path, _ = blob_store.store_bytes(digest, pdf)
+    # A flat upload from before file hashes were stored.
+    legacy = db.DB_PATH.parent / "uploads" / "revised.pdf"
+    legacy.parent.mkdir(parents=True, exist_ok=True)
+    legacy.write_bytes(generate_paper_pdf(pages=1, seed=42))
+    hasher = MinHasher()
+    for _, text in pages:
+        hasher.update(text)
+    with db.get_conn() as conn:
+        for title, sha, path, status in (("Original", digest, path, "completed"), ("Revised", None, legacy, "processing")):
+            paper_id = conn.execute(
+                """
+                INSERT INTO papers (
+                    title, file_sha256, filename, filepath, status, summary_json, full_text,
+                    summary_version, created_at, updated_at
+                )
+                VALUES (?, ?, 'p.pdf', ?, ?, '{"en": {"question": "q"}}', ?, 1, datetime('now'), datetime('now'))
+                """,
+                (title, sha, str(path), status, build_full_text(pages)),
+            ).lastrowid
+            _replace_chunks(conn, paper_id, build_chunks(pages))
+            store_signature(conn, paper_id, hasher.digest())
+            if sha:
+                blob_store.add_ref(conn, sha)
+        question = conn.execute(
+            "INSERT INTO messages (paper_id, role, content, created_at) VALUES (1, 'user', 'why?', datetime('now'))"
+        ).lastrowid
+        conn.execute(
+            """
+            INSERT INTO messages (paper_id, role, content, reply_to_id, created_at)
+            VALUES (1, 'assistant', 'because', ?, datetime('now'))
+            """,
+            (question,),
+        )
+
+
+def _dump(db) -> dict:
+    with db.get_conn() as conn:
+        return {
+            "papers": [
+                tuple(row)
+                for row in conn.execute("SELECT title, status, summary_json, full_text, file_sha256 FROM papers ORDER BY id")
+            ],
+            "chunks": [tuple(row) for row in conn.execute("SELECT page_start, content FROM chunks ORDER BY id")],
+            "messages": [
+                tuple(row)
+                for row in conn.execute(
+                    """
+                    SELECT m.role, m.content, q.content FROM messages m
+                    LEFT JOIN messages q ON q.id = m.reply_to_id ORDER BY m.id
+                    """
+                )
+            ],
+        }
+
+
+def test_backup_is_a_consistent_copy(tmp_path: Path, monkeypatch) -> None:
+    db = _use_library(monkeypatch, tmp_path / "live")
+    _seed(db)
+    reader = sqlite3.connect(db.DB_PATH)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM papers").fetchone()  # an open reader does not block the backup
+    seen: list[tuple[int, int]] = []
+    dest = snapshot.backup_database(tmp_path / "backup.db", pages_per_step=2, progress=lambda done, total: seen.append((done, total)))
+    reader.close()
+
+    assert len(seen) > 1 and seen[-1][0] == seen[-1][1]
+    with sqlite3.connect(dest) as copy:
+        assert copy.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] > 0
+        assert copy.execute("SELECT COUNT(*) FROM papers").fetchone()[0] == 2
+
+
+def test_export_import_round_trip_without_llm(tmp_path: Path, monkeypatch) -> None:
+    db = _use_library(monkeypatch, tmp_path / "source")
+    _seed(db)
+    original = _dump(db)
+    out = tmp_path / "library.jsonl.gz"
+    assert snapshot.export_library(out, include_pdfs=True) == {"papers": 2, "messages": 2, "blobs": 2}
+
+    db = _use_library(monkeypatch, tmp_path / "restored")
+    assert snapshot.import_library(out) == {"papers": 2, "skipped": 0, "messages": 2, "blobs": 2}
+    restored = _dump(db)
+    assert restored["chunks"] == original["chunks"]
+    assert restored["messages"] == original["messages"]
+    assert [row[0] for row in restored["papers"]] == ["Original", "Revised"]
+    assert [row[1] for row in restored["papers"]] == ["completed", "cancelled"]
+    assert [row[2:4] for row in restored["papers"]] == [row[2:4] for row in original["papers"]]
+    legacy_sha = sha256((tmp_path / "source" / "uploads" / "revised.pdf").read_bytes()).hexdigest()
+    assert [row[4] for row in restored["papers"]] == [original["papers"][0][4], legacy_sha]
+
+    with db.get_conn() as conn:
+        for (path,) in conn.execute("SELECT filepath FROM papers"):
+            assert Path(path).read_bytes().startswith(b"%PDF")
+        assert [row[0] for row in conn.execute("SELECT refcount FROM blobs")] == [1, 1]
+        conn.execute("UPDATE papers SET status = 'completed' WHERE id = 2")
+        assert find_near_duplicates_of(conn, 1)[0]["paper_id"] == 2
+
+    assert snapshot.import_library(out) == {"papers": 0, "skipped": 2, "messages": 0, "blobs": 2}
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0] == 2
+
+
+def test_paper_without_pdf_imports_once_and_stays_usable(tmp_path: Path, monkeypatch) -> None:
+    db = _use_library(monkeypatch, tmp_path / "source")
+    pages = [(1, "Graph neural networks for molecules " * 30)]
+    with db.get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, summary_json, full_text, created_at, updated_at)
+            VALUES ('Lost', 'lost.pdf', ?, 'completed', '{"en": {"question": "q"}}', ?, '2026-01-02', '2026-01-02')
+            """,
+            (str(tmp_path / "gone.pdf"), build_full_text(pages)),
+        )
+    out = tmp_path / "library.jsonl.gz"
+    assert snapshot.export_library(out, include_pdfs=True)["blobs"] == 0
+
+    db = _use_library(monkeypatch, tmp_path / "restored")
+    assert snapshot.import_library(out)["papers"] == 1
+    assert snapshot.import_library(out)["skipped"] == 1
+    with db.get_conn() as conn:
+        paper_id, filepath = conn.execute("SELECT id, filepath FROM papers").fetchone()
+    assert filepath is None
+
+    # Refreshing rebuilds chunks from the stored text and keeps the summary instead of failing on the file.
+    monkeypatch.setattr(services, "summarize_paper", lambda title, text: {"en": {"question": "fresh"}})
+    services.process_paper(paper_id)
+    with db.get_conn() as conn:
+        status, summary = conn.execute("SELECT status, summary_json FROM papers").fetchone()
+        assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] > 0
+    assert status == "completed" and "fresh" in summary
+
+    sys.modules.pop("backend.app.main", None)
+    client = TestClient(importlib.import_module("backend.app.main").app)
+    assert client.get(f"/api/papers/{paper_id}/pdf").status_code == 404
+    assert client.delete(f"/api/papers/{paper_id}").status_code == 200
+
+
+def test_maintenance_commands_tolerate_papers_without_pdf(tmp_path: Path, monkeypatch) -> None:
+    from backend.app import bulk_import
+
+    db = _use_library(monkeypatch, tmp_path / "source")
+    with db.get_conn() as conn:
+        conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, summary_json, full_text, created_at, updated_at)
+            VALUES ('Lost', 'lost.pdf', ?, 'completed', '{"en": {"question": "q"}}', '[Page 1]\nText', '2026-01-02', '2026-01-02')
+            """,
+            (str(tmp_path / "gone.pdf"),),
+        )
+    out = tmp_path / "library.jsonl.gz"
+    snapshot.export_library(out)
+
+    db = _use_library(monkeypatch, tmp_path / "restored")
+    assert snapshot.import_library(out)["papers"] == 1
+    library = tmp_path / "incoming"
+    library.mkdir()
+    (library / "new.pdf").write_bytes(generate_paper_pdf(pages=1, seed=43))
+    importer = bulk_import.BulkImporter(bulk_import.ImportJournal(tmp_path / "journal.jsonl"), summarize=False)
+    assert importer.run(library) == {"imported": 1}
+    assert blob_store.migrate_uploads() == 0
+    with db.get_conn() as conn:
+        assert conn.execute("SELECT filepath FROM papers WHERE title = 'Lost'").fetchone()[0] is None
@@ -0,0 +1,12 @@
+from benchmarks.startup import FIRST_REQUEST_BUDGET_MS, IMPORT_BUDGET_MS, measure_first_request, measure_import
+
+
+def test_api_import_stays_lazy_and_within_budget() -> None:
+    result = measure_import(runs=3)
+    assert result["eager_heavy_modules"] == []
+    assert result["median_ms"] <= IMPORT_BUDGET_MS, result
+
+
+def test_first_request_within_budget() -> None:
+    result = measure_first_request(runs=1)
+    assert result["median_ms"] <= FIRST_REQUEST_BUDGET_MS, result
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from backend.app import services
+from benchmarks.corpus import generate_paper_pdf, parse_language_mix
+
+
+def test_streaming_extract_matches_batch_pipeline(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(generate_paper_pdf(pages=7, mix=parse_language_mix("en:0.6,zh:0.2,ja:0.2"), seed=11))
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, full_text, created_at, updated_at)
+            VALUES ('Paper', 'paper.pdf', ?, 'processing', 'stale text', datetime('now'), datetime('now'))
+            """,
+            (str(pdf_path),),
+        ).lastrowid
+        services._insert_chunks(conn, paper_id, [{"page_start": 1, "page_end": 1, "content": "stale"}])
+
+    pages = services.extract_pages_from_pdf(pdf_path)
+    expected_text = services.build_full_text(pages)
+
+    result = services.stream_extract_to_db(paper_id, pdf_path, "Paper", batch_pages=3)
+
+    with db.get_conn() as conn:
+        stored_text = conn.execute("SELECT full_text FROM papers WHERE id = ?", (paper_id,)).fetchone()[0]
+        stored_chunks = [
+            row[0] for row in conn.execute("SELECT content FROM chunks WHERE paper_id = ? ORDER BY id", (paper_id,))
+        ]
+    assert stored_text == expected_text
+    assert stored_chunks == [chunk["content"] for chunk in services.build_chunks(pages)]
+    assert result["content_fingerprint"] == services.compute_content_fingerprint(expected_text)
+    assert result["title"] == services.infer_paper_title("Paper", pages)
+    assert result["summary_text"] == expected_text
+    assert result["page_count"] == 7
+
+
+def test_incremental_fingerprint_respects_length_cap() -> None:
+    pieces = ["[Page 1]\nAbc-" * 20000, "\n\n[Page 2]\n数据集 データ " * 40000]
+    fingerprinter = services.ContentFingerprinter()
+    for piece in pieces:
+        fingerprinter.update(piece)
+
+    assert fingerprinter.hexdigest() == services.compute_content_fingerprint("".join(pieces))
+
+
+def test_failed_streaming_extract_keeps_previous_text_and_chunks(tmp_path: Path, monkeypatch) -> None:
+    import backend.app.db as db
+
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "paper_reader.db")
+    db.init_db()
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(generate_paper_pdf(pages=7, mix=parse_language_mix("en:1.0"), seed=5))
+    with db.get_conn() as conn:
+        paper_id = conn.execute(
+            """
+            INSERT INTO papers (title, filename, filepath, status, full_text, created_at, updated_at)
+            VALUES ('Paper', 'paper.pdf', ?, 'processing', 'previous text', datetime('now'), datetime('now'))
+            """,
+            (str(pdf_path),),
+        ).lastrowid
+        services._insert_chunks(conn, paper_id, [{"page_start": 1, "page_end": 1, "content": "previous chunk"}])
+
+    real_iter = services.iter_pdf_pages
+
+    def _failing_iter(path: Path):
+        for page_no, text in real_iter(path):
+            if page_no == 5:
+                raise RuntimeError("corrupt page")
+            yield page_no, text
+
+    monkeypatch.setattr(services, "iter_pdf_pages", _failing_iter)
+    with pytest.raises(RuntimeError):
+        services.stream_extract_to_db(paper_id, pdf_path, "Paper", batch_pages=2)
+
+    with db.get_conn() as conn:
+        stored_text = conn.execute("SELECT full_text FROM papers WHERE id = ?", (paper_id,)).fetchone()[0]
+        stored_chunks = [row[0] for row in conn.execute("SELECT content FROM chunks WHERE paper_id = ?", (paper_id,))]
+        staged = conn.execute("SELECT COUNT(*) FROM staged_text").fetchone()[0]
+        staged += conn.execute("SELECT COUNT(*) FROM staged_chunks").fetchone()[0]
+    assert stored_text == "previous text"
+    assert stored_chunks == ["previous chunk"]
+    assert staged == 0